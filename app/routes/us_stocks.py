@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from engine.us_stocks_data_collector import USStocksDataCollector
 from engine.us_closing_bell_analyzer import USClosingBellAnalyzer
 from engine.us_recommendation_engine import USRecommendationEngine
+from engine.intraday_buffer import IntradayStore, IntradayPoller, SessionContext
 import pytz
 from datetime import datetime
 import time
@@ -19,11 +20,50 @@ collector = USStocksDataCollector()
 analyzer = USClosingBellAnalyzer()
 engine = USRecommendationEngine()
 
+# 세션 중 변하지 않는 일봉 조건 (전일, MA20/60, 월간 고점)
+# 폴러의 백그라운드 스레드가 세션당 1회 조회 ('alphavantage' 예산, engine.rate_limit)
+# 실패/불완전 응답은 당일 재시도하지 않음 → 요청 스레드는 메모리만 읽음
+def load_daily_context(ticker: str, session: str):
+    """전일 OHLCV / 이평선 / 월간 고점 (최대 4회 호출, 불완전하면 None)"""
+    # 장중에는 당일 봉이 포함될 수 있음 → 세션일 이전 마지막 봉이 전일
+    yesterday = collector.get_daily_ohlcv(ticker, before=session)
+    if not yesterday:
+        return None
+    ma = collector.get_moving_averages(ticker)
+    if not ma['ma20'] or not ma['ma60']:
+        return None
+    monthly_high = collector.get_monthly_high(ticker)
+    if not monthly_high:
+        return None
+    return {'yesterday': yesterday, 'ma': ma, 'monthly_high': monthly_high}
+
+
+# 인트라데이 1m/5m 링버퍼 + 일봉 컨텍스트 (백그라운드 폴러가 채움)
+intraday = IntradayStore(collector.monitored_tickers)
+daily_context = SessionContext(load_daily_context)
+poller = IntradayPoller(intraday, context=daily_context)
+
+
+def evaluate_from_buffer(ticker: str):
+    """링버퍼의 당일 누적 봉 + 메모리의 일봉 컨텍스트로 종가배팅 조건 재평가 (네트워크 호출 없음)"""
+    today = intraday.session_bar(ticker)
+    if not today:
+        return None, None
+    ctx = daily_context.get(ticker)
+    if not ctx:
+        return today, None
+    cb_result = analyzer.should_execute_closing_bell(
+        ticker, today, ctx['yesterday'], ctx['ma']['ma20'], ctx['ma']['ma60'], ctx['monthly_high']
+    )
+    return today, cb_result
+
 @us_stocks_bp.route('/closing-bell-status', methods=['GET'])
 def get_closing_bell_status():
     """트레이딩 시간 상태 확인"""
     try:
+        poller.start()
         status = analyzer.is_trading_time()
+        status['intraday_updated_at'] = intraday.updated_at.isoformat() if intraday.updated_at else None
         return jsonify(status)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -42,6 +82,7 @@ def get_closing_bell_recommendations():
         
         # 시간 체크 (테스트 모드 지원)
         test_mode = request.args.get('test', 'false').lower() == 'true'
+        poller.start()
         
         if not test_mode:
             trading_status = analyzer.is_trading_time()
@@ -59,26 +100,30 @@ def get_closing_bell_recommendations():
         # 모든 모니터링 종목 분석
         for ticker in collector.monitored_tickers:
             try:
-                today = collector.get_daily_ohlcv(ticker)
-                time.sleep(0.5)  # API 제한 방지
-                
-                yesterday = collector.get_daily_ohlcv(ticker, days_ago=1)
-                time.sleep(0.5)
+                # 링버퍼에 당일 봉이 있으면 메모리에서 바로 평가
+                today, cb_result = evaluate_from_buffer(ticker)
                 
-                if not today or not yesterday:
-                    errors.append(f"{ticker}: No data")
-                    continue
-                
-                # Closing Bell 5조건 검증
-                ma = collector.get_moving_averages(ticker)
-                time.sleep(0.5)
-                
-                monthly_high = collector.get_monthly_high(ticker)
-                time.sleep(0.5)
-                
-                cb_result = analyzer.should_execute_closing_bell(
-                    ticker, today, yesterday, ma['ma20'], ma['ma60'], monthly_high
-                )
+                if cb_result is None:
+                    today = collector.get_daily_ohlcv(ticker)
+                    time.sleep(0.5)  # API 제한 방지
+                    
+                    yesterday = collector.get_daily_ohlcv(ticker, days_ago=1)
+                    time.sleep(0.5)
+                    
+                    if not today or not yesterday:
+                        errors.append(f"{ticker}: No data")
+                        continue
+                    
+                    # Closing Bell 5조건 검증
+                    ma = collector.get_moving_averages(ticker)
+                    time.sleep(0.5)
+                    
+                    monthly_high = collector.get_monthly_high(ticker)
+                    time.sleep(0.5)
+                    
+                    cb_result = analyzer.should_execute_closing_bell(
+                        ticker, today, yesterday, ma['ma20'], ma['ma60'], monthly_high
+                    )
                 
                 if cb_result['passed_conditions'] < 3:
                     continue
@@ -124,6 +169,45 @@ def get_closing_bell_recommendations():
         return jsonify({'error': str(e)}), 500
 
 
+@us_stocks_bp.route('/closing-bell-live', methods=['GET'])
+def get_closing_bell_live():
+    """
+    링버퍼 기반 실시간 종가배팅 조건 (장중 반복 호출용)
+    
+    curl http://localhost:5000/api/us/stocks/closing-bell-live
+    """
+    try:
+        poller.start()
+        results = []
+        started = time.perf_counter()
+        for ticker in intraday.tickers():
+            today, cb_result = evaluate_from_buffer(ticker)
+            if cb_result is None:
+                continue
+            results.append({
+                'ticker': ticker,
+                'as_of': today['as_of'],
+                'current_price': today['close'],
+                'volume': today['volume'],
+                'passed_conditions': cb_result['passed_conditions'],
+                'confidence': cb_result['confidence'],
+                'checks': cb_result['checks']
+            })
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        
+        results.sort(key=lambda r: r['passed_conditions'], reverse=True)
+        return jsonify({
+            'results': results,
+            'evaluated': len(results),
+            'eval_time_us': round(elapsed_us, 1),
+            'context_pending': daily_context.pending(intraday.tickers()),
+            'context_unavailable': sorted(daily_context.unavailable()),
+            'intraday_updated_at': intraday.updated_at.isoformat() if intraday.updated_at else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @us_stocks_bp.route('/analyze/<ticker>', methods=['GET'])
 def analyze_single_ticker(ticker):
     """단일 종목 분석"""
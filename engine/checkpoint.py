@@ -0,0 +1,67 @@
+# Result Journal (append-only per-ticker checkpoint for long runs, resumable within a session)
+import os
+import json
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    """numpy scalars -> Python (floats keep full precision)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class ResultJournal:
+    """
+    JSON lines file: a header {key, started} followed by one record per finished ticker
+    Records are flushed to disk per batch, so a killed run keeps everything written so far.
+    They are only reused while the header key (session, input versions) matches the current run.
+    """
+
+    def __init__(self, path: str, key: Dict):
+        self.path = path
+        self.key = key
+        self.lock = threading.Lock()
+
+    def load(self) -> Optional[List[Dict]]:
+        """Records of a journal started with the same key (None when missing or stale)"""
+        if not os.path.exists(self.path):
+            return None
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            return None
+        if header.get('key') != self.key:
+            return None
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"⚠️ Skipping truncated journal record in {self.path}")
+        return records
+
+    def start(self):
+        """Truncate and write a fresh header"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.lock, open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'key': self.key, 'started': datetime.now().isoformat(timespec='seconds')}) + '\n')
+
+    def append(self, df: pd.DataFrame):
+        """Append one batch of rows and flush it to disk"""
+        if df.empty:
+            return
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            for record in df.to_dict('records'):
+                f.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
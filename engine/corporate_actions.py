@@ -0,0 +1,145 @@
+# Corporate Action Ledger (splits / dividends per ticker)
+import os
+import json
+import logging
+import threading
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from engine.price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+SPLIT = 'split'
+DIVIDEND = 'dividend'
+
+
+def extract_actions(hist: pd.DataFrame) -> List[Dict]:
+    """
+    Pull split / dividend events out of a yfinance history frame
+    (requires the 'Dividends' / 'Stock Splits' columns, i.e. actions=True)
+    """
+    events = []
+    if hist is None or hist.empty:
+        return events
+    for column, kind in (('Stock Splits', SPLIT), ('Dividends', DIVIDEND)):
+        if column not in hist.columns:
+            continue
+        values = pd.to_numeric(hist[column], errors='coerce').fillna(0)
+        for ts, value in values[values > 0].items():
+            day = pd.Timestamp(ts)
+            if day.tzinfo is not None:
+                day = day.tz_localize(None)
+            events.append({'date': day.strftime('%Y-%m-%d'), 'type': kind, 'value': float(value)})
+    return sorted(events, key=lambda e: e['date'])
+
+
+def adjustment_factors(events: List[Dict], closes: pd.Series, last_close: Optional[float]) -> Tuple[float, float]:
+    """
+    Cumulative (price, volume) factors that bring bars stored before the events
+    onto the basis of a freshly downloaded, auto-adjusted window (closes indexed by date)
+
+    Events are walked latest-first; a dividend's factor 1 - D / prev_close needs the
+    raw previous close: the stored last close when the event is on the window's first
+    bar, otherwise the window close with the later (and its own) adjustment undone.
+    """
+    closes = closes.dropna()
+    dates = pd.to_datetime(closes.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+
+    price_factor, volume_factor = 1.0, 1.0
+    for event in sorted(events, key=lambda e: e['date'], reverse=True):
+        if event['type'] == SPLIT:
+            price_factor /= event['value']
+            volume_factor *= event['value']
+            continue
+
+        earlier = closes.to_numpy()[dates < pd.Timestamp(event['date'])]
+        if len(earlier):
+            # adjusted = (raw - D) * later factors
+            prev_close = float(earlier[-1]) / price_factor + event['value']
+        elif last_close:
+            prev_close = float(last_close)
+        else:
+            continue
+        if prev_close > event['value']:
+            price_factor *= 1 - event['value'] / prev_close
+    return price_factor, volume_factor
+
+
+def event_key(events: List[Dict]) -> str:
+    """Stable id of a set of events (the store logs re-adjustments by it)"""
+    return ','.join(f"{e['date']}:{e['type']}" for e in sorted(events, key=lambda e: (e['date'], e['type'])))
+
+
+class CorporateActionLedger:
+    """
+    Per-ticker record of applied splits / dividends (data/corporate_actions.json)
+    {ticker: [{date, type, value, applied}]}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, List[Dict]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('tickers', {})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read corporate action ledger {path}: {e}")
+
+    def events(self, ticker: str, kind: str = None) -> List[Dict]:
+        return [e for e in self.entries.get(ticker, []) if kind is None or e['type'] == kind]
+
+    def new_events(self, ticker: str, events: List[Dict]) -> List[Dict]:
+        """Events not yet in the ledger"""
+        known = {(e['date'], e['type']) for e in self.entries.get(ticker, [])}
+        return [e for e in events if (e['date'], e['type']) not in known]
+
+    def record(self, ticker: str, events: List[Dict]):
+        if not events:
+            return
+        applied = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            ledger = self.entries.setdefault(ticker, [])
+            ledger.extend({**e, 'applied': applied} for e in events)
+            ledger.sort(key=lambda e: e['date'])
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'tickers': self.entries},
+                          f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def apply(self, store: PriceStore, ticker: str, events: List[Dict], closes: pd.Series) -> int:
+        """
+        Re-adjust the ticker's stored history for events in a newly downloaded window
+        Only this ticker's column files are touched. Returns rows re-adjusted
+        """
+        events = self.new_events(ticker, events)
+        if not events:
+            return 0
+
+        rows = 0
+        if store.row_count(ticker) > 0:
+            last_close = store.read_ticker(ticker, ['current_price'])['current_price']
+            last_close = float(last_close[-1]) if len(last_close) else None
+            price_factor, volume_factor = adjustment_factors(events, closes, last_close)
+            # Stored rows all predate the window, so every one of them is re-based; the key makes
+            # a rerun after a crash between the re-base and the ledger save a no-op
+            rows = store.adjust(ticker, price_factor, volume_factor, before=events[0]['date'],
+                                key=event_key(events))
+            logger.info(f"🔧 {ticker}: {len(events)} corporate action(s) "
+                        f"({', '.join(e['type'] + ' ' + e['date'] for e in events)}) → "
+                        f"re-adjusted {rows} stored rows (price ×{price_factor:.6f}, volume ×{volume_factor:g})")
+
+        # Saved right away so an interrupted run never re-applies the same event
+        self.record(ticker, events)
+        self.save()
+        return rows
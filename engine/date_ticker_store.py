@@ -0,0 +1,180 @@
+# Date x Ticker Matrix Store (daily per-ticker values, one memory-mapped matrix per field)
+import os
+import glob
+import json
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def to_days(dates) -> np.ndarray:
+    values = pd.to_datetime(pd.Series(dates))
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return values.values.astype('datetime64[D]').astype('int64')
+
+
+class DateTickerStore:
+    """
+    Daily per-ticker values, one dates x tickers matrix per field
+
+    Layout:
+        <root>/index.json                 dates (days since epoch) / tickers / fields / field files
+        <root>/<field>.<version>.bin      matrix (dates x tickers), row-major, NaN where no value
+
+    - A daily run appends one row per field; cells of existing dates are updated in place
+    - New tickers or back-dated rows rewrite the matrices once into new versions, switched
+      with a single rename of the index, so readers never pair a new layout with an old index
+    - series() reads one column, cross_section() one contiguous row
+    """
+
+    def __init__(self, root: str, fields: List[str], dtype: str = 'float64'):
+        self.root = root
+        self.fields = list(fields)
+        self.dtype = dtype
+        self.index_file = os.path.join(root, 'index.json')
+        self.days = np.empty(0, dtype='int64')
+        self.tickers: List[str] = []
+        self.files: Dict[str, str] = {}
+        self.previous_files: Dict[str, str] = {}
+        self.mtime = None
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.days = np.asarray(index['days'], dtype='int64')
+            self.tickers = index['tickers']
+            self.files = index.get('files', {})
+            self.mtime = os.path.getmtime(self.index_file)
+            # Fields added after the store was created start out empty
+            for field in self.fields:
+                path = self._field_file(field)
+                if len(self.days) and self.tickers and not os.path.exists(path):
+                    np.full((len(self.days), len(self.tickers)), np.nan, dtype=self.dtype).tofile(path)
+        self.ticker_index: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+
+    def _field_file(self, field: str) -> str:
+        """Current matrix file of a field (stores written before versioning use <field>.bin)"""
+        return os.path.join(self.root, self.files.get(field, f'{field}.bin'))
+
+    def _matrix(self, field: str, mode: str = 'r') -> np.ndarray:
+        shape = (len(self.days), len(self.tickers))
+        if not shape[0] or not shape[1]:
+            return np.empty(shape, dtype=self.dtype)
+        return np.memmap(self._field_file(field), dtype=self.dtype, mode=mode, shape=shape)
+
+    def _save_index(self):
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'days': self.days.tolist(), 'tickers': self.tickers, 'fields': self.fields,
+                       'files': self.files}, f)
+        os.replace(tmp_file, self.index_file)
+        self.mtime = os.path.getmtime(self.index_file)
+        if self.previous_files:
+            self._remove_old_versions()
+
+    def _remove_old_versions(self):
+        """Keep the version readers may still be opening; older ones are unreferenced"""
+        keep = {os.path.join(self.root, name) for name in (*self.files.values(), *self.previous_files.values())}
+        for field in self.fields:
+            pattern = os.path.join(glob.escape(self.root), glob.escape(field))
+            for old_file in glob.glob(pattern + '.bin') + glob.glob(pattern + '.*.bin'):
+                if old_file not in keep:
+                    try:
+                        os.remove(old_file)
+                    except OSError as e:
+                        logger.debug(f"Could not remove old matrix {old_file}: {e}")
+        self.previous_files = {}
+
+    # ------------------------------------------------------------------ writes
+
+    def _rewrite(self, days: np.ndarray, tickers: List[str]):
+        """
+        Re-lay the matrices on a wider date / ticker grid as new file versions
+        Nothing references them until write() saves the index
+        """
+        rows = np.searchsorted(days, self.days)
+        cols = np.asarray([tickers.index(t) for t in self.tickers], dtype='int64')
+        version = f'{time.time_ns():x}'
+        files = {}
+        for field in self.fields:
+            data = np.full((len(days), len(tickers)), np.nan, dtype=self.dtype)
+            if len(self.days) and len(self.tickers):
+                data[np.ix_(rows, cols)] = self._matrix(field)
+            files[field] = f'{field}.{version}.bin'
+            data.tofile(os.path.join(self.root, files[field]))
+        self.previous_files = {f: os.path.basename(self._field_file(f)) for f in self.fields}
+        self.files = files
+        self.days, self.tickers = days, tickers
+        self.ticker_index = {t: i for i, t in enumerate(tickers)}
+
+    def _append_days(self, new_days: np.ndarray):
+        """Add empty rows after the last stored date"""
+        width = len(self.tickers)
+        size = len(self.days) * width * np.dtype(self.dtype).itemsize
+        for field in self.fields:
+            path = self._field_file(field)
+            with open(path, 'ab') as f:
+                f.truncate(size)   # drop a partial append left by an interrupted run
+                np.full((len(new_days), width), np.nan, dtype=self.dtype).tofile(f)
+        self.days = np.concatenate([self.days, new_days])
+
+    def write(self, frame: pd.DataFrame) -> int:
+        """Store (ticker, date) rows of field values, returns cells written per field"""
+        if frame is None or frame.empty:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        days = to_days(frame['date'])
+        tickers = frame['ticker'].astype(str).to_numpy()
+
+        new_tickers = sorted(set(tickers) - set(self.ticker_index))
+        new_days = np.setdiff1d(np.unique(days), self.days)
+        if new_tickers or (len(new_days) and len(self.days) and new_days[0] <= self.days[-1]):
+            self._rewrite(np.union1d(self.days, new_days), self.tickers + new_tickers)
+        elif len(new_days):
+            self._append_days(new_days)
+
+        rows = np.searchsorted(self.days, days)
+        cols = np.asarray([self.ticker_index[t] for t in tickers], dtype='int64')
+        for field in self.fields:
+            if field not in frame.columns:
+                continue
+            data = self._matrix(field, mode='r+')
+            data[rows, cols] = pd.to_numeric(frame[field], errors='coerce').to_numpy(dtype=self.dtype)
+            data.flush()
+            del data
+        self._save_index()
+        return len(frame)
+
+    # ------------------------------------------------------------------ queries
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.days.astype('datetime64[D]').astype('datetime64[ns]'))
+
+    def series(self, ticker: str, fields: Iterable[str] = None, start=None, end=None) -> pd.DataFrame:
+        """One ticker's history (date-indexed, dates without any value dropped)"""
+        fields = list(fields) if fields else self.fields
+        j = self.ticker_index.get(ticker)
+        if j is None:
+            return pd.DataFrame(columns=fields)
+        lo = int(np.searchsorted(self.days, to_days([start])[0])) if start is not None else 0
+        hi = int(np.searchsorted(self.days, to_days([end])[0], side='right')) if end is not None else len(self.days)
+        df = pd.DataFrame({f: np.asarray(self._matrix(f)[lo:hi, j]) for f in fields}, index=self.dates[lo:hi])
+        df.index.name = 'date'
+        return df.dropna(how='all')
+
+    def cross_section(self, date=None, fields: Iterable[str] = None) -> pd.DataFrame:
+        """All tickers' values on a date (latest stored date on or before it; latest when None)"""
+        fields = list(fields) if fields else self.fields
+        if not len(self.days):
+            return pd.DataFrame(columns=fields)
+        i = len(self.days) - 1 if date is None else int(np.searchsorted(self.days, to_days([date])[0], side='right')) - 1
+        if i < 0:
+            return pd.DataFrame(columns=fields)
+        df = pd.DataFrame({f: np.asarray(self._matrix(f)[i]) for f in fields}, index=pd.Index(self.tickers, name='ticker'))
+        df.attrs['date'] = str(self.days[i].astype('datetime64[D]'))
+        return df.dropna(how='all')
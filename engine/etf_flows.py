@@ -0,0 +1,110 @@
+# ETF Creation / Redemption Flows (daily shares outstanding x NAV history)
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Iterable, List
+
+from engine.date_ticker_store import DateTickerStore, to_days
+
+logger = logging.getLogger(__name__)
+
+ETF_FIELDS = ['shares', 'nav', 'flow', 'total_assets']
+
+# Rolling flow windows served by /api/us/etf-flows (sessions)
+FLOW_WINDOWS = (1, 5, 20)
+
+
+class ETFFlowStore(DateTickerStore):
+    """
+    Daily ETF shares outstanding, NAV, total assets and net flow (data/etf_flow_store)
+    flow(d) = (shares(d) - shares(previous stored day)) x nav(d)
+    Each run records one session; only that row (and the next stored row, when back-dated) is computed
+    """
+
+    def __init__(self, root: str):
+        super().__init__(root, ETF_FIELDS, dtype='float64')
+
+    def previous(self, field: str, tickers: List[str], day) -> np.ndarray:
+        """Last stored value of a field strictly before `day` (NaN when none)"""
+        out = np.full(len(tickers), np.nan)
+        cols = [self.ticker_index.get(t, -1) for t in tickers]
+        rows = int(np.searchsorted(self.days, to_days([day])[0], side='left'))
+        known = np.asarray([c >= 0 for c in cols])
+        if rows == 0 or not known.any():
+            return out
+        values = np.asarray(self._matrix(field)[:rows][:, [c for c in cols if c >= 0]])
+        valid = ~np.isnan(values)
+        last = rows - 1 - np.argmax(valid[::-1], axis=0)
+        out[known] = np.where(valid.any(axis=0), values[last, np.arange(values.shape[1])], np.nan)
+        return out
+
+    def record(self, day, snapshot: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store one session's (ticker, shares, nav, total_assets) snapshot with its net flow
+        Shares the payload lacks are derived as total_assets / nav only when total assets
+        changed since the last stored day: Yahoo often leaves totalAssets unchanged for days,
+        and dividing a stale figure by today's NAV would report pure price moves as flows.
+        """
+        snapshot = snapshot.dropna(subset=['nav'])
+        if snapshot.empty:
+            return snapshot
+        tickers = snapshot['ticker'].tolist()
+        frame = snapshot.reindex(columns=['ticker', 'shares', 'nav', 'total_assets'])
+        shares = frame['shares'].to_numpy(dtype='float64')
+        nav = frame['nav'].to_numpy(dtype='float64')
+        assets = frame['total_assets'].to_numpy(dtype='float64')
+        derive = np.isnan(shares) & ~np.isnan(assets) & (assets != self.previous('total_assets', tickers, day))
+        shares = np.where(derive, assets / nav, shares)
+        frame['shares'] = shares
+        frame['flow'] = (shares - self.previous('shares', tickers, day)) * nav
+        frame['date'] = pd.Timestamp(day)
+        self.write(frame)
+
+        # A back-dated day is the new predecessor of the next stored day: refresh that flow
+        later = np.flatnonzero(self.days > to_days([day])[0])
+        if len(later):
+            self.reflow(tickers, self.dates[later[0]])
+        return frame
+
+    def reflow(self, tickers: List[str], day):
+        """Recompute one stored day's flow from the stored shares / NAV"""
+        i = int(np.searchsorted(self.days, to_days([day])[0]))
+        cols = [self.ticker_index[t] for t in tickers]
+        shares = np.asarray(self._matrix('shares')[i, cols])
+        nav = np.asarray(self._matrix('nav')[i, cols])
+        self.write(pd.DataFrame({
+            'ticker': tickers,
+            'date': self.dates[i],
+            'flow': (shares - self.previous('shares', tickers, day)) * nav,
+        }))
+
+    def aggregates(self, windows: Iterable[int] = FLOW_WINDOWS) -> pd.DataFrame:
+        """Per ETF: net flow over the last 1 / 5 / 20 stored sessions, AUM and flow as % of AUM"""
+        windows = list(windows)
+        if not len(self.days) or not self.tickers:
+            return pd.DataFrame()
+        depth = min(max(windows), len(self.days))
+        flows = np.asarray(self._matrix('flow')[-depth:])
+        shares = np.asarray(self._matrix('shares')[-depth:])
+        nav = np.asarray(self._matrix('nav')[-depth:])
+
+        valid = ~np.isnan(shares)
+        last = depth - 1 - np.argmax(valid[::-1], axis=0)
+        cols = np.arange(len(self.tickers))
+        aum = np.where(valid.any(axis=0), shares[last, cols] * nav[last, cols], np.nan)
+
+        df = pd.DataFrame({'ticker': self.tickers})
+        for w in windows:
+            window = flows[-w:]
+            df[f'flow_{w}d'] = np.where(np.isnan(window).all(axis=0), np.nan, np.nansum(window, axis=0))
+        df['aum'] = aum
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for w in windows[1:]:
+                df[f'flow_{w}d_pct'] = df[f'flow_{w}d'] / df['aum'] * 100
+        df['as_of'] = np.where(valid.any(axis=0), self.days[len(self.days) - depth + last].astype('datetime64[D]').astype(str), None)
+        return df.set_index('ticker')
+
+
+def default_flow_store_path(data_dir: str) -> str:
+    return os.path.join(data_dir, 'etf_flow_store')
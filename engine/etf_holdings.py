@@ -0,0 +1,106 @@
+# ETF Holdings Look-Through (constituent weights x ETF flows -> implied passive flow per stock)
+import os
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+HOLDINGS_FILE = 'etf_holdings.csv'
+COLUMNS = ['etf', 'ticker', 'weight', 'as_of']
+
+# Weights drift slowly; refresh each ETF's constituents monthly
+MAX_AGE_DAYS = 30
+
+
+class ETFHoldings:
+    """
+    Local ETF -> constituent weight table (data/etf_holdings.csv)
+    One row per (etf, ticker) with the weight as a fraction of NAV.
+    Rows can come from fetch_weights() or from full issuer holdings files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.df = pd.DataFrame(columns=COLUMNS)
+        if os.path.exists(path):
+            try:
+                self.df = pd.read_csv(path, dtype={'etf': str, 'ticker': str, 'as_of': str})[COLUMNS]
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read ETF holdings {path}: {e}")
+
+    @property
+    def etfs(self) -> List[str]:
+        return sorted(self.df['etf'].unique())
+
+    def stale(self, etfs: List[str], today: date = None) -> List[str]:
+        """ETFs with no weights or weights older than MAX_AGE_DAYS"""
+        today = today or date.today()
+        as_of = self.df.groupby('etf')['as_of'].max()
+        cutoff = (today - timedelta(days=MAX_AGE_DAYS)).isoformat()
+        return [e for e in etfs if e not in as_of.index or as_of[e] < cutoff]
+
+    def update(self, etf: str, weights: Dict[str, float], as_of: date = None):
+        """Replace one ETF's constituents"""
+        as_of = (as_of or date.today()).isoformat()
+        rows = pd.DataFrame({'etf': etf, 'ticker': list(weights), 'weight': list(weights.values()), 'as_of': as_of})
+        with self.lock:
+            self.df = pd.concat([self.df[self.df['etf'] != etf], rows], ignore_index=True)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            self.df.sort_values(['etf', 'weight'], ascending=[True, False]).to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+
+    def matrix(self, etfs: List[str], tickers: List[str] = None) -> Tuple[sparse.csr_matrix, List[str]]:
+        """
+        Sparse weight matrix W (len(etfs) x stocks), W[i, j] = weight of stock j in ETF i
+        Stocks default to every constituent of the given ETFs
+        """
+        df = self.df[self.df['etf'].isin(etfs) & (self.df['weight'] > 0)]
+        if tickers is None:
+            tickers = sorted(df['ticker'].unique())
+        else:
+            df = df[df['ticker'].isin(tickers)]
+        rows = pd.Index(etfs).get_indexer(df['etf'])
+        cols = pd.Index(tickers).get_indexer(df['ticker'])
+        W = sparse.csr_matrix((df['weight'].to_numpy(dtype='float64'), (rows, cols)),
+                              shape=(len(etfs), len(tickers)))
+        return W, list(tickers)
+
+    def look_through(self, flows: pd.DataFrame, tickers: List[str] = None) -> pd.DataFrame:
+        """
+        Implied passive flow per stock: W.T @ F in one sparse multiply
+        `flows` is indexed by ETF with one column per flow window (USD); missing flows count as 0
+        """
+        flows = flows[flows.index.isin(self.df['etf'])]
+        W, tickers = self.matrix(list(flows.index), tickers)
+        F = flows.fillna(0.0).to_numpy(dtype='float64')
+        implied = W.T @ F
+        out = pd.DataFrame(implied, index=pd.Index(tickers, name='ticker'), columns=flows.columns)
+        out['etf_count'] = np.diff(W.tocsc().indptr)
+        return out
+
+
+def fetch_weights(provider, etf: str) -> Optional[Dict[str, float]]:
+    """Constituent weights from the provider's fund data (Yahoo serves the top holdings only)"""
+    try:
+        top = provider.ticker_data(etf, 'funds_data').top_holdings
+    except Exception as e:
+        logger.debug(f"Holdings unavailable for {etf}: {e}")
+        return None
+    if top is None or top.empty or 'Holding Percent' not in top.columns:
+        return None
+    weights = top['Holding Percent'].dropna()
+    return {str(t).replace('.', '-'): float(w) for t, w in weights.items() if w > 0}
+
+
+def default_holdings_path(data_dir: str) -> str:
+    return os.path.join(data_dir, HOLDINGS_FILE)
@@ -0,0 +1,160 @@
+# Fetch Failure Ledger (retry backoff + quarantine for dead symbols)
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Consecutive empty responses before a symbol is quarantined
+QUARANTINE_AFTER = 5
+# Quarantined symbols get one probe per interval (catches relistings / ticker reuse)
+QUARANTINE_PROBE_DAYS = 30
+# Backoff after the 2nd consecutive failure: 12h, 24h, 48h ... capped
+BACKOFF_BASE_HOURS = 12
+BACKOFF_MAX_HOURS = 7 * 24
+
+REASON_EMPTY = 'empty'
+# A whole multi-ticker batch came back without data (yf.download reports rate limits this way)
+REASON_NO_DATA = 'no_data'
+
+
+class FailureLedger:
+    """
+    Persistent per-ticker failure record shared across runs
+
+    {ticker: {consecutive, consecutive_empty, total, last_reason, last_failure,
+              next_retry, quarantined_at, avg_cost}}
+    Only empty responses count towards quarantine; errors (timeouts, rate
+    limits) and empty batches (REASON_NO_DATA) only back off, so a network
+    outage or a multi-day throttle never quarantines the universe.
+    """
+
+    def __init__(self, path: str, quarantine_after: int = QUARANTINE_AFTER):
+        self.path = path
+        self.quarantine_after = quarantine_after
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('tickers', {})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read failure ledger {path}: {e}")
+
+    # ------------------------------------------------------------------ queries
+
+    def is_quarantined(self, ticker: str) -> bool:
+        return bool(self.entries.get(ticker, {}).get('quarantined_at'))
+
+    def should_fetch(self, ticker: str, now: datetime = None) -> bool:
+        """False while the ticker is backing off or quarantined"""
+        entry = self.entries.get(ticker)
+        if not entry:
+            return True
+        now = now or datetime.now()
+        if entry.get('quarantined_at'):
+            last = datetime.fromisoformat(entry['last_failure'])
+            return now - last >= timedelta(days=QUARANTINE_PROBE_DAYS)
+        next_retry = entry.get('next_retry')
+        return next_retry is None or now >= datetime.fromisoformat(next_retry)
+
+    def partition(self, tickers: Iterable[str], now: datetime = None) -> Dict[str, List[str]]:
+        """Split tickers into fetch / backoff / quarantined"""
+        now = now or datetime.now()
+        result = {'fetch': [], 'backoff': [], 'quarantined': []}
+        for ticker in tickers:
+            if self.should_fetch(ticker, now):
+                result['fetch'].append(ticker)
+            elif self.is_quarantined(ticker):
+                result['quarantined'].append(ticker)
+            else:
+                result['backoff'].append(ticker)
+        return result
+
+    def quarantined(self) -> List[str]:
+        return sorted(t for t, e in self.entries.items() if e.get('quarantined_at'))
+
+    def estimated_cost(self, tickers: Iterable[str]) -> float:
+        """Seconds the given tickers cost per run when they fail"""
+        return sum(self.entries.get(t, {}).get('avg_cost', 0.0) for t in tickers)
+
+    # ------------------------------------------------------------------ updates
+
+    def record_failure(self, ticker: str, reason: str = REASON_EMPTY, cost: float = 0.0,
+                       now: datetime = None):
+        now = now or datetime.now()
+        with self.lock:
+            entry = self.entries.setdefault(ticker, {
+                'consecutive': 0, 'consecutive_empty': 0, 'total': 0, 'avg_cost': 0.0
+            })
+            entry['consecutive'] += 1
+            entry['total'] += 1
+            if reason == REASON_EMPTY:
+                entry['consecutive_empty'] += 1
+            elif reason != REASON_NO_DATA:
+                entry['consecutive_empty'] = 0
+            entry['last_reason'] = reason
+            entry['last_failure'] = now.isoformat(timespec='seconds')
+            entry['avg_cost'] = round(cost if not entry['avg_cost'] else 0.7 * entry['avg_cost'] + 0.3 * cost, 3)
+
+            if entry['consecutive'] >= 2:
+                hours = min(BACKOFF_BASE_HOURS * 2 ** (entry['consecutive'] - 2), BACKOFF_MAX_HOURS)
+                entry['next_retry'] = (now + timedelta(hours=hours)).isoformat(timespec='seconds')
+            else:
+                entry['next_retry'] = None
+
+            if entry['consecutive_empty'] >= self.quarantine_after and not entry.get('quarantined_at'):
+                entry['quarantined_at'] = now.isoformat(timespec='seconds')
+                logger.warning(f"🚫 Quarantined {ticker} after {entry['consecutive_empty']} empty responses")
+
+    def record_success(self, ticker: str):
+        with self.lock:
+            if self.entries.pop(ticker, None) is not None:
+                logger.info(f"♻️ {ticker} recovered, removed from failure ledger")
+
+    def release(self, tickers: Iterable[str] = None) -> int:
+        """Lift quarantine (all quarantined tickers when none are given)"""
+        with self.lock:
+            targets = list(tickers) if tickers is not None else self.quarantined()
+            released = 0
+            for ticker in targets:
+                if self.entries.pop(ticker, None) is not None:
+                    released += 1
+            return released
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            payload = {
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'quarantine_after': self.quarantine_after,
+                'tickers': self.entries,
+            }
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------ report
+
+    def report(self, skipped: Dict[str, List[str]]) -> Dict:
+        """Summary of what the ledger kept out of this run"""
+        quarantined = skipped.get('quarantined', [])
+        backoff = skipped.get('backoff', [])
+        return {
+            'quarantined_skipped': len(quarantined),
+            'backoff_skipped': len(backoff),
+            'quarantined_total': len(self.quarantined()),
+            'time_saved_seconds': round(self.estimated_cost(quarantined) + self.estimated_cost(backoff), 1),
+            'top_reasons': self._top_reasons(),
+        }
+
+    def _top_reasons(self, n: int = 5) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.entries.values():
+            reason = entry.get('last_reason', REASON_EMPTY)
+            counts[reason] = counts.get(reason, 0) + 1
+        return dict(sorted(counts.items(), key=lambda kv: -kv[1])[:n])
@@ -0,0 +1,145 @@
+# Fundamentals Cache (per-ticker quote summary fields, per-field TTL in trading sessions, size-bounded)
+import os
+import json
+import logging
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from engine.trading_calendar import last_completed_session, trading_days
+
+logger = logging.getLogger(__name__)
+
+# Sessions a field stays fresh after the session it was fetched in
+QUARTERLY_SESSIONS = 63
+DAILY_SESSIONS = 1
+# Analyst fields are daily unless FUNDAMENTALS_ANALYST_SESSIONS allows them to age longer
+ANALYST_SESSIONS = int(os.getenv('FUNDAMENTALS_ANALYST_SESSIONS', DAILY_SESSIONS))
+
+FIELD_TTLS: Dict[str, int] = {
+    # Financial statements (change with the quarterly report)
+    'revenueGrowth': QUARTERLY_SESSIONS,
+    'earningsGrowth': QUARTERLY_SESSIONS,
+    'profitMargins': QUARTERLY_SESSIONS,
+    'returnOnEquity': QUARTERLY_SESSIONS,
+    'trailingEps': QUARTERLY_SESSIONS,
+    'bookValue': QUARTERLY_SESSIONS,
+    'sharesOutstanding': QUARTERLY_SESSIONS,
+    'dividendRate': QUARTERLY_SESSIONS,
+    # Company profile
+    'longName': QUARTERLY_SESSIONS,
+    'shortName': QUARTERLY_SESSIONS,
+    'sector': QUARTERLY_SESSIONS,
+    # Analyst targets / recommendations / estimates
+    'targetMeanPrice': ANALYST_SESSIONS,
+    'recommendationKey': ANALYST_SESSIONS,
+    'numberOfAnalystOpinions': ANALYST_SESSIONS,
+    'forwardEps': ANALYST_SESSIONS,
+}
+# Prices, volumes and price-based ratios (P/E, P/B, market cap, yield); callers with a
+# local price history derive these instead of caching them
+DEFAULT_TTL = DAILY_SESSIONS
+
+# Least recently used tickers beyond this are dropped on save
+MAX_ENTRIES = 5000
+
+
+@lru_cache(maxsize=1024)
+def _sessions_since(fetched: str, session: str) -> int:
+    """Completed sessions after `fetched` up to and including `session`"""
+    if fetched >= session:
+        return 0
+    return len(trading_days(date.fromisoformat(fetched), date.fromisoformat(session))) - 1
+
+
+class FundamentalsCache:
+    """
+    Disk-backed cache of quote summary fields (data/fundamentals_cache.json)
+
+    {ticker: {fields: {name: value}, sessions: {name: YYYY-MM-DD}, accessed}}
+    A field is fresh until FIELD_TTLS[name] more sessions have completed since the
+    session it was fetched in; a lookup hits only when every requested field is fresh.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('tickers', {})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read fundamentals cache {path}: {e}")
+
+    def get(self, ticker: str, fields: Iterable[str], session: date = None) -> Optional[Dict]:
+        """Cached fields when all are fresh (counts hits / misses)"""
+        session = (session or last_completed_session()).isoformat()
+        with self.lock:
+            entry = self.entries.get(ticker)
+            fresh = entry is not None and all(
+                name in entry['sessions']
+                and _sessions_since(entry['sessions'][name], session) < FIELD_TTLS.get(name, DEFAULT_TTL)
+                for name in fields)
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry['accessed'] = datetime.now().isoformat(timespec='seconds')
+            return {name: entry['fields'].get(name) for name in fields}
+
+    def put(self, ticker: str, payload: Dict, fields: Iterable[str], session: date = None) -> int:
+        """
+        Store the requested fields a freshly fetched payload carries, returns fields stored
+        Missing values are not stamped, so a throttled / empty / partial response is
+        fetched again next time instead of being cached as fresh None
+        """
+        if not payload:
+            return 0
+        session = (session or last_completed_session()).isoformat()
+        stored = 0
+        with self.lock:
+            entry = self.entries.setdefault(ticker, {'fields': {}, 'sessions': {}})
+            for name in fields:
+                if payload.get(name) is None:
+                    continue
+                entry['fields'][name] = payload[name]
+                entry['sessions'][name] = session
+                stored += 1
+            entry['accessed'] = datetime.now().isoformat(timespec='seconds')
+        return stored
+
+    def stored(self, ticker: str, fields: Iterable[str]) -> Dict:
+        """Last stored value of each field regardless of age (None when never stored)"""
+        with self.lock:
+            values = self.entries.get(ticker, {}).get('fields', {})
+            return {name: values.get(name) for name in fields}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            if len(self.entries) > self.max_entries:
+                by_access = sorted(self.entries, key=lambda t: self.entries[t].get('accessed', ''))
+                for ticker in by_access[:len(self.entries) - self.max_entries]:
+                    del self.entries[ticker]
+                    self.evicted += 1
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'tickers': self.entries},
+                          f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def report(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self.entries),
+            'evicted': self.evicted,
+        }
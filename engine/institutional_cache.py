@@ -0,0 +1,125 @@
+# Institutional Data Cache (per-ticker ownership / short interest / insider data, quarter-aware TTL)
+import os
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from engine.trading_calendar import is_trading_day, next_trading_day, previous_trading_day
+
+logger = logging.getLogger(__name__)
+
+# 13F-HR is due 45 days after quarter end
+FILING_DEADLINE_DAYS = 45
+# FINRA short interest is published ~7 business days after the settlement date
+SHORT_INTEREST_LAG_DAYS = 7
+# Hard cap so insider transactions are refreshed at least weekly
+MAX_AGE_DAYS = 7
+
+
+def filing_quarter(today: date = None) -> str:
+    """Latest quarter end whose 13F filing deadline has passed (YYYY-MM-DD)"""
+    today = today or date.today()
+    year, quarter = today.year, (today.month - 1) // 3   # quarters fully ended this year
+    while True:
+        if quarter == 0:
+            year, quarter = year - 1, 4
+        end = date(year + (quarter == 4), quarter * 3 % 12 + 1, 1) - timedelta(days=1)
+        if end + timedelta(days=FILING_DEADLINE_DAYS) <= today:
+            return end.isoformat()
+        quarter -= 1
+
+
+def _settlement_dates(year: int, month: int):
+    """Mid-month and month-end short interest settlement dates (previous trading day if closed)"""
+    month_end = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    for d in (date(year, month, 15), month_end):
+        yield d if is_trading_day(d) else previous_trading_day(d)
+
+
+def short_interest_expiry(short_date: date) -> date:
+    """Publication date of the short interest report that follows `short_date`"""
+    year, month = short_date.year, short_date.month
+    for _ in range(3):
+        for settlement in _settlement_dates(year, month):
+            if settlement > short_date:
+                published = settlement
+                for _ in range(SHORT_INTEREST_LAG_DAYS):
+                    published = next_trading_day(published)
+                return published
+        year, month = year + (month == 12), month % 12 + 1
+    return short_date + timedelta(days=30)
+
+
+class InstitutionalCache:
+    """
+    Per-ticker cache of the slow institutional fetches (data/us_13f_cache.json)
+
+    {ticker: {data, quarter, short_date, expires, fetched, cost}}
+    An entry is fresh while its 13F quarter is still the latest filed quarter and
+    the next short interest report (or the weekly cap) has not come out.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('tickers', {})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read institutional cache {path}: {e}")
+
+    def get(self, ticker: str, quarter: str, today: date = None) -> Optional[Dict]:
+        """Cached data when still fresh (counts hits / misses)"""
+        today = today or date.today()
+        entry = self.entries.get(ticker)
+        fresh = (entry is not None and entry.get('quarter') == quarter
+                 and today < date.fromisoformat(entry['expires']))
+        with self.lock:
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.time_saved += entry.get('cost', 0.0)
+        return entry['data']
+
+    def put(self, ticker: str, data: Dict, quarter: str, short_date: Optional[date] = None,
+            cost: float = 0.0, today: date = None):
+        today = today or date.today()
+        expires = today + timedelta(days=MAX_AGE_DAYS)
+        if short_date is not None:
+            expires = min(expires, max(short_interest_expiry(short_date), today + timedelta(days=1)))
+        with self.lock:
+            self.entries[ticker] = {
+                'data': data,
+                'quarter': quarter,
+                'short_date': short_date.isoformat() if short_date else None,
+                'expires': expires.isoformat(),
+                'fetched': datetime.now().isoformat(timespec='seconds'),
+                'cost': round(cost, 3),
+            }
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self.lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'tickers': self.entries},
+                          f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def report(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'time_saved_seconds': round(self.time_saved, 1),
+            'entries': len(self.entries),
+        }
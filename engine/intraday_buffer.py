@@ -0,0 +1,285 @@
+# Intraday Bar Ring Buffers (1m / 5m per monitored ticker, in-process)
+import time
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from engine.market_data import get_provider
+from engine.trading_calendar import EST, is_market_open, is_trading_day, session_close
+
+logger = logging.getLogger(__name__)
+
+BAR_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+# Bars kept per interval: one full session of 1m bars, a week of 5m bars
+DEFAULT_CAPACITY = {'1m': 390, '5m': 390}
+
+# yfinance download period per interval
+POLL_PERIOD = {'1m': '1d', '5m': '5d'}
+
+
+class RingBuffer:
+    """
+    Fixed-size OHLCV bar buffer (oldest bars overwritten)
+    Timestamps are epoch seconds; pushing the latest timestamp again
+    replaces the in-progress bar instead of appending
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype='int64')
+        self.bars = np.full((capacity, len(BAR_FIELDS)), np.nan)
+        self.head = 0      # next write position
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self.ts[(self.head - 1) % self.capacity]) if self.count else None
+
+    def push(self, ts: int, bar) -> bool:
+        """Append (or update the last) bar, returns False for bars older than the last one"""
+        last = self.last_ts
+        if last is not None and ts < last:
+            return False
+        if last is not None and ts == last:
+            self.bars[(self.head - 1) % self.capacity] = bar
+            return True
+        self.ts[self.head] = ts
+        self.bars[self.head] = bar
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def last(self, n: int = None):
+        """(timestamps, bars) of the last n bars in chronological order"""
+        n = self.count if n is None else min(n, self.count)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.ts[idx], self.bars[idx]
+
+    def since(self, ts: int):
+        """(timestamps, bars) at or after an epoch second"""
+        stamps, bars = self.last()
+        start = int(np.searchsorted(stamps, ts, side='left'))
+        return stamps[start:], bars[start:]
+
+
+class IntradayStore:
+    """Per-ticker, per-interval ring buffers guarded by one lock"""
+
+    def __init__(self, tickers: Iterable[str], capacity: Dict[str, int] = None):
+        self.capacity = capacity or DEFAULT_CAPACITY
+        self.lock = threading.Lock()
+        self.buffers: Dict[str, Dict[str, RingBuffer]] = {}
+        self.updated_at: Optional[datetime] = None
+        for ticker in tickers:
+            self.add_ticker(ticker)
+
+    def add_ticker(self, ticker: str):
+        with self.lock:
+            if ticker not in self.buffers:
+                self.buffers[ticker] = {iv: RingBuffer(size) for iv, size in self.capacity.items()}
+
+    def tickers(self) -> List[str]:
+        return list(self.buffers)
+
+    def buffer(self, ticker: str, interval: str = '1m') -> Optional[RingBuffer]:
+        return self.buffers.get(ticker, {}).get(interval)
+
+    def ingest(self, ticker: str, interval: str, frame: pd.DataFrame) -> int:
+        """Push bars from a yfinance-style frame (Open/High/Low/Close/Volume), returns bars written"""
+        buf = self.buffer(ticker, interval)
+        if buf is None or frame is None or frame.empty:
+            return 0
+        frame = frame.dropna(subset=['Close'])
+        if frame.empty:
+            return 0
+        index = frame.index if frame.index.tz is not None else frame.index.tz_localize(EST)
+        stamps = index.as_unit('s').asi8
+        values = frame[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype='float64')
+
+        written = 0
+        with self.lock:
+            last = buf.last_ts
+            start = int(np.searchsorted(stamps, last, side='left')) if last is not None else 0
+            for ts, bar in zip(stamps[start:], values[start:]):
+                written += buf.push(int(ts), bar)
+            self.updated_at = datetime.now(EST)
+        return written
+
+    def session_bar(self, ticker: str, day=None) -> Optional[Dict]:
+        """Today's (or `day`'s) session OHLCV so far, aggregated from 1m bars"""
+        buf = self.buffer(ticker, '1m')
+        if buf is None or not len(buf):
+            return None
+        day = day or datetime.now(EST).date()
+        session_open = EST.localize(datetime(day.year, day.month, day.day, 9, 30))
+        close = session_close(day)
+        with self.lock:
+            stamps, bars = buf.since(int(session_open.timestamp()))
+        if close is not None:
+            regular = stamps < int(close.timestamp())
+            stamps, bars = stamps[regular], bars[regular]
+        if not len(stamps):
+            return None
+        return {
+            'date': day.strftime('%Y-%m-%d'),
+            'open': float(bars[0, 0]),
+            'high': float(np.nanmax(bars[:, 1])),
+            'low': float(np.nanmin(bars[:, 2])),
+            'close': float(bars[-1, 3]),
+            'volume': int(np.nansum(bars[:, 4])),
+            'as_of': datetime.fromtimestamp(int(stamps[-1]), EST).strftime('%H:%M'),
+        }
+
+
+class SessionContext:
+    """
+    Per-session daily context for each ticker (prior bar, moving averages, monthly high)
+
+    Loaded off the request path (IntradayPoller's context thread) through `loader(ticker, session)`,
+    which returns the context dict or None when the data is unavailable / incomplete.
+    Failures are remembered for the session and not retried; readers only see memory.
+    """
+
+    def __init__(self, loader: Callable[[str, str], Optional[Dict]]):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.session: Optional[str] = None
+        self.ready: Dict[str, Dict] = {}
+        self.failed: Dict[str, str] = {}
+
+    @staticmethod
+    def current_session() -> str:
+        return datetime.now(EST).strftime('%Y-%m-%d')
+
+    def _roll(self, session: str):
+        """Drop the previous session's contexts (caller holds the lock)"""
+        if session != self.session:
+            self.session = session
+            self.ready.clear()
+            self.failed.clear()
+
+    def get(self, ticker: str, session: str = None) -> Optional[Dict]:
+        with self.lock:
+            self._roll(session or self.current_session())
+            return self.ready.get(ticker)
+
+    def pending(self, tickers: Iterable[str], session: str = None) -> List[str]:
+        """Tickers whose context is neither loaded nor failed this session"""
+        with self.lock:
+            self._roll(session or self.current_session())
+            return [t for t in tickers if t not in self.ready and t not in self.failed]
+
+    def unavailable(self, session: str = None) -> Dict[str, str]:
+        with self.lock:
+            self._roll(session or self.current_session())
+            return dict(self.failed)
+
+    def warm(self, tickers: Iterable[str], session: str = None, stop_event: threading.Event = None) -> int:
+        """Load the pending tickers once for the session, returns contexts loaded"""
+        session = session or self.current_session()
+        loaded = 0
+        for ticker in self.pending(tickers, session):
+            if stop_event is not None and stop_event.is_set():
+                break
+            try:
+                ctx = self.loader(ticker, session)
+                reason = None if ctx else 'incomplete'
+            except Exception as e:
+                ctx, reason = None, str(e)
+            with self.lock:
+                if self.session != session:
+                    break
+                if ctx:
+                    self.ready[ticker] = ctx
+                    loaded += 1
+                else:
+                    self.failed[ticker] = reason
+                    logger.warning(f"⚠️ No daily context for {ticker} this session: {reason}")
+        return loaded
+
+
+class IntradayPoller:
+    """
+    Background thread that keeps an IntradayStore filled
+    - 1m bars every `interval` seconds, 5m bars every 5th cycle
+    - One multi-ticker download per interval; idles outside market hours
+    - With a SessionContext, a second thread loads each ticker's daily context once per session
+      (paced by its own rate limit, so slow context loads never delay the bar polls)
+    """
+
+    def __init__(self, store: IntradayStore, interval: int = 60, provider=None,
+                 context: SessionContext = None):
+        self.store = store
+        self.interval = interval
+        self.provider = provider or get_provider('yfinance')
+        self.context = context
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.context_thread: Optional[threading.Thread] = None
+        self.cycles = 0
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name='intraday-poller', daemon=True)
+        self.thread.start()
+        if self.context is not None:
+            self.context_thread = threading.Thread(target=self._context_loop, name='daily-context', daemon=True)
+            self.context_thread.start()
+        logger.info(f"✅ Intraday poller started ({len(self.store.tickers())} tickers, every {self.interval}s)")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def poll(self, intervals: Iterable[str] = ('1m',)) -> int:
+        """Fetch the latest bars once, returns bars written"""
+        tickers = self.store.tickers()
+        written = 0
+        for iv in intervals:
+            data = self.provider.download(tickers, period=POLL_PERIOD[iv], interval=iv,
+                                          group_by='ticker', auto_adjust=False, threads=False, progress=False)
+            if data is None or data.empty:
+                continue
+            for ticker in tickers:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    frame = data[ticker]
+                else:
+                    frame = data
+                written += self.store.ingest(ticker, iv, frame)
+        return written
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            started = time.time()
+            now = datetime.now(EST)
+            if is_market_open(now) or (self.cycles == 0 and is_trading_day(now)):
+                try:
+                    intervals = ('1m', '5m') if self.cycles % 5 == 0 else ('1m',)
+                    self.poll(intervals)
+                except Exception as e:
+                    logger.warning(f"⚠️ Intraday poll failed: {e}")
+                self.cycles += 1
+            self.stop_event.wait(max(1.0, self.interval - (time.time() - started)))
+
+    def _context_loop(self):
+        while not self.stop_event.is_set():
+            if is_trading_day(datetime.now(EST)):
+                try:
+                    self.context.warm(self.store.tickers(), stop_event=self.stop_event)
+                except Exception as e:
+                    logger.warning(f"⚠️ Daily context warm-up failed: {e}")
+            self.stop_event.wait(self.interval)
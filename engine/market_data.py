@@ -0,0 +1,322 @@
+# Market Data Providers (yfinance / Alpha Vantage / Finnhub / SEC EDGAR / local fixtures)
+import os
+import re
+import glob
+import json
+import pickle
+import hashlib
+import logging
+import threading
+import requests
+import pandas as pd
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from engine.rate_limit import throttle
+
+logger = logging.getLogger(__name__)
+
+# Environment switches (inherited by every script started from update_all.py)
+MODE_ENV = 'MARKET_DATA_MODE'           # live | record | replay
+FIXTURES_ENV = 'MARKET_DATA_FIXTURES'   # fixture directory for record / replay
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'fixtures', 'market_data')
+
+OptionChain = namedtuple('OptionChain', ['calls', 'puts'])
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot serve a request"""
+
+
+class MarketDataProvider:
+    """
+    Common interface for market data backends
+    Backends implement the calls they support; the rest raise ProviderError
+    """
+
+    name = 'base'
+    host = None     # request budget shared across threads (engine.rate_limit)
+
+    def history(self, ticker: str, **kwargs) -> pd.DataFrame:
+        """Daily (or interval) OHLCV history for one ticker"""
+        raise ProviderError(f"{self.name} does not support history")
+
+    def download(self, tickers: List[str], **kwargs) -> pd.DataFrame:
+        """OHLCV history for many tickers in one call"""
+        raise ProviderError(f"{self.name} does not support download")
+
+    def info(self, ticker: str) -> Dict:
+        """Company / quote summary"""
+        raise ProviderError(f"{self.name} does not support info")
+
+    def ticker_data(self, ticker: str, attr: str):
+        """Other per-ticker datasets (insider_transactions, institutional_holders, options, news, ...)"""
+        raise ProviderError(f"{self.name} does not support {attr}")
+
+    def option_chain(self, ticker: str, expiry: str) -> OptionChain:
+        raise ProviderError(f"{self.name} does not support option_chain")
+
+    def query(self, endpoint: str, **params) -> Dict:
+        """Raw JSON endpoint of a REST backend"""
+        raise ProviderError(f"{self.name} does not support query")
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Every call takes a token from the shared 'yahoo' budget (engine.rate_limit)"""
+    name = 'yfinance'
+    host = 'yahoo'
+
+    def history(self, ticker: str, **kwargs) -> pd.DataFrame:
+        import yfinance as yf
+        throttle(self.host)
+        return yf.Ticker(ticker).history(**kwargs)
+
+    def download(self, tickers: List[str], **kwargs) -> pd.DataFrame:
+        import yfinance as yf
+        kwargs.setdefault('progress', False)
+        throttle(self.host)
+        return yf.download(tickers, **kwargs)
+
+    def info(self, ticker: str) -> Dict:
+        import yfinance as yf
+        throttle(self.host)
+        return yf.Ticker(ticker).info
+
+    def ticker_data(self, ticker: str, attr: str):
+        import yfinance as yf
+        throttle(self.host)
+        return getattr(yf.Ticker(ticker), attr)
+
+    def option_chain(self, ticker: str, expiry: str) -> OptionChain:
+        import yfinance as yf
+        throttle(self.host)
+        chain = yf.Ticker(ticker).option_chain(expiry)
+        return OptionChain(chain.calls, chain.puts)
+
+
+class AlphaVantageProvider(MarketDataProvider):
+    name = 'alphavantage'
+    host = 'alphavantage'
+    base_url = "https://www.alphavantage.co/query"
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or os.getenv("ALPHA_VANTAGE_API_KEY")
+
+    def query(self, endpoint: str, **params) -> Dict:
+        params = {'function': endpoint, 'apikey': self.api_key, **params}
+        throttle(self.host)
+        resp = requests.get(self.base_url, params=params, timeout=10)
+        return resp.json()
+
+    def history(self, ticker: str, **kwargs) -> pd.DataFrame:
+        data = self.query('TIME_SERIES_DAILY', symbol=ticker, outputsize=kwargs.get('outputsize', 'compact'))
+        ts = data.get('Time Series (Daily)', {})
+        if not ts:
+            return pd.DataFrame()
+        df = pd.DataFrame.from_dict(ts, orient='index').astype(float)
+        df.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        df.index = pd.to_datetime(df.index)
+        df.index.name = 'Date'
+        return df.sort_index()
+
+
+class FinnhubProvider(MarketDataProvider):
+    name = 'finnhub'
+    host = 'finnhub'
+    base_url = "https://finnhub.io/api/v1"
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or os.getenv("FINNHUB_API_KEY")
+
+    def query(self, endpoint: str, **params) -> Dict:
+        params = {**params, 'token': self.api_key}
+        throttle(self.host)
+        resp = requests.get(f"{self.base_url}/{endpoint}", params=params, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+
+    def info(self, ticker: str) -> Dict:
+        return self.query('stock/profile2', symbol=ticker)
+
+
+class SECEdgarProvider(MarketDataProvider):
+    """
+    SEC EDGAR (data.sec.gov JSON APIs + www.sec.gov filing archives)
+    query('submissions/CIK0001067983.json') -> JSON; non-JSON documents -> {'text': ...}
+    SEC asks for a descriptive User-Agent and at most 10 requests / second ('sec' budget)
+    """
+    name = 'sec'
+    host = 'sec'
+
+    def __init__(self, user_agent: str = None):
+        self.user_agent = user_agent or os.getenv('SEC_USER_AGENT', 'StockAnalysis/1.0 (contact@example.com)')
+
+    def query(self, endpoint: str, **params) -> Dict:
+        host = 'www.sec.gov' if endpoint.startswith(('Archives/', 'files/', 'cgi-bin/')) else 'data.sec.gov'
+        headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'gzip, deflate', 'Host': host}
+        throttle(self.host)
+        resp = requests.get(f"https://{host}/{endpoint}", params=params or None, headers=headers, timeout=30)
+        resp.raise_for_status()
+        if endpoint.endswith('.json'):
+            return resp.json()
+        return {'text': resp.text}
+
+
+# ---------------------------------------------------------------------- record / replay
+
+# Date-valued kwargs are the only ones replay may ignore
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+
+def _normalize(value):
+    """Make call arguments stable across runs (dates collapse to the day)"""
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return pd.Timestamp(value).strftime('%Y-%m-%d')
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items()) if k != 'apikey' and k != 'token'}
+    return value
+
+
+def _is_date(value) -> bool:
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return True
+    return isinstance(value, str) and bool(DATE_RE.match(value))
+
+
+def _digest(payload) -> str:
+    key = json.dumps(payload, default=str, sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def _fixture_path(root: str, provider: str, method: str, args: tuple, kwargs: Dict) -> str:
+    """
+    {root}/{provider}/{method}/{label}__{target}__{exact}.pkl
+    target hashes the call without its date kwargs (start / end / from / to),
+    exact hashes the full call
+    """
+    target = _digest([method, _normalize(list(args)),
+                      _normalize({k: v for k, v in kwargs.items() if not _is_date(v)})])
+    exact = _digest([method, _normalize(list(args)), _normalize(kwargs)])
+    first = args[0] if args else 'all'
+    label = '+'.join(first[:3]) if isinstance(first, (list, tuple)) else str(first)
+    label = ''.join(c if c.isalnum() or c in '-_.+' else '_' for c in label)[:40]
+    return os.path.join(root, provider, method, f'{label}__{target}__{exact}.pkl')
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Local-fixture backend (replay): serves responses saved by RecordingProvider
+    Never touches the network. When the exact arguments differ only in their dates
+    (e.g. a later end date) it falls back to the newest recording of the same call;
+    any other difference (attribute, symbol, period, ...) raises ProviderError.
+    """
+
+    def __init__(self, provider_name: str, root: str = None):
+        self.name = provider_name
+        self.root = root or os.getenv(FIXTURES_ENV, DEFAULT_FIXTURES_DIR)
+
+    def _load(self, method: str, args: tuple, kwargs: Dict):
+        path = _fixture_path(self.root, self.name, method, args, kwargs)
+        if not os.path.exists(path):
+            prefix = os.path.basename(path).rsplit('__', 1)[0]
+            candidates = glob.glob(os.path.join(os.path.dirname(path), f'{glob.escape(prefix)}__*.pkl'))
+            if not candidates:
+                raise ProviderError(f"No fixture for {self.name}.{method}{args} {kwargs}")
+            path = max(candidates, key=os.path.getmtime)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def history(self, ticker, **kwargs):
+        return self._load('history', (ticker,), kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._load('download', (tickers,), kwargs)
+
+    def info(self, ticker):
+        return self._load('info', (ticker,), {})
+
+    def ticker_data(self, ticker, attr):
+        return self._load('ticker_data', (ticker, attr), {})
+
+    def option_chain(self, ticker, expiry):
+        return self._load('option_chain', (ticker, expiry), {})
+
+    def query(self, endpoint, **params):
+        return self._load('query', (endpoint,), params)
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps a live provider and saves every successful response to the fixture directory"""
+
+    def __init__(self, inner: MarketDataProvider, root: str = None):
+        self.inner = inner
+        self.name = inner.name
+        self.root = root or os.getenv(FIXTURES_ENV, DEFAULT_FIXTURES_DIR)
+
+    def _record(self, method: str, args: tuple, kwargs: Dict):
+        result = getattr(self.inner, method)(*args, **kwargs)
+        path = _fixture_path(self.root, self.name, method, args, kwargs)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f)
+        os.replace(tmp_path, path)
+        return result
+
+    def history(self, ticker, **kwargs):
+        return self._record('history', (ticker,), kwargs)
+
+    def download(self, tickers, **kwargs):
+        return self._record('download', (tickers,), kwargs)
+
+    def info(self, ticker):
+        return self._record('info', (ticker,), {})
+
+    def ticker_data(self, ticker, attr):
+        return self._record('ticker_data', (ticker, attr), {})
+
+    def option_chain(self, ticker, expiry):
+        return self._record('option_chain', (ticker, expiry), {})
+
+    def query(self, endpoint, **params):
+        return self._record('query', (endpoint,), params)
+
+
+# ---------------------------------------------------------------------- factory
+
+LIVE_PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'alphavantage': AlphaVantageProvider,
+    'finnhub': FinnhubProvider,
+    'sec': SECEdgarProvider,
+}
+
+_providers: Dict[str, MarketDataProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str = 'yfinance', mode: str = None) -> MarketDataProvider:
+    """
+    Return the provider for a backend according to MARKET_DATA_MODE
+    - live:   call the backend directly (default)
+    - record: call the backend and save responses under MARKET_DATA_FIXTURES
+    - replay: serve saved responses only (offline, deterministic)
+    """
+    mode = (mode or os.getenv(MODE_ENV, 'live')).lower()
+    key = f'{name}:{mode}'
+    with _providers_lock:
+        if key not in _providers:
+            if name not in LIVE_PROVIDERS:
+                raise ProviderError(f"Unknown market data provider: {name}")
+            if mode == 'replay':
+                provider = FixtureProvider(name)
+            elif mode == 'record':
+                provider = RecordingProvider(LIVE_PROVIDERS[name]())
+            else:
+                provider = LIVE_PROVIDERS[name]()
+            _providers[key] = provider
+        return _providers[key]
@@ -0,0 +1,204 @@
+# Shared OHLCV Panel (dates x tickers x fields, memory-mapped)
+import os
+import glob
+import json
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from engine.price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+# Panel field order -> price store column
+PANEL_FIELDS = {
+    'open': 'open',
+    'high': 'high',
+    'low': 'low',
+    'close': 'current_price',
+    'volume': 'volume',
+}
+
+
+class FieldView:
+    """Ticker-indexed view of one panel field: panel.close['AAPL'] -> np.ndarray over dates"""
+
+    def __init__(self, panel: 'PricePanel', field: str):
+        self.panel = panel
+        self.field_idx = panel.field_index[field]
+
+    def __getitem__(self, ticker: str) -> np.ndarray:
+        return self.panel.data[:, self.panel.ticker_index[ticker], self.field_idx]
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.panel.ticker_index
+
+    def matrix(self, tickers: Iterable[str] = None) -> np.ndarray:
+        """dates x tickers matrix for this field"""
+        if tickers is None:
+            return self.panel.data[:, :, self.field_idx]
+        cols = [self.panel.ticker_index[t] for t in tickers]
+        return self.panel.data[:, cols, self.field_idx]
+
+
+class PricePanel:
+    """
+    Read-only OHLCV panel shared by analyzers and Flask workers
+
+    - <path>.<version>.npy   float64 array shaped (dates, tickers, fields), NaN where no bar
+    - <path>.json            dates / tickers / fields index, the data file it belongs to and
+                             the price store manifest mtime it was built from
+    A rebuild writes a new data version, then switches with a single rename of the index,
+    so readers never pair a new index with an old matrix.
+    Opened with mmap_mode='r' so every process shares the same page cache (zero-copy)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_file = path + '.json'
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        self.data_file = _data_file(path, index)
+        self.source_mtime = index.get('source_mtime')
+        self.data = np.load(self.data_file, mmap_mode='r')
+        self.dates = pd.DatetimeIndex(index['dates'])
+        self.tickers: List[str] = index['tickers']
+        self.fields: List[str] = index['fields']
+        self.ticker_index: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+        self.field_index: Dict[str, int] = {f: i for i, f in enumerate(self.fields)}
+        if self.data.shape != (len(self.dates), len(self.tickers), len(self.fields)):
+            raise ValueError(f"Panel index does not match data shape: {self.data_file}")
+        self.mtime = os.path.getmtime(self.index_file)
+
+        self.open = FieldView(self, 'open')
+        self.high = FieldView(self, 'high')
+        self.low = FieldView(self, 'low')
+        self.close = FieldView(self, 'close')
+        self.volume = FieldView(self, 'volume')
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(path + '.json')
+
+    def stale(self, manifest_file: str) -> bool:
+        """True when the price store changed after this panel was built"""
+        if not os.path.exists(manifest_file):
+            return False
+        return self.source_mtime is None or os.path.getmtime(manifest_file) > self.source_mtime
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.ticker_index
+
+    def field(self, name: str) -> FieldView:
+        return FieldView(self, name)
+
+    def valid_rows(self, ticker: str) -> np.ndarray:
+        """Row positions where the ticker has a bar"""
+        return np.flatnonzero(~np.isnan(self.close[ticker]))
+
+    def window(self, ticker: str, n: int, field: str = 'close') -> np.ndarray:
+        """Last n available values of a field for a ticker"""
+        rows = self.valid_rows(ticker)[-n:]
+        return self.data[rows, self.ticker_index[ticker], self.field_index[field]]
+
+    def frame(self, ticker: str, n: int = None, start=None) -> pd.DataFrame:
+        """yfinance-style OHLCV DataFrame (Open/High/Low/Close/Volume) indexed by Date"""
+        rows = self.valid_rows(ticker)
+        if start is not None:
+            rows = rows[self.dates[rows] >= pd.Timestamp(start)]
+        if n is not None:
+            rows = rows[-n:]
+        values = self.data[rows, self.ticker_index[ticker], :]
+        df = pd.DataFrame(values, index=self.dates[rows], columns=[f.capitalize() for f in self.fields])
+        df.index.name = 'Date'
+        return df
+
+    @classmethod
+    def build(cls, store: PriceStore, path: str, tickers: Iterable[str] = None, start=None) -> 'PricePanel':
+        """Build the panel from the price store and write it atomically"""
+        tickers = [t for t in (tickers or store.tickers()) if store.row_count(t) > 0]
+        columns = list(PANEL_FIELDS.values())
+
+        per_ticker = {t: store.read_ticker(t, ['date'] + columns, start=start) for t in tickers}
+        all_days = [np.asarray(a['date']) for a in per_ticker.values() if len(a['date'])]
+        days = np.unique(np.concatenate(all_days)) if all_days else np.empty(0, dtype='int64')
+
+        source_mtime = os.path.getmtime(store.manifest_file) if os.path.exists(store.manifest_file) else None
+        data_file = f'{path}.{time.time_ns():x}.npy'
+        data = np.lib.format.open_memmap(data_file, mode='w+', dtype='float64',
+                                         shape=(len(days), len(tickers), len(PANEL_FIELDS)))
+        data[:] = np.nan
+        for j, ticker in enumerate(tickers):
+            arrays = per_ticker[ticker]
+            rows = np.searchsorted(days, arrays['date'])
+            for k, column in enumerate(columns):
+                data[rows, j, k] = arrays[column]
+        data.flush()
+        del data
+
+        previous = None
+        if PricePanel.exists(path):
+            with open(path + '.json', 'r', encoding='utf-8') as f:
+                previous = _data_file(path, json.load(f))
+        index = {
+            'data': os.path.basename(data_file),
+            'source_mtime': source_mtime,
+            'dates': [str(d) for d in days.astype('datetime64[D]')],
+            'tickers': tickers,
+            'fields': list(PANEL_FIELDS.keys()),
+        }
+        with open(path + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(path + '.json.tmp', path + '.json')
+
+        # Keep the version readers may still be opening; older ones are unreferenced
+        for old_file in glob.glob(glob.escape(path) + '*.npy'):
+            if old_file not in (data_file, previous):
+                try:
+                    os.remove(old_file)
+                except OSError as e:
+                    logger.debug(f"Could not remove old panel data {old_file}: {e}")
+
+        logger.info(f"✅ Built price panel {len(days)} dates x {len(tickers)} tickers → {path}.npy")
+        return cls(path)
+
+
+def _data_file(path: str, index: Dict) -> str:
+    """Data file an index belongs to (panels built before versioning use <path>.npy)"""
+    if 'data' in index:
+        return os.path.join(os.path.dirname(path), index['data'])
+    return path + '.npy'
+
+
+def align_right(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Move each column's valid rows (in order) to the bottom, NaN padding on top
+    Column-wise indicators then match a per-ticker history of only its own bars
+    """
+    order = np.argsort(valid, axis=0, kind='stable')
+    return np.take_along_axis(np.where(valid, values, np.nan), order, axis=0)
+
+
+_open_panels: Dict[str, PricePanel] = {}
+
+
+def open_panel(path: str) -> Optional[PricePanel]:
+    """
+    Open (or reuse) a panel for this process
+    Re-opens automatically after the daily rebuild replaces the file
+    """
+    if not PricePanel.exists(path):
+        return None
+    panel = _open_panels.get(path)
+    if panel is None or os.path.getmtime(path + '.json') != panel.mtime:
+        panel = PricePanel(path)
+        _open_panels[path] = panel
+    return panel
+
+
+def default_panel_path(data_dir: str) -> str:
+    return os.path.join(data_dir, 'price_panel')
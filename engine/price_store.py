@@ -0,0 +1,385 @@
+# US Daily Price Store (columnar, append-only)
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stored columns and their on-disk dtypes (date = days since 1970-01-01)
+PRICE_COLUMNS = {
+    'date': 'int64',
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'current_price': 'float64',
+    'volume': 'int64',
+}
+
+# Columns derived at read time from current_price
+DERIVED_COLUMNS = ['change', 'change_rate']
+
+# Per-ticker metadata columns kept in the manifest
+META_COLUMNS = ['name', 'market']
+
+# Columns a corporate action re-adjustment rewrites
+PRICE_FIELDS = ['open', 'high', 'low', 'current_price']
+
+# `market` of index / ETF series stored for reference (relative strength), not stocks
+BENCHMARK_MARKET = 'Benchmark'
+
+
+def _to_days(dates) -> np.ndarray:
+    """Convert dates to int64 days since epoch"""
+    values = pd.to_datetime(pd.Series(dates))
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    return values.values.astype('datetime64[D]').astype('int64')
+
+
+def _day(value) -> Optional[int]:
+    """Convert a single date-like value to int64 days since epoch"""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return int(np.datetime64(ts.normalize(), 'D').astype('int64'))
+
+
+class PriceStore:
+    """
+    Columnar daily price store partitioned by ticker
+
+    Layout:
+        <root>/manifest.json            schema + per-ticker row count / last date / name / market
+        <root>/<TICKER>/<column>.bin    raw little-endian column values, sorted by date
+        <root>/<TICKER>/adjustments.json  re-adjustments applied to the ticker (by key)
+
+    - Daily updates append only the new bars to each column file
+    - Re-adjustments stage whole columns, commit with a pending marker, then swap them in
+    - Readers memory-map just the tickers and columns they need and slice by date
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.manifest_file = os.path.join(root, 'manifest.json')
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.dirty = False
+
+    # ------------------------------------------------------------------ manifest
+
+    def _load_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'schema': PRICE_COLUMNS, 'tickers': {}}
+
+    def flush(self):
+        """
+        Persist the manifest (atomic replace) when something was written
+        The manifest mtime tells panel readers the store changed, so no-op runs leave it alone
+        """
+        if not self.dirty:
+            return
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_file, self.manifest_file)
+        self.dirty = False
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker)
+
+    def _column_file(self, ticker: str, column: str) -> str:
+        return os.path.join(self._ticker_dir(ticker), f'{column}.bin')
+
+    def _adjustments_file(self, ticker: str) -> str:
+        return os.path.join(self._ticker_dir(ticker), 'adjustments.json')
+
+    def _pending_file(self, ticker: str) -> str:
+        return os.path.join(self._ticker_dir(ticker), 'adjustment.pending.json')
+
+    def _write_json(self, path: str, payload: Dict):
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(path + '.tmp', path)
+
+    def applied_adjustments(self, ticker: str) -> List[Dict]:
+        path = self._adjustments_file(ticker)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _recover(self, ticker: str):
+        """
+        Finish a re-adjustment an interrupted run committed but did not swap in
+        Swaps are renames of staged files, so repeating them is safe
+        """
+        pending_file = self._pending_file(ticker)
+        if not os.path.exists(pending_file):
+            return
+        with open(pending_file, 'r', encoding='utf-8') as f:
+            pending = json.load(f)
+        for column in pending['columns']:
+            staged = self._column_file(ticker, column) + '.adj'
+            if os.path.exists(staged):
+                os.replace(staged, self._column_file(ticker, column))
+        applied = [a for a in self.applied_adjustments(ticker) if a['key'] != pending['key']]
+        self._write_json(self._adjustments_file(ticker), applied + [pending['adjustment']])
+        os.remove(pending_file)
+        self.dirty = True
+        logger.info(f"♻️ {ticker}: completed interrupted re-adjustment {pending['key']}")
+
+    # ------------------------------------------------------------------ metadata
+
+    def is_empty(self) -> bool:
+        return not self.manifest['tickers']
+
+    def tickers(self) -> List[str]:
+        return sorted(self.manifest['tickers'].keys())
+
+    def benchmarks(self) -> List[str]:
+        return sorted(t for t, meta in self.manifest['tickers'].items() if meta.get('market') == BENCHMARK_MARKET)
+
+    def stock_tickers(self) -> List[str]:
+        """Stored tickers without the benchmark series"""
+        return sorted(t for t, meta in self.manifest['tickers'].items() if meta.get('market') != BENCHMARK_MARKET)
+
+    def row_count(self, ticker: str) -> int:
+        return self.manifest['tickers'].get(ticker, {}).get('rows', 0)
+
+    def latest_dates(self) -> Dict[str, pd.Timestamp]:
+        """Latest stored date for each ticker (manifest only, no data reads)"""
+        return {
+            ticker: pd.Timestamp(meta['last_date'])
+            for ticker, meta in self.manifest['tickers'].items()
+            if meta.get('rows', 0) > 0
+        }
+
+    def get_meta(self, ticker: str) -> Dict:
+        return self.manifest['tickers'].get(ticker, {})
+
+    # ------------------------------------------------------------------ writes
+
+    def _prepare(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Convert a price frame to typed column arrays sorted by date"""
+        df = df.dropna(subset=['current_price'])
+        days = _to_days(df['date'])
+        order = np.argsort(days, kind='stable')
+        arrays = {'date': days[order]}
+        for column, dtype in PRICE_COLUMNS.items():
+            if column == 'date':
+                continue
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy()[order]
+            if np.issubdtype(np.dtype(dtype), np.integer):
+                values = np.nan_to_num(values, nan=0)
+            arrays[column] = values.astype(dtype)
+        # Drop duplicate dates inside the batch (keep last)
+        if len(arrays['date']) > 1:
+            keep = np.append(arrays['date'][1:] != arrays['date'][:-1], True)
+            arrays = {k: v[keep] for k, v in arrays.items()}
+        return arrays
+
+    def _update_meta(self, ticker: str, rows: int, first_day: int, last_day: int, df: pd.DataFrame):
+        meta = self.manifest['tickers'].setdefault(ticker, {})
+        self.dirty = True
+        meta['rows'] = rows
+        meta['first_date'] = str(np.datetime64(first_day, 'D'))
+        meta['last_date'] = str(np.datetime64(last_day, 'D'))
+        for column in META_COLUMNS:
+            if column in df.columns and len(df) > 0:
+                meta[column] = str(df[column].iloc[-1])
+
+    def _truncate(self, ticker: str, rows: int):
+        """Drop bytes past the manifest row count (left by an interrupted append)"""
+        for column, dtype in PRICE_COLUMNS.items():
+            path = self._column_file(ticker, column)
+            size = rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def append(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Append new bars for a ticker
+        Only rows dated after the last stored date are written
+        Returns number of rows appended
+        """
+        if df is None or df.empty:
+            return 0
+
+        arrays = self._prepare(df)
+        meta = self.manifest['tickers'].get(ticker)
+        rows = meta['rows'] if meta else 0
+
+        if rows > 0:
+            last_day = _day(meta['last_date'])
+            mask = arrays['date'] > last_day
+            arrays = {k: v[mask] for k, v in arrays.items()}
+
+        if len(arrays['date']) == 0:
+            return 0
+
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        self._recover(ticker)
+        self._truncate(ticker, rows)
+        for column in PRICE_COLUMNS:
+            with open(self._column_file(ticker, column), 'ab') as f:
+                arrays[column].tofile(f)
+
+        first_day = _day(meta['first_date']) if rows > 0 else int(arrays['date'][0])
+        self._update_meta(ticker, rows + len(arrays['date']), first_day, int(arrays['date'][-1]), df)
+        return len(arrays['date'])
+
+    def replace(self, ticker: str, df: pd.DataFrame) -> int:
+        """Rewrite a ticker's full history (full refresh / re-adjustment)"""
+        if df is None or df.empty:
+            return 0
+
+        arrays = self._prepare(df)
+        if len(arrays['date']) == 0:
+            return 0
+
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        self._recover(ticker)
+        for column in PRICE_COLUMNS:
+            path = self._column_file(ticker, column)
+            arrays[column].tofile(path + '.tmp')
+            os.replace(path + '.tmp', path)
+
+        self._update_meta(ticker, len(arrays['date']), int(arrays['date'][0]), int(arrays['date'][-1]), df)
+        return len(arrays['date'])
+
+    def adjust(self, ticker: str, price_factor: float, volume_factor: float = 1.0, before=None,
+               key: str = None) -> int:
+        """
+        Re-adjust stored history (split / dividend)
+        Prices are multiplied by price_factor and volumes by volume_factor
+        for rows dated before `before` (all rows when None). Returns rows touched
+
+        Crash safe and idempotent per `key`: the adjusted columns are staged in full, a pending
+        marker commits them, then they are swapped in and the key is logged as applied.
+        An adjustment whose key is already applied (or committed) is not applied again.
+        """
+        rows = self.row_count(ticker)
+        if rows == 0:
+            return 0
+        self._recover(ticker)
+        if key is not None and any(a['key'] == key for a in self.applied_adjustments(ticker)):
+            logger.info(f"⏭️ {ticker}: re-adjustment {key} already applied")
+            return 0
+
+        dates = np.memmap(self._column_file(ticker, 'date'), dtype=PRICE_COLUMNS['date'], mode='r', shape=(rows,))
+        hi = int(np.searchsorted(dates, _day(before), side='left')) if before is not None else rows
+        if hi == 0:
+            return 0
+
+        columns = PRICE_FIELDS + (['volume'] if volume_factor != 1.0 else [])
+        for column in columns:
+            dtype = PRICE_COLUMNS[column]
+            data = np.array(np.memmap(self._column_file(ticker, column), dtype=dtype, mode='r', shape=(rows,)))
+            if column == 'volume':
+                data[:hi] = np.round(data[:hi] * volume_factor).astype(dtype)
+            else:
+                data[:hi] *= price_factor
+            data.tofile(self._column_file(ticker, column) + '.adj')
+
+        adjustment = {'key': key or f'{price_factor:.10g}x{volume_factor:.10g}<{before}',
+                      'price_factor': price_factor, 'volume_factor': volume_factor,
+                      'before': None if before is None else str(before), 'rows': hi}
+        self._write_json(self._pending_file(ticker),
+                         {'key': adjustment['key'], 'columns': columns, 'adjustment': adjustment})
+        self._recover(ticker)
+        return hi
+
+    def import_csv(self, csv_file: str) -> int:
+        """One-time migration from the legacy us_daily_prices.csv"""
+        logger.info(f"📦 Migrating {csv_file} into price store...")
+        df = pd.read_csv(csv_file)
+        total = 0
+        for ticker, group in df.groupby('ticker', sort=False):
+            total += self.replace(ticker, group)
+        self.flush()
+        logger.info(f"✅ Migrated {total} rows for {df['ticker'].nunique()} tickers")
+        return total
+
+    # ------------------------------------------------------------------ reads
+
+    def read_ticker(self, ticker: str, columns: Iterable[str] = None,
+                    start=None, end=None, lookback: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Read stored columns for one ticker as (memory-mapped) arrays
+        - start/end: inclusive date bounds
+        - lookback: extra rows to include before start (for diff-based columns)
+        """
+        rows = self.row_count(ticker)
+        columns = list(columns) if columns else list(PRICE_COLUMNS)
+        if rows == 0:
+            return {c: np.empty(0, dtype=PRICE_COLUMNS[c]) for c in columns}
+
+        dates = np.memmap(self._column_file(ticker, 'date'), dtype=PRICE_COLUMNS['date'], mode='r', shape=(rows,))
+        lo = int(np.searchsorted(dates, _day(start), side='left')) if start is not None else 0
+        hi = int(np.searchsorted(dates, _day(end), side='right')) if end is not None else rows
+        lo = max(0, lo - lookback)
+
+        out = {}
+        for column in columns:
+            if column == 'date':
+                out[column] = dates[lo:hi]
+            else:
+                data = np.memmap(self._column_file(ticker, column), dtype=PRICE_COLUMNS[column], mode='r', shape=(rows,))
+                out[column] = data[lo:hi]
+        return out
+
+    def load(self, tickers: Iterable[str] = None, columns: Iterable[str] = None,
+             start=None, end=None) -> pd.DataFrame:
+        """
+        Load prices in the long format of the legacy CSV
+        (ticker, date, open, high, low, current_price, volume, change, change_rate, name, market)
+        Only the requested tickers, columns and date range are read
+        """
+        tickers = list(tickers) if tickers is not None else self.tickers()
+        wanted = list(columns) if columns else list(PRICE_COLUMNS) + DERIVED_COLUMNS + META_COLUMNS
+        stored = [c for c in PRICE_COLUMNS if c in wanted and c != 'date']
+        derived = [c for c in DERIVED_COLUMNS if c in wanted]
+        meta_cols = [c for c in META_COLUMNS if c in wanted]
+        if derived and 'current_price' not in stored:
+            stored.append('current_price')
+
+        frames = []
+        for ticker in tickers:
+            arrays = self.read_ticker(ticker, ['date'] + stored, start, end, lookback=1 if derived else 0)
+            if len(arrays['date']) == 0:
+                continue
+
+            frame = pd.DataFrame({c: np.asarray(arrays[c]) for c in stored})
+            frame.insert(0, 'date', np.asarray(arrays['date']).astype('datetime64[D]').astype('datetime64[ns]'))
+            frame.insert(0, 'ticker', ticker)
+
+            if derived:
+                close = frame['current_price']
+                if 'change' in derived:
+                    frame['change'] = close.diff()
+                if 'change_rate' in derived:
+                    frame['change_rate'] = close.pct_change() * 100
+                if start is not None:
+                    frame = frame[frame['date'] >= pd.Timestamp(start)]
+
+            meta = self.get_meta(ticker)
+            for column in meta_cols:
+                frame[column] = meta.get(column, ticker if column == 'name' else 'N/A')
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['ticker', 'date'] + stored + derived + meta_cols)
+
+        df = pd.concat(frames, ignore_index=True)
+        if columns:
+            keep = ['ticker', 'date'] + [c for c in wanted if c in df.columns and c not in ('ticker', 'date')]
+            df = df[keep]
+        return df
@@ -0,0 +1,82 @@
+# Per-Host Request Budget (thread-safe token buckets shared by all providers in a process)
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# host -> (requests per second, burst); override with RATE_LIMIT_<HOST>=rate[:burst]
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    'yahoo': (5.0, 10.0),
+    'sec': (10.0, 10.0),      # SEC fair access policy: max 10 requests / second
+    'alphavantage': (5 / 60, 5.0),   # free tier: 5 requests / minute (premium keys: RATE_LIMIT_ALPHAVANTAGE)
+}
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` tokens per second refill up to `burst`
+    acquire() blocks until a token is available, so concurrent workers share one budget
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping as long as needed; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.acquired += 1
+                    self.waited += waited
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def stats(self) -> Dict:
+        return {'rate': self.rate, 'burst': self.burst, 'acquired': self.acquired,
+                'waited_seconds': round(self.waited, 2)}
+
+
+_limiters: Dict[str, Optional[TokenBucket]] = {}
+_limiters_lock = threading.Lock()
+
+
+def _configured(host: str) -> Optional[Tuple[float, float]]:
+    value = os.getenv(f'RATE_LIMIT_{host.upper()}')
+    if not value:
+        return DEFAULT_LIMITS.get(host)
+    rate, _, burst = value.partition(':')
+    return float(rate), float(burst) if burst else None
+
+
+def get_limiter(host: str) -> Optional[TokenBucket]:
+    """Shared bucket for a host (None when the host has no budget configured)"""
+    with _limiters_lock:
+        if host not in _limiters:
+            limits = _configured(host)
+            _limiters[host] = TokenBucket(*limits) if limits else None
+        return _limiters[host]
+
+
+def throttle(host: str) -> float:
+    """Wait for the host's budget (no-op for unlimited hosts)"""
+    limiter = get_limiter(host)
+    return limiter.acquire() if limiter is not None else 0.0
@@ -0,0 +1,42 @@
+# Supply/Demand Score History (dates x tickers, one float32 matrix per field)
+import os
+from typing import Dict, Optional
+
+from engine.date_ticker_store import DateTickerStore
+
+# Score and the components it is built from (VolumeAnalyzer.score_features output columns)
+HISTORY_FIELDS = [
+    'supply_demand_score',
+    'obv_change_20d',
+    'ad_change_20d',
+    'mfi',
+    'vol_ratio_5d_20d',
+    'surge_count_5d',
+    'surge_count_20d',
+]
+
+
+class ScoreHistory(DateTickerStore):
+    """Daily supply/demand score and components per ticker (written by analyze_volume.py)"""
+
+    def __init__(self, root: str):
+        super().__init__(root, HISTORY_FIELDS, dtype='float32')
+
+
+_histories: Dict[str, ScoreHistory] = {}
+
+
+def open_history(root: str) -> Optional[ScoreHistory]:
+    """Shared read handle for this process (reloaded after the daily write)"""
+    index_file = os.path.join(root, 'index.json')
+    if not os.path.exists(index_file):
+        return None
+    history = _histories.get(root)
+    if history is None or history.mtime != os.path.getmtime(index_file):
+        history = ScoreHistory(root)
+        _histories[root] = history
+    return history
+
+
+def default_history_path(data_dir: str) -> str:
+    return os.path.join(data_dir, 'score_history')
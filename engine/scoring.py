@@ -0,0 +1,83 @@
+# Declarative Scoring (threshold rules compiled to vectorized NumPy select / digitize)
+import numpy as np
+from typing import Callable, Dict, List, Mapping, Sequence
+
+OPS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+
+def _length(features: Mapping) -> int:
+    return len(next(iter(features.values()))) if isinstance(features, dict) else len(features)
+
+
+def _mask(features: Mapping, conditions: Dict) -> np.ndarray:
+    """AND of {feature: (op, value) | [(op, value), ...]} (NaN never matches)"""
+    mask = True
+    with np.errstate(invalid='ignore'):
+        for name, tests in conditions.items():
+            values = np.asarray(features[name])
+            for op, value in ([tests] if isinstance(tests, tuple) else tests):
+                mask = mask & OPS[op](values, value)
+    return np.asarray(mask, dtype=bool)
+
+
+def _compile(rule) -> Callable[[Mapping, int], np.ndarray]:
+    """Ladder -> np.select (first matching rule wins, else 0)"""
+    def points_for(features, n):
+        conditions = [np.broadcast_to(_mask(features, cond), (n,)) for cond, _ in rule]
+        return np.select(conditions, [pts for _, pts in rule], 0)
+    return points_for
+
+
+class ScoreCard:
+    """
+    Score = base + sum of component points, clipped; every ticker in one pass
+
+    spec = {'base': 50, 'clip': (0, 100), 'components': {name: rule}}
+      rule:        [(conditions, points), ...]    first match wins (np.select), else 0
+      conditions:  {feature: (op, value)} or {feature: [(op, value), ...]}, all must hold
+    Features are any column mapping (DataFrame or dict of arrays).
+    """
+
+    def __init__(self, spec: Dict):
+        self.base = spec.get('base', 0)
+        self.clip = spec.get('clip')
+        self.components = {name: _compile(rule) for name, rule in spec['components'].items()}
+
+    def points(self, features: Mapping) -> Dict[str, np.ndarray]:
+        """Per-component points (score breakdown)"""
+        n = _length(features)
+        return {name: component(features, n) for name, component in self.components.items()}
+
+    def score(self, features: Mapping) -> np.ndarray:
+        n = _length(features)
+        score = np.full(n, self.base, dtype='float64')
+        for component in self.components.values():
+            score += component(features, n)
+        if self.clip is not None:
+            score = np.clip(score, *self.clip)
+        return score
+
+
+def weighted_sum(features: Mapping, weights: Dict[str, float]) -> np.ndarray:
+    """Linear blend of score columns"""
+    return sum(np.asarray(features[name], dtype='float64') * w for name, w in weights.items())
+
+
+def bucket(values, bins: Sequence[float], labels: List[str], right: bool = False) -> np.ndarray:
+    """
+    Label per value from ascending bin edges (np.digitize): len(labels) == len(bins) + 1
+    NaN gets the lowest label, like a top-down >= ladder where no threshold matches
+    (np.digitize alone would put NaN past the last edge)
+    """
+    if len(labels) != len(bins) + 1:
+        raise ValueError(f"{len(bins)} bins need {len(bins) + 1} labels")
+    values = np.asarray(values, dtype='float64')
+    index = np.where(np.isnan(values), 0, np.digitize(values, bins, right=right))
+    return np.asarray(labels, dtype=object)[index]
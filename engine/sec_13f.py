@@ -0,0 +1,348 @@
+# SEC 13F-HR Holdings Database (EDGAR ingestion -> local sqlite, QoQ deltas)
+import os
+import re
+import sqlite3
+import logging
+import threading
+import pandas as pd
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+
+from engine.market_data import get_provider
+
+logger = logging.getLogger(__name__)
+
+FORM_13F = '13F-HR'
+
+# Position status vs the filer's previous quarter
+NEW, ADD, HOLD, REDUCE, EXIT = 'new', 'add', 'hold', 'reduce', 'exit'
+
+# 13F values were reported in $1000s until the Jan 2023 form change
+VALUE_IN_DOLLARS_FROM = '2023-01-03'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    accession TEXT PRIMARY KEY,
+    cik TEXT NOT NULL,
+    filer TEXT,
+    period TEXT NOT NULL,
+    filed TEXT,
+    positions INTEGER
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    cik TEXT NOT NULL,
+    period TEXT NOT NULL,
+    cusip TEXT NOT NULL,
+    issuer TEXT,
+    title TEXT,
+    shares REAL,
+    value REAL,
+    PRIMARY KEY (cik, period, cusip)
+);
+CREATE INDEX IF NOT EXISTS holdings_cusip ON holdings (cusip, period);
+CREATE TABLE IF NOT EXISTS deltas (
+    cik TEXT NOT NULL,
+    period TEXT NOT NULL,
+    prev_period TEXT NOT NULL,
+    cusip TEXT NOT NULL,
+    shares REAL,
+    prev_shares REAL,
+    delta_shares REAL,
+    value REAL,
+    status TEXT,
+    PRIMARY KEY (cik, period, cusip)
+);
+CREATE INDEX IF NOT EXISTS deltas_cusip ON deltas (cusip, period);
+CREATE TABLE IF NOT EXISTS cusip_map (
+    cusip TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS cusip_map_ticker ON cusip_map (ticker);
+"""
+
+# Tokens ignored when matching 13F issuer names to company names
+NAME_STOPWORDS = {
+    'INC', 'INCORPORATED', 'CORP', 'CORPORATION', 'CO', 'COMPANY', 'LTD', 'LIMITED', 'PLC', 'THE',
+    'OF', 'AND', 'DEL', 'NEW', 'HLDGS', 'HOLDINGS', 'HLDG', 'GROUP', 'GRP', 'LP', 'LLC', 'NV', 'SA',
+    'AG', 'SE', 'COM', 'CL', 'CLASS',
+}
+
+
+def normalize_issuer(name: str) -> str:
+    """'BANK AMERICA CORP /DE/' and 'Bank of America Corporation' -> 'BANK AMERICA'"""
+    if not isinstance(name, str):
+        return ''
+    name = name.upper().split('/')[0].replace('&', ' AND ')
+    tokens = re.sub(r'[^A-Z0-9]+', ' ', name).split()
+    return ' '.join(t for t in tokens if t not in NAME_STOPWORDS)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_information_table(xml_text: str, filed: str = None) -> pd.DataFrame:
+    """
+    13F information table XML -> one row per CUSIP (issuer, title, shares, value in USD)
+    Option rows (putCall) and principal-amount rows are left out of share positions
+    """
+    root = ET.fromstring(xml_text.encode('utf-8') if isinstance(xml_text, str) else xml_text)
+    scale = 1000.0 if filed and filed < VALUE_IN_DOLLARS_FROM else 1.0
+    rows = []
+    for entry in root.iter():
+        if _local(entry.tag) != 'infoTable':
+            continue
+        fields = {_local(el.tag): (el.text or '').strip() for el in entry.iter()}
+        if fields.get('putCall') or fields.get('sshPrnamtType', 'SH').upper() != 'SH':
+            continue
+        rows.append({
+            'cusip': fields.get('cusip', '').upper(),
+            'issuer': fields.get('nameOfIssuer', ''),
+            'title': fields.get('titleOfClass', ''),
+            'shares': float(fields.get('sshPrnamt') or 0),
+            'value': float(fields.get('value') or 0) * scale,
+        })
+    df = pd.DataFrame(rows, columns=['cusip', 'issuer', 'title', 'shares', 'value'])
+    if df.empty:
+        return df
+    # The same CUSIP is listed once per other-manager / discretion combination
+    return (df.groupby('cusip', as_index=False)
+              .agg(issuer=('issuer', 'first'), title=('title', 'first'), shares=('shares', 'sum'), value=('value', 'sum')))
+
+
+class HoldingsDB:
+    """
+    Local 13F holdings database (data/us_13f_holdings.db)
+
+    - filings:   one row per ingested 13F-HR (accession, filer CIK, report period)
+    - holdings:  share positions per filer / period / CUSIP
+    - deltas:    precomputed quarter-over-quarter change per position (new/add/hold/reduce/exit)
+    - cusip_map: CUSIP -> ticker
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------ writes
+
+    def has_filing(self, accession: str) -> bool:
+        return self.conn.execute('SELECT 1 FROM filings WHERE accession = ?', (accession,)).fetchone() is not None
+
+    def add_filing(self, accession: str, cik: str, filer: str, period: str, filed: str, positions: pd.DataFrame):
+        """Store one filing's positions (replacing the filer's period) and refresh its deltas"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM holdings WHERE cik = ? AND period = ?', (cik, period))
+            self.conn.executemany(
+                'INSERT INTO holdings (cik, period, cusip, issuer, title, shares, value) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(cik, period, r.cusip, r.issuer, r.title, r.shares, r.value) for r in positions.itertuples()])
+            self.conn.execute(
+                'INSERT OR REPLACE INTO filings (accession, cik, filer, period, filed, positions) VALUES (?, ?, ?, ?, ?, ?)',
+                (accession, cik, filer, period, filed, len(positions)))
+            self._compute_deltas(cik)
+
+    def _compute_deltas(self, cik: str):
+        """QoQ position changes for every consecutive pair of the filer's periods"""
+        periods = [r[0] for r in self.conn.execute(
+            'SELECT DISTINCT period FROM holdings WHERE cik = ? ORDER BY period', (cik,))]
+        self.conn.execute('DELETE FROM deltas WHERE cik = ?', (cik,))
+        for prev_period, period in zip(periods, periods[1:]):
+            params = {'cik': cik, 'period': period, 'prev': prev_period}
+            self.conn.execute("""
+                INSERT INTO deltas (cik, period, prev_period, cusip, shares, prev_shares, delta_shares, value, status)
+                SELECT cur.cik, cur.period, :prev, cur.cusip, cur.shares, COALESCE(prev.shares, 0),
+                       cur.shares - COALESCE(prev.shares, 0), cur.value,
+                       CASE WHEN prev.shares IS NULL OR prev.shares = 0 THEN 'new'
+                            WHEN cur.shares > prev.shares THEN 'add'
+                            WHEN cur.shares < prev.shares THEN 'reduce'
+                            ELSE 'hold' END
+                FROM holdings cur
+                LEFT JOIN holdings prev ON prev.cik = cur.cik AND prev.period = :prev AND prev.cusip = cur.cusip
+                WHERE cur.cik = :cik AND cur.period = :period
+            """, params)
+            self.conn.execute("""
+                INSERT INTO deltas (cik, period, prev_period, cusip, shares, prev_shares, delta_shares, value, status)
+                SELECT prev.cik, :period, :prev, prev.cusip, 0, prev.shares, -prev.shares, 0, 'exit'
+                FROM holdings prev
+                WHERE prev.cik = :cik AND prev.period = :prev
+                  AND NOT EXISTS (SELECT 1 FROM holdings cur
+                                  WHERE cur.cik = prev.cik AND cur.period = :period AND cur.cusip = prev.cusip)
+            """, params)
+
+    def map_cusips(self, names: Dict[str, str], overrides: Dict[str, str] = None) -> int:
+        """
+        Map unmapped CUSIPs to tickers by normalized issuer name
+        names: ticker -> company name; names shared by several tickers (share classes) are
+        skipped unless an override (cusip -> ticker) resolves them. Returns CUSIPs mapped
+        """
+        by_name: Dict[str, set] = {}
+        for ticker, name in names.items():
+            key = normalize_issuer(name)
+            if key:
+                by_name.setdefault(key, set()).add(ticker)
+
+        mapped = 0
+        ambiguous = []
+        with self.lock, self.conn:
+            for cusip, ticker in (overrides or {}).items():
+                self.conn.execute('INSERT OR REPLACE INTO cusip_map (cusip, ticker, source) VALUES (?, ?, ?)',
+                                  (cusip.upper(), ticker.upper(), 'override'))
+            unmapped = self.conn.execute("""
+                SELECT cusip, MAX(issuer) FROM holdings
+                WHERE cusip NOT IN (SELECT cusip FROM cusip_map) GROUP BY cusip
+            """).fetchall()
+            for cusip, issuer in unmapped:
+                tickers = by_name.get(normalize_issuer(issuer), set())
+                if len(tickers) == 1:
+                    self.conn.execute('INSERT INTO cusip_map (cusip, ticker, source) VALUES (?, ?, ?)',
+                                      (cusip, next(iter(tickers)), 'name'))
+                    mapped += 1
+                elif len(tickers) > 1:
+                    ambiguous.append(f"{cusip} {issuer} -> {'/'.join(sorted(tickers))}")
+        if ambiguous:
+            logger.warning(f"⚠️ {len(ambiguous)} CUSIPs left unmapped, issuer name shared by several tickers "
+                           f"(add cusip,ticker overrides): {', '.join(ambiguous[:10])}")
+        return mapped
+
+    # ------------------------------------------------------------------ queries
+
+    def latest_period(self) -> Optional[str]:
+        row = self.conn.execute('SELECT MAX(period) FROM filings').fetchone()
+        return row[0] if row else None
+
+    def ticker_activity(self, tickers: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Per ticker, across each tracked filer's latest quarter with a prior quarter:
+        holders, holders increasing / decreasing, new / exited, aggregate share change
+        """
+        df = pd.read_sql_query("""
+            SELECT m.ticker AS ticker,
+                   SUM(CASE WHEN d.status != 'exit' THEN 1 ELSE 0 END) AS tracked_holders,
+                   SUM(CASE WHEN d.status IN ('new', 'add') THEN 1 ELSE 0 END) AS holders_increased,
+                   SUM(CASE WHEN d.status IN ('reduce', 'exit') THEN 1 ELSE 0 END) AS holders_decreased,
+                   SUM(CASE WHEN d.status = 'new' THEN 1 ELSE 0 END) AS new_positions,
+                   SUM(CASE WHEN d.status = 'exit' THEN 1 ELSE 0 END) AS exited_positions,
+                   SUM(d.shares) AS tracked_shares,
+                   SUM(d.prev_shares) AS prev_tracked_shares,
+                   SUM(d.value) AS tracked_value,
+                   MAX(d.period) AS period_13f
+            FROM deltas d
+            JOIN (SELECT cik, MAX(period) AS period FROM deltas GROUP BY cik) latest
+              ON latest.cik = d.cik AND latest.period = d.period
+            JOIN cusip_map m ON m.cusip = d.cusip
+            GROUP BY m.ticker
+        """, self.conn)
+        prev = df['prev_tracked_shares']
+        df['tracked_shares_chg_pct'] = ((df['tracked_shares'] - prev) / prev.where(prev > 0) * 100).fillna(0.0)
+        if tickers is not None:
+            df = df[df['ticker'].isin(set(tickers))]
+        return df.set_index('ticker')
+
+    def holders(self, ticker: str) -> pd.DataFrame:
+        """Tracked filers' positions and QoQ change in a ticker (latest quarter per filer)"""
+        return pd.read_sql_query("""
+            SELECT f.filer, d.cik, d.period, d.shares, d.prev_shares, d.delta_shares, d.value, d.status
+            FROM deltas d
+            JOIN (SELECT cik, MAX(period) AS period FROM deltas GROUP BY cik) latest
+              ON latest.cik = d.cik AND latest.period = d.period
+            JOIN cusip_map m ON m.cusip = d.cusip
+            LEFT JOIN (SELECT cik, MAX(filer) AS filer FROM filings GROUP BY cik) f ON f.cik = d.cik
+            WHERE m.ticker = ?
+            ORDER BY d.value DESC
+        """, self.conn, params=(ticker,))
+
+
+class Edgar13FIngestor:
+    """
+    Pulls 13F-HR information tables for a set of filer CIKs into a HoldingsDB
+    Goes through the 'sec' market data provider, so MARKET_DATA_MODE=record saves the
+    EDGAR responses as fixtures and replay ingests them offline
+    """
+
+    def __init__(self, db: HoldingsDB, provider=None):
+        self.db = db
+        self.provider = provider or get_provider('sec')
+
+    def recent_filings(self, cik: str, quarters: int) -> List[Dict]:
+        """Latest 13F-HR per report period (newest `quarters` periods)"""
+        data = self.provider.query(f'submissions/CIK{cik}.json')
+        recent = data.get('filings', {}).get('recent', {})
+        filings, seen = [], set()
+        for i, form in enumerate(recent.get('form', [])):
+            period = recent['reportDate'][i]
+            if form != FORM_13F or not period or period in seen:
+                continue
+            seen.add(period)
+            filings.append({
+                'accession': recent['accessionNumber'][i],
+                'period': period,
+                'filed': recent['filingDate'][i],
+                'primary_document': recent.get('primaryDocument', [''] * (i + 1))[i],
+                'filer': data.get('name', ''),
+            })
+        return sorted(filings, key=lambda f: f['period'], reverse=True)[:quarters]
+
+    def information_table(self, cik: str, filing: Dict) -> Optional[str]:
+        """Information table XML of a filing (the XML document that is not the cover page)"""
+        folder = f"Archives/edgar/data/{int(cik)}/{filing['accession'].replace('-', '')}"
+        index = self.provider.query(f'{folder}/index.json')
+        names = [item['name'] for item in index.get('directory', {}).get('item', [])]
+        xml_files = [n for n in names if n.lower().endswith('.xml') and n != filing.get('primary_document')
+                     and n.lower() != 'primary_doc.xml']
+        if not xml_files:
+            return None
+        xml_files.sort(key=lambda n: 'infotable' not in n.lower())
+        return self.provider.query(f'{folder}/{xml_files[0]}').get('text')
+
+    def ingest(self, institutions: Dict[str, str], quarters: int = 2) -> Dict:
+        """Fetch filings not yet in the DB for each CIK, returns counts"""
+        stats = {'filers': 0, 'filings': 0, 'positions': 0, 'skipped': 0, 'failed': 0}
+        for cik, name in institutions.items():
+            try:
+                filings = self.recent_filings(cik, quarters)
+            except Exception as e:
+                logger.warning(f"⚠️ EDGAR submissions failed for {name} ({cik}): {e}")
+                stats['failed'] += 1
+                continue
+            stats['filers'] += 1
+            for filing in filings:
+                if self.db.has_filing(filing['accession']):
+                    stats['skipped'] += 1
+                    continue
+                try:
+                    xml_text = self.information_table(cik, filing)
+                    if xml_text is None:
+                        raise ValueError('no information table')
+                    positions = parse_information_table(xml_text, filing['filed'])
+                except Exception as e:
+                    logger.warning(f"⚠️ 13F {filing['accession']} ({name}) failed: {e}")
+                    stats['failed'] += 1
+                    continue
+                self.db.add_filing(filing['accession'], cik, filing['filer'] or name,
+                                   filing['period'], filing['filed'], positions)
+                stats['filings'] += 1
+                stats['positions'] += len(positions)
+                logger.info(f"📥 {name}: 13F {filing['period']} ({len(positions)} positions)")
+        return stats
+
+
+def company_names(provider=None) -> Dict[str, str]:
+    """ticker -> SEC conformed company name (www.sec.gov/files/company_tickers.json)"""
+    provider = provider or get_provider('sec')
+    data = provider.query('files/company_tickers.json')
+    return {row['ticker'].upper().replace('.', '-'): row['title'] for row in data.values()}
+
+
+def load_cusip_overrides(path: str) -> Dict[str, str]:
+    """Optional cusip,ticker CSV for share classes / names the matcher cannot resolve"""
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path, dtype=str)
+    return dict(zip(df['cusip'].str.upper(), df['ticker'].str.upper()))
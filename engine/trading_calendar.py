@@ -0,0 +1,177 @@
+# NYSE Trading Calendar (holidays, early closes, completed sessions)
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+import pytz
+
+EST = pytz.timezone('US/Eastern')
+
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Minutes after the close before the daily bar is considered final at the data vendors
+SETTLE_MINUTES = 15
+
+# One-off closures (national days of mourning, weather)
+SPECIAL_CLOSURES = {
+    date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11),
+    date(2007, 1, 2),
+    date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5),
+    date(2025, 1, 9),
+}
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday of a month (n=-1 for the last one)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday"""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> Dict[date, str]:
+    """Full-day NYSE holidays of a year"""
+    days = {}
+
+    # New Year's Day: not moved back into the previous year when it falls on a Saturday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days[_observed(new_year)] = "New Year's Day"
+    if year >= 1998:
+        days[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    days[_nth_weekday(year, 2, 0, 3)] = "Presidents' Day"
+    days[_easter(year) - timedelta(days=2)] = "Good Friday"
+    days[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        days[_observed(date(year, 6, 19))] = "Juneteenth"
+    days[_observed(date(year, 7, 4))] = "Independence Day"
+    days[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    days[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    days[_observed(date(year, 12, 25))] = "Christmas Day"
+
+    for d in SPECIAL_CLOSURES:
+        if d.year == year:
+            days[d] = "Special Closure"
+    return days
+
+
+@lru_cache(maxsize=None)
+def early_closes(year: int) -> Set[date]:
+    """1:00 PM ET early-close sessions of a year"""
+    candidates = [
+        date(year, 7, 3),                                        # Day before Independence Day
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),        # Day after Thanksgiving
+        date(year, 12, 24),                                      # Christmas Eve
+    ]
+    closed = holidays(year)
+    return {d for d in candidates if d.weekday() < 5 and d not in closed}
+
+
+def is_trading_day(d) -> bool:
+    d = _as_date(d)
+    return d.weekday() < 5 and d not in holidays(d.year)
+
+
+def is_early_close(d) -> bool:
+    d = _as_date(d)
+    return d in early_closes(d.year)
+
+
+def session_close(d) -> Optional[datetime]:
+    """Close time (ET, tz-aware) of a session, None on non-trading days"""
+    d = _as_date(d)
+    if not is_trading_day(d):
+        return None
+    return EST.localize(datetime.combine(d, EARLY_CLOSE if is_early_close(d) else REGULAR_CLOSE))
+
+
+def next_trading_day(d) -> date:
+    d = _as_date(d) + timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+
+def previous_trading_day(d) -> date:
+    d = _as_date(d) - timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
+
+
+def trading_days(start, end) -> List[date]:
+    """Trading days in [start, end]"""
+    d, end = _as_date(start), _as_date(end)
+    days = []
+    while d <= end:
+        if is_trading_day(d):
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def last_completed_session(now: datetime = None) -> date:
+    """
+    Most recent session whose daily bar is final
+    Today counts only once its close (+ SETTLE_MINUTES) has passed in New York
+    """
+    now = _as_eastern(now)
+    today = now.date()
+    close = session_close(today)
+    if close is not None and now >= close + timedelta(minutes=SETTLE_MINUTES):
+        return today
+    return previous_trading_day(today)
+
+
+def is_market_open(now: datetime = None) -> bool:
+    now = _as_eastern(now)
+    close = session_close(now.date())
+    if close is None:
+        return False
+    market_open = EST.localize(datetime.combine(now.date(), time(9, 30)))
+    return market_open <= now < close
+
+
+def _as_date(d) -> date:
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(str(d)[:10], '%Y-%m-%d').date()
+
+
+def _as_eastern(now: Optional[datetime]) -> datetime:
+    """Naive datetimes are taken as local server time"""
+    if now is None:
+        return datetime.now(EST)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(EST)
@@ -0,0 +1,210 @@
+# Stock Universe (ticker / name / sector / industry / market cap / index membership)
+import os
+import logging
+import tempfile
+import threading
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+UNIVERSE_FILE = 'universe.csv'
+
+COLUMNS = ['ticker', 'name', 'sector', 'industry', 'market_cap', 'indices']
+
+# Index / watchlist memberships used across the app
+SP500 = 'SP500'
+HEATMAP = 'HEATMAP'              # sector treemap constituents
+VCP = 'VCP'                      # VCP screener universe
+OPTIONS = 'OPTIONS'              # options flow watchlist
+CLOSING_BELL = 'CLOSING_BELL'    # closing-bell monitored tickers
+
+# Canonical sector names (GICS) and the aliases yfinance / Finnhub return
+SECTORS = [
+    'Technology', 'Financials', 'Healthcare', 'Energy', 'Consumer Discretionary',
+    'Consumer Staples', 'Industrials', 'Materials', 'Utilities', 'Real Estate',
+    'Communication Services',
+]
+SECTOR_ALIASES = {
+    'Information Technology': 'Technology',
+    'Financial Services': 'Financials',
+    'Health Care': 'Healthcare',
+    'Consumer Cyclical': 'Consumer Discretionary',
+    'Consumer Defensive': 'Consumer Staples',
+    'Basic Materials': 'Materials',
+}
+# Short labels shown in the dashboard tables
+SECTOR_SHORT = {
+    'Technology': 'Tech', 'Financials': 'Fin', 'Healthcare': 'Health', 'Energy': 'Energy',
+    'Consumer Discretionary': 'Cons', 'Consumer Staples': 'Staple', 'Industrials': 'Indust',
+    'Materials': 'Mater', 'Utilities': 'Util', 'Real Estate': 'REIT',
+    'Communication Services': 'Comm', 'ETF': 'ETF',
+}
+
+
+def normalize_sector(sector: Optional[str]) -> str:
+    if not sector or not isinstance(sector, str):
+        return ''
+    return SECTOR_ALIASES.get(sector, sector)
+
+
+class Universe:
+    """
+    Central stock universe table (data/universe.csv)
+
+    Rows are indexed by ticker, with secondary indexes by sector and by
+    membership ('indices' holds ';'-separated tags such as SP500;HEATMAP).
+    Queries keep the table's row order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.rows: Dict[str, Dict] = {}
+        self.mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if self.mtime is not None:
+            df = pd.read_csv(path, dtype={'ticker': str}, keep_default_na=False)
+            for record in df.to_dict('records'):
+                self._insert(record)
+        self._reindex()
+
+    # ------------------------------------------------------------------ index
+
+    def _insert(self, record: Dict):
+        ticker = str(record['ticker']).strip().upper()
+        cap = record.get('market_cap')
+        indices = record.get('indices', '')
+        if not isinstance(indices, (list, tuple, set)):
+            indices = [t for t in str(indices).split(';') if t]
+        self.rows[ticker] = {
+            'ticker': ticker,
+            'name': record.get('name') or ticker,
+            'sector': normalize_sector(record.get('sector')),
+            'industry': record.get('industry') or '',
+            'market_cap': float(cap) if cap not in (None, '') else None,
+            'indices': list(dict.fromkeys(indices)),
+        }
+
+    def _reindex(self):
+        self.sector_index: Dict[str, List[str]] = {}
+        self.membership_index: Dict[str, List[str]] = {}
+        for ticker, row in self.rows.items():
+            self.sector_index.setdefault(row['sector'], []).append(ticker)
+            for tag in row['indices']:
+                self.membership_index.setdefault(tag, []).append(ticker)
+
+    # ------------------------------------------------------------------ queries
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, ticker: str) -> Optional[Dict]:
+        return self.rows.get(ticker)
+
+    def tickers(self, index: str = None, sector: str = None) -> List[str]:
+        """Tickers filtered by membership and/or sector"""
+        if index is not None:
+            result = self.membership_index.get(index, [])
+        elif sector is not None:
+            result = self.sector_index.get(normalize_sector(sector), [])
+        else:
+            result = list(self.rows)
+        if index is not None and sector is not None:
+            sector = normalize_sector(sector)
+            result = [t for t in result if self.rows[t]['sector'] == sector]
+        return list(result)
+
+    def by_sector(self, index: str = None) -> Dict[str, List[str]]:
+        """sector -> tickers (optionally within one membership)"""
+        groups: Dict[str, List[str]] = {}
+        for ticker in self.tickers(index=index):
+            groups.setdefault(self.rows[ticker]['sector'], []).append(ticker)
+        return groups
+
+    def sector(self, ticker: str) -> str:
+        row = self.rows.get(ticker)
+        return row['sector'] if row else ''
+
+    def sector_short(self, ticker: str) -> str:
+        sector = self.sector(ticker)
+        return SECTOR_SHORT.get(sector, sector[:5]) if sector else ''
+
+    def name(self, ticker: str) -> str:
+        row = self.rows.get(ticker)
+        return row['name'] if row else ticker
+
+    def frame(self, index: str = None) -> pd.DataFrame:
+        """Rows as a DataFrame indexed by ticker"""
+        records = [self.rows[t] for t in self.tickers(index=index)]
+        df = pd.DataFrame(records, columns=COLUMNS)
+        df['indices'] = df['indices'].apply(lambda tags: ';'.join(tags) if isinstance(tags, list) else '')
+        return df.set_index('ticker')
+
+    # ------------------------------------------------------------------ updates
+
+    def upsert(self, ticker: str, **fields):
+        """Insert or update one row (indices are merged, not replaced)"""
+        with self.lock:
+            row = dict(self.rows.get(ticker, {'ticker': ticker, 'indices': []}))
+            tags = row['indices'] + list(fields.pop('indices', []))
+            row.update({k: v for k, v in fields.items() if v not in (None, '')})
+            row['indices'] = tags
+            self._insert(row)
+            self._reindex()
+
+    def enrich(self, tickers: Iterable[str], provider=None) -> int:
+        """Fill name / sector / industry / market cap from the provider's info payload"""
+        if provider is None:
+            from engine.market_data import get_provider
+            provider = get_provider('yfinance')
+        updated = 0
+        for ticker in tickers:
+            try:
+                info = provider.info(ticker) or {}
+            except Exception as e:
+                logger.debug(f"Universe enrich failed for {ticker}: {e}")
+                continue
+            sector = 'ETF' if info.get('quoteType') == 'ETF' else info.get('sector')
+            self.upsert(ticker,
+                        name=info.get('shortName') or info.get('longName'),
+                        sector=sector,
+                        industry=info.get('industry'),
+                        market_cap=info.get('marketCap'))
+            updated += 1
+        return updated
+
+    def save(self):
+        """Atomic rewrite; the temp file is unique so concurrent workers never share it"""
+        with self.lock:
+            df = self.frame().reset_index()
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=UNIVERSE_FILE, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                    df.to_csv(f, index=False)
+                os.chmod(tmp_path, 0o644)   # mkstemp creates 0600
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.mtime = os.path.getmtime(self.path)
+
+
+_universes: Dict[str, Universe] = {}
+
+
+def load_universe(data_dir: str = None) -> Universe:
+    """Shared universe for this process (reloaded when the file changes)"""
+    data_dir = data_dir or os.getenv('DATA_DIR', DEFAULT_DATA_DIR)
+    path = os.path.abspath(os.path.join(data_dir, UNIVERSE_FILE))
+    if not os.path.exists(path):
+        path = os.path.abspath(os.path.join(DEFAULT_DATA_DIR, UNIVERSE_FILE))  # shipped seed
+    universe = _universes.get(path)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if universe is None or universe.mtime != mtime:
+        universe = Universe(path)
+        _universes[path] = universe
+    return universe
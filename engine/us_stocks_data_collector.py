@@ -1,42 +1,33 @@
 # US Stocks Data Collection
 import os
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List
 import pytz
 
+from engine.market_data import get_provider
+from engine.universe import load_universe, CLOSING_BELL
+
 class USStocksDataCollector:
     """미국 주식 데이터 수집"""
     
     def __init__(self):
         self.alpha_vantage_key = os.getenv("ALPHA_VANTAGE_API_KEY")
         self.finnhub_key = os.getenv("FINNHUB_API_KEY")
+        self.alpha_vantage = get_provider('alphavantage')
+        self.finnhub = get_provider('finnhub')
         self.est = pytz.timezone('US/Eastern')
         
-        # 모니터링 종목 (S&P 500 상위)
-        self.monitored_tickers = [
-            "NVDA", "TSLA", "MSFT", "AAPL", "GOOGL", "AMZN",
-            "META", "NFLX", "CRM", "ADBE", "PYPL", "UBER",
-            "SPOT", "SNPS", "CDNS", "MSTR", "SQ", "PLTR"
-        ]
+        # 모니터링 종목 (유니버스 테이블의 CLOSING_BELL 멤버)
+        self.monitored_tickers = load_universe().tickers(index=CLOSING_BELL)
     
-    def get_daily_ohlcv(self, ticker: str, days_ago: int = 0) -> Dict:
-        """일일 OHLCV"""
-        url = "https://www.alphavantage.co/query"
-        params = {
-            'function': 'TIME_SERIES_DAILY',
-            'symbol': ticker,
-            'outputsize': 'compact',
-            'apikey': self.alpha_vantage_key
-        }
-        
+    def get_daily_ohlcv(self, ticker: str, days_ago: int = 0, before: str = None) -> Dict:
+        """일일 OHLCV (before='YYYY-MM-DD': 해당일 이전 봉 기준)"""
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            data = self.alpha_vantage.query('TIME_SERIES_DAILY', symbol=ticker, outputsize='compact')
             
             if 'Time Series (Daily)' in data:
                 ts = data['Time Series (Daily)']
-                dates = list(ts.keys())
+                dates = [d for d in ts.keys() if before is None or d < before]
                 
                 if len(dates) > days_ago:
                     date_key = dates[days_ago]
@@ -55,15 +46,8 @@ class USStocksDataCollector:
     
     def get_company_info(self, ticker: str) -> Dict:
         """기업 정보"""
-        url = "https://finnhub.io/api/v1/stock/profile2"
-        params = {
-            'symbol': ticker,
-            'token': self.finnhub_key
-        }
-        
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            data = self.finnhub.query('stock/profile2', symbol=ticker)
             
             return {
                 'company': data.get('name', ticker),
@@ -76,19 +60,16 @@ class USStocksDataCollector:
     
     def get_news(self, ticker: str, hours: int = 24) -> List[Dict]:
         """최신 뉴스"""
-        url = "https://finnhub.io/api/v1/company-news"
         from_date = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d')
         
         params = {
             'symbol': ticker,
             'from': from_date,
-            'to': datetime.now().strftime('%Y-%m-%d'),
-            'token': self.finnhub_key
+            'to': datetime.now().strftime('%Y-%m-%d')
         }
         
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            data = self.finnhub.query('company-news', **params)
             
             return [
                 {
@@ -103,20 +84,15 @@ class USStocksDataCollector:
     
     def get_moving_averages(self, ticker: str) -> Dict:
         """이동평균선"""
-        url = "https://www.alphavantage.co/query"
-        
         try:
             # MA20
             params = {
-                'function': 'SMA',
                 'symbol': ticker,
                 'interval': 'daily',
                 'time_period': 20,
-                'series_type': 'close',
-                'apikey': self.alpha_vantage_key
+                'series_type': 'close'
             }
-            resp = requests.get(url, params=params, timeout=10)
-            ma20_data = resp.json()
+            ma20_data = self.alpha_vantage.query('SMA', **params)
             ma20 = 0
             
             if 'Technical Analysis: SMA' in ma20_data:
@@ -126,8 +102,7 @@ class USStocksDataCollector:
             
             # MA60
             params['time_period'] = 60
-            resp = requests.get(url, params=params, timeout=10)
-            ma60_data = resp.json()
+            ma60_data = self.alpha_vantage.query('SMA', **params)
             ma60 = 0
             
             if 'Technical Analysis: SMA' in ma60_data:
@@ -142,16 +117,8 @@ class USStocksDataCollector:
     
     def get_monthly_high(self, ticker: str) -> float:
         """월간 고점"""
-        url = "https://www.alphavantage.co/query"
-        params = {
-            'function': 'TIME_SERIES_MONTHLY',
-            'symbol': ticker,
-            'apikey': self.alpha_vantage_key
-        }
-        
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            data = self.alpha_vantage.query('TIME_SERIES_MONTHLY', symbol=ticker)
             
             if 'Monthly Time Series' in data:
                 ts = data['Monthly Time Series']
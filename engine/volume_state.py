@@ -0,0 +1,174 @@
+# Streaming Volume Indicator State (OBV / A/D / MFI / volume SMA per ticker)
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 20        # volume SMA, surge counts and 20-day OBV / A/D change
+MFI_PERIOD = 14
+SURGE_THRESHOLD = 2.0
+
+SCALARS = {'last_day': 'int64', 'bars': 'int64', 'last_close': 'float64', 'last_tp': 'float64',
+           'obv': 'float64', 'ad': 'float64'}
+RINGS = {'volume': WINDOW, 'surge': WINDOW, 'obv_hist': WINDOW, 'ad_hist': WINDOW,
+         'pos_mf': MFI_PERIOD, 'neg_mf': MFI_PERIOD}
+
+
+class VolumeState:
+    """
+    Running indicator state for every ticker, one row per ticker
+
+    - Scalars: last bar day / close / typical price, bar count, cumulative OBV and A/D
+    - Rings (oldest -> newest): last 20 volumes, surge flags, OBV and A/D values,
+      last 14 positive / negative money flows
+    Pushing a bar touches only fixed-size rows, so a daily update is O(1) in the
+    length of the stored history.
+    """
+
+    def __init__(self):
+        self.tickers: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.scalars = {k: np.empty(0, dtype=v) for k, v in SCALARS.items()}
+        self.rings = {k: np.empty((0, n)) for k, n in RINGS.items()}
+
+    # ------------------------------------------------------------------ persistence
+
+    @classmethod
+    def load(cls, path: str) -> Optional['VolumeState']:
+        if not os.path.exists(path):
+            return None
+        state = cls()
+        with np.load(path, allow_pickle=False) as data:
+            state.tickers = [str(t) for t in data['tickers']]
+            state.scalars = {k: data[k] for k in SCALARS}
+            state.rings = {k: data[k] for k in RINGS}
+        state.index = {t: i for i, t in enumerate(state.tickers)}
+        return state
+
+    def save(self, path: str):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, tickers=np.array(self.tickers, dtype=str), **self.scalars, **self.rings)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------ rows
+
+    def _row(self, ticker: str) -> int:
+        """Row for a ticker, reset to an empty state"""
+        i = self.index.get(ticker)
+        if i is None:
+            i = len(self.tickers)
+            self.tickers.append(ticker)
+            self.index[ticker] = i
+            self.scalars = {k: np.append(v, np.zeros(1, dtype=v.dtype)) for k, v in self.scalars.items()}
+            self.rings = {k: np.vstack([v, np.full((1, RINGS[k]), np.nan)]) for k, v in self.rings.items()}
+        for k in self.scalars:
+            self.scalars[k][i] = 0
+        for k in self.rings:
+            self.rings[k][i] = np.nan
+        return i
+
+    def _shift(self, name: str, i: int, value: float):
+        ring = self.rings[name][i]
+        ring[:-1] = ring[1:]
+        ring[-1] = value
+
+    def push(self, ticker: str, day: int, high: float, low: float, close: float, volume: float):
+        """Apply one new daily bar"""
+        i = self.index[ticker]
+        s = self.scalars
+        first = s['bars'][i] == 0
+
+        # OBV / A/D
+        direction = 0.0 if first else float(np.sign(close - s['last_close'][i]))
+        s['obv'][i] = 0.0 if first else s['obv'][i] + direction * volume
+        high_low = high - low if high - low != 0 else 0.0001
+        s['ad'][i] += ((close - low) - (high - close)) / high_low * volume
+
+        # Volume SMA(20) including this bar, surge flag
+        self._shift('volume', i, volume)
+        bars = s['bars'][i] + 1
+        sma = self.rings['volume'][i].sum() / WINDOW if bars >= WINDOW else np.nan
+        self._shift('surge', i, float(volume > sma * SURGE_THRESHOLD))
+
+        # Money flow split by typical price direction
+        typical = (high + low + close) / 3
+        money_flow = typical * volume
+        tp_diff = np.nan if first else typical - s['last_tp'][i]
+        self._shift('pos_mf', i, money_flow if tp_diff > 0 else 0.0)
+        self._shift('neg_mf', i, money_flow if tp_diff < 0 else 0.0)
+
+        self._shift('obv_hist', i, s['obv'][i])
+        self._shift('ad_hist', i, s['ad'][i])
+        s['last_close'][i] = close
+        s['last_tp'][i] = typical
+        s['last_day'][i] = day
+        s['bars'][i] = bars
+
+    def seed(self, ind: pd.DataFrame):
+        """
+        Initialise tickers from a full indicator computation (VolumeAnalyzer.compute_indicators)
+        Only the last WINDOW rows of each ticker are kept
+        """
+        days = ind['date'].to_numpy().astype('datetime64[D]').astype('int64')
+        for ticker, rows in ind.groupby('ticker', sort=False).indices.items():
+            i = self._row(ticker)
+            last = rows[-1]
+            self.scalars['last_day'][i] = days[last]
+            self.scalars['bars'][i] = len(rows)
+            self.scalars['last_close'][i] = ind['current_price'].iat[last]
+            self.scalars['last_tp'][i] = (ind['high'].iat[last] + ind['low'].iat[last] + ind['current_price'].iat[last]) / 3
+            self.scalars['obv'][i] = ind['obv'].iat[last]
+            self.scalars['ad'][i] = ind['ad_line'].iat[last]
+            for name, column in (('volume', 'volume'), ('surge', 'vol_surge'), ('obv_hist', 'obv'),
+                                 ('ad_hist', 'ad_line'), ('pos_mf', 'pos_mf'), ('neg_mf', 'neg_mf')):
+                tail = ind[column].to_numpy(dtype='float64')[rows[-RINGS[name]:]]
+                self.rings[name][i, RINGS[name] - len(tail):] = tail
+
+    def drop(self, tickers: Iterable[str]):
+        dropped = set(tickers)
+        keep = [i for i, t in enumerate(self.tickers) if t not in dropped]
+        self.tickers = [self.tickers[i] for i in keep]
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.scalars = {k: v[keep] for k, v in self.scalars.items()}
+        self.rings = {k: v[keep] for k, v in self.rings.items()}
+
+    # ------------------------------------------------------------------ features
+
+    def features(self, tickers: Iterable[str] = None, min_bars: int = 30) -> pd.DataFrame:
+        """Latest supply/demand inputs for tickers with enough history"""
+        rows = np.array([self.index[t] for t in (tickers if tickers is not None else self.tickers)
+                         if t in self.index], dtype='int64')
+        rows = rows[self.scalars['bars'][rows] >= min_bars]
+        s = {k: v[rows] for k, v in self.scalars.items()}
+        r = {k: v[rows] for k, v in self.rings.items()}
+
+        def change_20(hist):
+            base, current = hist[:, 0], hist[:, -1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = (current - base) / np.abs(base) * 100
+            return np.where(base != 0, change, 0.0)
+
+        vol_5d = r['volume'][:, -5:].sum(axis=1) / 5
+        vol_20d = r['volume'].sum(axis=1) / WINDOW
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_ratio = np.where(vol_20d > 0, vol_5d / vol_20d, 1.0)
+        positive = r['pos_mf'].sum(axis=1)
+        negative = r['neg_mf'].sum(axis=1)
+        negative = np.where(negative == 0, 0.0001, negative)
+
+        return pd.DataFrame({
+            'ticker': [self.tickers[i] for i in rows],
+            'date': s['last_day'].astype('datetime64[D]').astype('datetime64[ns]'),
+            'obv': s['obv'],
+            'obv_change_20d': change_20(r['obv_hist']),
+            'ad_line': s['ad'],
+            'ad_change_20d': change_20(r['ad_hist']),
+            'mfi': 100 - (100 / (1 + positive / negative)),
+            'vol_ratio_5d_20d': vol_ratio,
+            'surge_count_5d': r['surge'][:, -5:].sum(axis=1),
+            'surge_count_20d': r['surge'].sum(axis=1),
+        })
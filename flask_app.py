@@ -65,139 +65,68 @@ except ImportError as e:
     print(f"⚠️ Performance Blueprint not loaded: {e}")
 
 
-# Sector mapping for major US stocks (S&P 500 + popular stocks)
-SECTOR_MAP = {
-    # Technology
-    'AAPL': 'Tech', 'MSFT': 'Tech', 'NVDA': 'Tech', 'AVGO': 'Tech', 'ORCL': 'Tech',
-    'CRM': 'Tech', 'AMD': 'Tech', 'ADBE': 'Tech', 'CSCO': 'Tech', 'INTC': 'Tech',
-    'IBM': 'Tech', 'MU': 'Tech', 'QCOM': 'Tech', 'TXN': 'Tech', 'NOW': 'Tech',
-    'AMAT': 'Tech', 'LRCX': 'Tech', 'KLAC': 'Tech', 'SNPS': 'Tech', 'CDNS': 'Tech',
-    'ADI': 'Tech', 'MRVL': 'Tech', 'FTNT': 'Tech', 'PANW': 'Tech', 'CRWD': 'Tech',
-    'SNOW': 'Tech', 'DDOG': 'Tech', 'ZS': 'Tech', 'NET': 'Tech', 'PLTR': 'Tech',
-    'DELL': 'Tech', 'HPQ': 'Tech', 'HPE': 'Tech', 'KEYS': 'Tech', 'SWKS': 'Tech',
-    # Financials
-    'BRK-B': 'Fin', 'JPM': 'Fin', 'V': 'Fin', 'MA': 'Fin', 'BAC': 'Fin',
-    'WFC': 'Fin', 'GS': 'Fin', 'MS': 'Fin', 'SPGI': 'Fin', 'AXP': 'Fin',
-    'C': 'Fin', 'BLK': 'Fin', 'SCHW': 'Fin', 'CME': 'Fin', 'CB': 'Fin',
-    'PGR': 'Fin', 'MMC': 'Fin', 'AON': 'Fin', 'ICE': 'Fin', 'MCO': 'Fin',
-    'USB': 'Fin', 'PNC': 'Fin', 'TFC': 'Fin', 'AIG': 'Fin', 'MET': 'Fin',
-    'PRU': 'Fin', 'ALL': 'Fin', 'TRV': 'Fin', 'COIN': 'Fin', 'HOOD': 'Fin',
-    # Healthcare
-    'LLY': 'Health', 'UNH': 'Health', 'JNJ': 'Health', 'ABBV': 'Health', 'MRK': 'Health',
-    'PFE': 'Health', 'TMO': 'Health', 'ABT': 'Health', 'DHR': 'Health', 'BMY': 'Health',
-    'AMGN': 'Health', 'GILD': 'Health', 'VRTX': 'Health', 'ISRG': 'Health', 'MDT': 'Health',
-    'SYK': 'Health', 'BSX': 'Health', 'REGN': 'Health', 'ZTS': 'Health', 'ELV': 'Health',
-    'CI': 'Health', 'HUM': 'Health', 'CVS': 'Health', 'MCK': 'Health', 'CAH': 'Health',
-    'GEHC': 'Health', 'DXCM': 'Health', 'IQV': 'Health', 'BIIB': 'Health', 'MRNA': 'Health',
-    # Energy
-    'XOM': 'Energy', 'CVX': 'Energy', 'COP': 'Energy', 'SLB': 'Energy', 'EOG': 'Energy',
-    'MPC': 'Energy', 'PSX': 'Energy', 'VLO': 'Energy', 'OXY': 'Energy', 'WMB': 'Energy',
-    'DVN': 'Energy', 'HES': 'Energy', 'HAL': 'Energy', 'BKR': 'Energy', 'KMI': 'Energy',
-    'FANG': 'Energy', 'PXD': 'Energy', 'TRGP': 'Energy', 'OKE': 'Energy', 'ET': 'Energy',
-    # Consumer Discretionary
-    'AMZN': 'Cons', 'TSLA': 'Cons', 'HD': 'Cons', 'MCD': 'Cons', 'NKE': 'Cons',
-    'LOW': 'Cons', 'SBUX': 'Cons', 'TJX': 'Cons', 'BKNG': 'Cons', 'CMG': 'Cons',
-    'ORLY': 'Cons', 'AZO': 'Cons', 'ROST': 'Cons', 'DHI': 'Cons', 'LEN': 'Cons',
-    'GM': 'Cons', 'F': 'Cons', 'MAR': 'Cons', 'HLT': 'Cons', 'YUM': 'Cons',
-    'DG': 'Cons', 'DLTR': 'Cons', 'BBY': 'Cons', 'ULTA': 'Cons', 'POOL': 'Cons',
-    'LULU': 'Cons',
-    # Consumer Staples
-    'WMT': 'Staple', 'PG': 'Staple', 'COST': 'Staple', 'KO': 'Staple', 'PEP': 'Staple',
-    'PM': 'Staple', 'MDLZ': 'Staple', 'MO': 'Staple', 'CL': 'Staple', 'KMB': 'Staple',
-    'GIS': 'Staple', 'K': 'Staple', 'HSY': 'Staple', 'SYY': 'Staple', 'STZ': 'Staple',
-    'KHC': 'Staple', 'KR': 'Staple', 'EL': 'Staple', 'CHD': 'Staple', 'CLX': 'Staple',
-    'KDP': 'Staple', 'TAP': 'Staple', 'ADM': 'Staple', 'BG': 'Staple', 'MNST': 'Staple',
-    # Industrials
-    'CAT': 'Indust', 'GE': 'Indust', 'RTX': 'Indust', 'HON': 'Indust', 'UNP': 'Indust',
-    'BA': 'Indust', 'DE': 'Indust', 'LMT': 'Indust', 'UPS': 'Indust', 'MMM': 'Indust',
-    'GD': 'Indust', 'NOC': 'Indust', 'CSX': 'Indust', 'NSC': 'Indust', 'WM': 'Indust',
-    'EMR': 'Indust', 'ETN': 'Indust', 'ITW': 'Indust', 'PH': 'Indust', 'ROK': 'Indust',
-    'FDX': 'Indust', 'CARR': 'Indust', 'TT': 'Indust', 'PCAR': 'Indust', 'FAST': 'Indust',
-    # Materials
-    'LIN': 'Mater', 'APD': 'Mater', 'SHW': 'Mater', 'FCX': 'Mater', 'ECL': 'Mater',
-    'NEM': 'Mater', 'NUE': 'Mater', 'DOW': 'Mater', 'DD': 'Mater', 'VMC': 'Mater',
-    'CTVA': 'Mater', 'PPG': 'Mater', 'MLM': 'Mater', 'IP': 'Mater', 'PKG': 'Mater',
-    'ALB': 'Mater', 'GOLD': 'Mater', 'FMC': 'Mater', 'CF': 'Mater', 'MOS': 'Mater',
-    # Utilities
-    'NEE': 'Util', 'SO': 'Util', 'DUK': 'Util', 'CEG': 'Util', 'SRE': 'Util',
-    'AEP': 'Util', 'D': 'Util', 'PCG': 'Util', 'EXC': 'Util', 'XEL': 'Util',
-    'ED': 'Util', 'WEC': 'Util', 'ES': 'Util', 'AWK': 'Util', 'DTE': 'Util',
-    # Real Estate
-    'PLD': 'REIT', 'AMT': 'REIT', 'EQIX': 'REIT', 'SPG': 'REIT', 'PSA': 'REIT',
-    'O': 'REIT', 'WELL': 'REIT', 'DLR': 'REIT', 'CCI': 'REIT', 'AVB': 'REIT',
-    'CBRE': 'REIT', 'SBAC': 'REIT', 'WY': 'REIT', 'EQR': 'REIT', 'VTR': 'REIT',
-    # Communication Services
-    'META': 'Comm', 'GOOGL': 'Comm', 'GOOG': 'Comm', 'NFLX': 'Comm', 'DIS': 'Comm',
-    'T': 'Comm', 'VZ': 'Comm', 'CMCSA': 'Comm', 'TMUS': 'Comm', 'CHTR': 'Comm',
-    'EA': 'Comm', 'TTWO': 'Comm', 'RBLX': 'Comm', 'PARA': 'Comm', 'WBD': 'Comm',
-    'MTCH': 'Comm', 'LYV': 'Comm', 'OMC': 'Comm', 'IPG': 'Comm', 'FOXA': 'Comm',
-    'EPAM': 'Tech', 'ALGN': 'Health',
-}
-
 # Data directory
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
-# Persistent sector cache file
-SECTOR_CACHE_FILE = os.path.join(DATA_DIR, 'sector_cache.json')
+# Shared OHLCV panel (memory-mapped, built by create_us_daily_prices.py)
+from engine.price_panel import open_panel, default_panel_path
+from engine.trading_calendar import EST, last_completed_session, session_close
+PRICE_PANEL_PATH = default_panel_path(DATA_DIR)
+PRICE_STORE_MANIFEST = os.path.join(DATA_DIR, 'price_store', 'manifest.json')
 
-def _load_sector_cache() -> dict:
-    """Load sector cache from file"""
-    try:
-        if os.path.exists(SECTOR_CACHE_FILE):
-            with open(SECTOR_CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+# Daily supply/demand score history (dates x tickers, built by analyze_volume.py)
+from engine.score_history import open_history, default_history_path
+SCORE_HISTORY_PATH = default_history_path(DATA_DIR)
+PERIOD_DAYS = {'1mo': 31, '3mo': 92, '6mo': 183, '1y': 365, '2y': 730, '5y': 1826}
 
-def _save_sector_cache(cache: dict):
-    """Save sector cache to file"""
+def get_panel_history(ticker: str, period: str):
+    """Return local OHLCV history for a period if the panel covers it, else None"""
     try:
-        os.makedirs(os.path.dirname(SECTOR_CACHE_FILE), exist_ok=True)
-        with open(SECTOR_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
+        panel = open_panel(PRICE_PANEL_PATH)
+        if panel is None or ticker not in panel or period not in PERIOD_DAYS:
+            return None
+        # Store updated since the last panel build: serve live data until the rebuild
+        if panel.stale(PRICE_STORE_MANIFEST):
+            return None
+        start = pd.Timestamp.now().normalize() - pd.Timedelta(days=PERIOD_DAYS[period])
+        rows = panel.valid_rows(ticker)
+        if len(rows) == 0 or panel.dates[rows[0]] > start:
+            return None
+        return panel.frame(ticker, start=start)
     except Exception as e:
-        print(f"Error saving sector cache: {e}")
+        print(f"Panel read error for {ticker}: {e}")
+        return None
+
+# Shared universe table (ticker / name / sector / industry / market cap / index membership)
+from engine.universe import load_universe
 
-# Load cache at startup
-_sector_cache = _load_sector_cache()
+# Tickers whose sector lookup came back empty; not retried until SECTOR_RETRY_SECONDS pass
+SECTOR_RETRY_SECONDS = 24 * 3600
+_sector_misses = {}
 
 def get_sector(ticker: str) -> str:
-    """Get sector for a ticker, auto-fetch from yfinance if not in SECTOR_MAP"""
-    global _sector_cache
+    """Get short sector label from the universe, auto-fetch from yfinance if unknown"""
+    universe = load_universe(DATA_DIR)
+    sector = universe.sector_short(ticker)
+    if sector:
+        return sector
     
-    if ticker in SECTOR_MAP:
-        return SECTOR_MAP[ticker]
-    
-    if ticker in _sector_cache:
-        return _sector_cache[ticker]
+    missed = _sector_misses.get(ticker)
+    if missed and (datetime.now() - missed).total_seconds() < SECTOR_RETRY_SECONDS:
+        return '-'
     
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        sector = info.get('sector', '')
-        
-        sector_short_map = {
-            'Technology': 'Tech', 'Information Technology': 'Tech',
-            'Healthcare': 'Health', 'Health Care': 'Health',
-            'Financials': 'Fin', 'Financial Services': 'Fin',
-            'Consumer Discretionary': 'Cons', 'Consumer Cyclical': 'Cons',
-            'Consumer Staples': 'Staple', 'Consumer Defensive': 'Staple',
-            'Energy': 'Energy', 'Industrials': 'Indust',
-            'Materials': 'Mater', 'Basic Materials': 'Mater',
-            'Utilities': 'Util', 'Real Estate': 'REIT',
-            'Communication Services': 'Comm',
-        }
-        
-        short_sector = sector_short_map.get(sector, sector[:5] if sector else '-')
-        _sector_cache[ticker] = short_sector
-        _save_sector_cache(_sector_cache)
-        print(f"✅ Cached sector for {ticker}: {short_sector}")
-        return short_sector
+        universe.enrich([ticker])
+        sector = universe.sector_short(ticker)
+        if not sector:
+            _sector_misses[ticker] = datetime.now()
+            return '-'
+        universe.save()
+        print(f"✅ Cached sector for {ticker}: {sector}")
+        return sector
     except Exception as e:
         print(f"Error fetching sector for {ticker}: {e}")
-        _sector_cache[ticker] = '-'
-        _save_sector_cache(_sector_cache)
+        _sector_misses[ticker] = datetime.now()
         return '-'
 
 # ... (existing imports)
@@ -252,13 +181,14 @@ def check_data_freshness():
         if not os.path.exists(target_file):
             should_update = True
         else:
-            mtime = datetime.fromtimestamp(os.path.getmtime(target_file))
-            age = datetime.now() - mtime
+            mtime = datetime.fromtimestamp(os.path.getmtime(target_file), EST)
+            age = datetime.now(EST) - mtime
             
-            # If older than 6 hours and it's a weekday
-            if age.total_seconds() > 6 * 3600 and datetime.now().weekday() < 5:
+            # Stale once a NYSE session has closed after the last generation (no updates on weekends/holidays)
+            last_session = last_completed_session()
+            if mtime < session_close(last_session):
                 should_update = True
-                print(f"📉 Data is stale ({age.total_seconds()/3600:.1f} hours old). Triggering update.")
+                print(f"📉 Data is stale ({age.total_seconds()/3600:.1f} hours old, session {last_session} closed since). Triggering update.")
 
         if should_update and not is_updating:
             run_update_background()
@@ -535,6 +465,7 @@ def get_us_etf_flows():
                     'top_outflows': data.get('top_outflows', []),
                     'ai_analysis': data.get('ai_analysis', ''),
                     'summary': data.get('summary', {}),
+                    'flows': data.get('flows', {}),
                     'timestamp': data.get('timestamp', '')
                 })
         
@@ -566,8 +497,9 @@ def get_us_stock_chart(ticker):
         if period not in valid_periods:
             period = '1y'
         
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period)
+        hist = get_panel_history(ticker, period)
+        if hist is None or hist.empty:
+            hist = yf.Ticker(ticker).history(period=period)
         if hist.empty:
             return jsonify({'error': f'No data found for {ticker}'}), 404
         
@@ -579,6 +511,25 @@ def get_us_stock_chart(ticker):
         print(f"Error getting US stock chart for {ticker}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/us/supply-demand-history/<ticker>')
+def get_us_supply_demand_history(ticker):
+    """Daily supply/demand score history for a ticker (written by analyze_volume.py)"""
+    try:
+        history = open_history(SCORE_HISTORY_PATH)
+        if history is None:
+            return jsonify({'error': 'Score history not built yet'}), 404
+        series = history.series(ticker.upper(), start=request.args.get('start'), end=request.args.get('end'))
+        if series.empty:
+            return jsonify({'error': f'No score history for {ticker}'}), 404
+        series = series.astype('float64').round(2).astype(object).where(series.notna(), None)
+        return jsonify({
+            'ticker': ticker.upper(),
+            'history': [{'date': d.strftime('%Y-%m-%d'), **row} for d, row in zip(series.index, series.to_dict('records'))]
+        })
+    except Exception as e:
+        print(f"Error getting supply/demand history for {ticker}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/us/history-dates')
 def get_us_history_dates():
     """Get list of available historical analysis dates"""
@@ -939,8 +890,9 @@ def get_technical_indicators(ticker):
     """Get technical indicators (RSI, MACD, Bollinger Bands, Support/Resistance)"""
     try:
         period = request.args.get('period', '1y')
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period)
+        hist = get_panel_history(ticker, period)
+        if hist is None or hist.empty:
+            hist = yf.Ticker(ticker).history(period=period)
         if hist.empty:
             return jsonify({'error': f'No data found for {ticker}'}), 404
         
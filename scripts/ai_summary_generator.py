@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """AI Stock Summary Generator using Gemini"""
-import os, json, logging, time, requests
+import os, sys, json, logging, time, requests
 import pandas as pd
-import yfinance as yf
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -68,7 +70,7 @@ class AIStockAnalyzer:
         except:
             earnings_map = {}
 
-        data = yf.download(tickers, period='1y', progress=False)['Close']
+        data = get_provider('yfinance').download(tickers, period='1y', progress=False)['Close']
         if isinstance(data, pd.Series): data = data.to_frame()
         data = data.ffill().bfill()
 
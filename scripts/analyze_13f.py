@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 """
 US 13F Institutional Holdings Analysis
-Fetches and analyzes institutional holdings from SEC EDGAR
+Ingests 13F-HR filings from SEC EDGAR into a local holdings DB and scores
+institutional support from quarter-over-quarter position changes
 """
 
 import os
+import sys
 import pandas as pd
 import numpy as np
 import requests
@@ -14,8 +16,17 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+from engine.rate_limit import get_limiter
+from engine.universe import load_universe, SP500
+from engine.sec_13f import HoldingsDB, Edgar13FIngestor, company_names, load_cusip_overrides
+from engine.institutional_cache import InstitutionalCache, filing_quarter
+from engine.scoring import ScoreCard, bucket
+
 # Load environment variables
 load_dotenv()
 
@@ -26,6 +37,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Institutional support score (0-100) rules, compiled by engine.scoring
+INSTITUTIONAL_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        # High institutional ownership is generally positive
+        'ownership': [
+            ({'inst_pct': ('>', 0.8)}, 15),
+            ({'inst_pct': ('>', 0.6)}, 10),
+            ({'inst_pct': ('<', 0.3)}, -10),
+        ],
+        # Tracked institutions adding vs trimming (13F QoQ)
+        'net_holders': [
+            ({'net_holders': ('>=', 2)}, 10),
+            ({'net_holders': ('>=', 1)}, 5),
+            ({'net_holders': ('<=', -2)}, -10),
+            ({'net_holders': ('<=', -1)}, -5),
+        ],
+        'tracked_shares': [
+            ({'shares_chg_pct': ('>', 10)}, 5),
+            ({'shares_chg_pct': ('<', -10)}, -5),
+        ],
+        # Insider activity
+        'insiders': [
+            ({'insider_net': ('>', 0)}, 15),
+            ({'insider_net': ('<', 0)}, -10),
+        ],
+        # Low short interest is positive
+        'short_interest': [
+            ({'short_pct': ('<', 0.03)}, 5),
+            ({'short_pct': ('>', 0.2)}, -20),
+            ({'short_pct': ('>', 0.1)}, -10),
+        ],
+    },
+}
+INSTITUTIONAL_STAGES = ([30, 45, 55, 70], ["Strong Institutional Selling", "Institutional Concern", "Neutral",
+                                           "Institutional Support", "Strong Institutional Support"])
+INSTITUTIONAL_CARD = ScoreCard(INSTITUTIONAL_SCORE)
+
 
 class SEC13FAnalyzer:
     """
@@ -39,16 +89,10 @@ class SEC13FAnalyzer:
         self.data_dir = data_dir
         self.output_file = os.path.join(data_dir, 'us_13f_holdings.csv')
         self.cache_file = os.path.join(data_dir, 'us_13f_cache.json')
+        self.db_file = os.path.join(data_dir, 'us_13f_holdings.db')        # local 13F holdings DB
+        self.cusip_file = os.path.join(data_dir, 'cusip_tickers.csv')      # optional cusip,ticker overrides
         
-        # SEC EDGAR API base URL
-        self.sec_base_url = "https://data.sec.gov"
-        
-        # User-Agent required by SEC
-        self.headers = {
-            'User-Agent': 'StockAnalysis/1.0 (contact@example.com)',
-            'Accept-Encoding': 'gzip, deflate',
-            'Host': 'data.sec.gov'
-        }
+        # SEC EDGAR access (User-Agent from SEC_USER_AGENT) goes through the 'sec' provider
         
         # Major institutional investors (CIK numbers)
         self.major_institutions = {
@@ -69,93 +113,151 @@ class SEC13FAnalyzer:
             '0001273087': 'Appaloosa Management',
         }
     
-    def analyze_institutional_changes(self, tickers: List[str]) -> pd.DataFrame:
+    def ingest_13f(self, tickers: List[str], quarters: int = 2) -> Dict:
+        """Pull new 13F-HR filings of the tracked institutions and map their CUSIPs to tickers"""
+        db = HoldingsDB(self.db_file)
+        try:
+            stats = Edgar13FIngestor(db).ingest(self.major_institutions, quarters=quarters)
+            
+            # Issuer names -> tickers: SEC company names, then universe names
+            names = {}
+            try:
+                sec_names = company_names()
+                names.update({t: sec_names[t] for t in tickers if t in sec_names})
+            except Exception as e:
+                logger.warning(f"⚠️ SEC company names unavailable: {e}")
+            universe = load_universe(self.data_dir)
+            names.update({t: universe.name(t) for t in tickers if t not in names and universe.name(t) != t})
+            stats['cusips_mapped'] = db.map_cusips(names, load_cusip_overrides(self.cusip_file))
+            stats['latest_period'] = db.latest_period()
+        finally:
+            db.close()
+        logger.info(f"🏦 13F ingest: {stats}")
+        return stats
+    
+    def load_13f_activity(self, tickers: List[str]) -> pd.DataFrame:
+        """QoQ activity of tracked filers per ticker, from the local holdings DB"""
+        if not os.path.exists(self.db_file):
+            return pd.DataFrame()
+        db = HoldingsDB(self.db_file)
+        try:
+            return db.ticker_activity(tickers)
+        finally:
+            db.close()
+    
+    def fetch_ownership(self, provider, ticker: str) -> Dict:
+        """Ownership, short interest and recent insider trades for one ticker (network)"""
+        info = provider.info(ticker)
+        
+        # Insider transactions
+        try:
+            insider_txns = provider.ticker_data(ticker, 'insider_transactions')
+            if insider_txns is not None and len(insider_txns) > 0:
+                recent = insider_txns.head(10)
+                buys = len(recent[recent['Transaction'].str.contains('Buy', na=False)])
+                sells = len(recent[recent['Transaction'].str.contains('Sale', na=False)])
+                insider_sentiment = 'Buying' if buys > sells else ('Selling' if sells > buys else 'Neutral')
+            else:
+                insider_sentiment = 'Unknown'
+                buys = 0
+                sells = 0
+        except:
+            insider_sentiment = 'Unknown'
+            buys = 0
+            sells = 0
+        
+        short_date = info.get('dateShortInterest')
+        return {
+            'inst_pct': info.get('heldPercentInstitutions', 0) or 0,
+            'insider_pct': info.get('heldPercentInsiders', 0) or 0,
+            'float_shares': info.get('floatShares', 0) or 0,
+            'short_pct': info.get('shortPercentOfFloat', 0) or 0,
+            'short_date': pd.Timestamp(short_date, unit='s').date().isoformat() if short_date else None,
+            'insider_buys': buys,
+            'insider_sells': sells,
+            'insider_sentiment': insider_sentiment,
+        }
+    
+    def fetch_all(self, tickers: List[str], cache: InstitutionalCache, quarter: str,
+                  use_cache: bool = True, workers: int = 8) -> Dict[str, Dict]:
         """
-        Analyze institutional ownership and recent changes
-        Uses yfinance as primary data source
+        Ownership data for all tickers: fresh cache entries first, the rest fetched on a
+        bounded thread pool. Request pacing comes from the shared 'yahoo' token bucket
         """
-        import yfinance as yf
         from tqdm import tqdm
+        provider = get_provider('yfinance')
         
-        results = []
+        ownership, stale = {}, []
+        for ticker in tickers:
+            cached = cache.get(ticker, quarter) if use_cache else None
+            if cached is None:
+                stale.append(ticker)
+            else:
+                ownership[ticker] = cached
         
-        for ticker in tqdm(tickers, desc="Fetching institutional data"):
-            try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                
-                # Basic ownership info
-                inst_pct = info.get('heldPercentInstitutions', 0) or 0
-                insider_pct = info.get('heldPercentInsiders', 0) or 0
-                
-                # Float and shares
-                float_shares = info.get('floatShares', 0) or 0
-                shares_outstanding = info.get('sharesOutstanding', 0) or 0
-                short_pct = info.get('shortPercentOfFloat', 0) or 0
-                
-                # Insider transactions
-                try:
-                    insider_txns = stock.insider_transactions
-                    if insider_txns is not None and len(insider_txns) > 0:
-                        recent = insider_txns.head(10)
-                        buys = len(recent[recent['Transaction'].str.contains('Buy', na=False)])
-                        sells = len(recent[recent['Transaction'].str.contains('Sale', na=False)])
-                        insider_sentiment = 'Buying' if buys > sells else ('Selling' if sells > buys else 'Neutral')
-                    else:
-                        insider_sentiment = 'Unknown'
-                        buys = 0
-                        sells = 0
-                except:
-                    insider_sentiment = 'Unknown'
-                    buys = 0
-                    sells = 0
-                
-                # Institutional holders count
+        def fetch(ticker: str) -> Dict:
+            started = time.time()
+            own = self.fetch_ownership(provider, ticker)
+            short_date = datetime.strptime(own['short_date'], '%Y-%m-%d').date() if own['short_date'] else None
+            cache.put(ticker, own, quarter, short_date, cost=time.time() - started)
+            return own
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(fetch, ticker): ticker for ticker in stale}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching institutional data"):
+                ticker = futures[future]
                 try:
-                    inst_holders = stock.institutional_holders
-                    num_inst_holders = len(inst_holders) if inst_holders is not None else 0
-                except:
-                    num_inst_holders = 0
-                
-                # Score calculation (0-100)
-                score = 50
-                
-                # High institutional ownership is generally positive
-                if inst_pct > 0.8:
-                    score += 15
-                elif inst_pct > 0.6:
-                    score += 10
-                elif inst_pct < 0.3:
-                    score -= 10
-                
-                # Insider activity
-                if buys > sells:
-                    score += 15
-                elif sells > buys:
-                    score -= 10
-                
-                # Low short interest is positive
-                if short_pct < 0.03:
-                    score += 5
-                elif short_pct > 0.1:
-                    score -= 10
-                elif short_pct > 0.2:
-                    score -= 20
+                    ownership[ticker] = future.result()
+                except Exception as e:
+                    logger.debug(f"Error fetching {ticker}: {e}")
+        
+        limiter = get_limiter('yahoo')
+        if stale and limiter is not None:
+            logger.info(f"🚦 Yahoo budget: {limiter.stats()}")
+        return ownership
+    
+    def analyze_institutional_changes(self, tickers: List[str], use_cache: bool = True,
+                                      workers: int = 8) -> pd.DataFrame:
+        """
+        Analyze institutional ownership and recent changes
+        13F holder activity comes from the local holdings DB;
+        ownership / short interest / insider trades from yfinance (cached per 13F quarter
+        and short interest report, see InstitutionalCache)
+        """
+        activity = self.load_13f_activity(tickers)
+        cache = InstitutionalCache(self.cache_file)
+        quarter = filing_quarter()
+        ownership = self.fetch_all(tickers, cache, quarter, use_cache=use_cache, workers=workers)
+        
+        results, features = [], []
+        
+        for ticker in tickers:
+            if ticker not in ownership:
+                continue
+            try:
+                own = ownership[ticker]
                 
-                score = max(0, min(100, score))
+                inst_pct = own['inst_pct']
+                insider_pct = own['insider_pct']
+                float_shares = own['float_shares']
+                short_pct = own['short_pct']
+                buys = own['insider_buys']
+                sells = own['insider_sells']
                 
-                # Determine stage
-                if score >= 70:
-                    stage = "Strong Institutional Support"
-                elif score >= 55:
-                    stage = "Institutional Support"
-                elif score >= 45:
-                    stage = "Neutral"
-                elif score >= 30:
-                    stage = "Institutional Concern"
-                else:
-                    stage = "Strong Institutional Selling"
+                # Tracked 13F filers holding the stock and their QoQ moves (local query)
+                moves = activity.loc[ticker] if ticker in activity.index else None
+                num_inst_holders = int(moves['tracked_holders']) if moves is not None else 0
+                holders_increased = int(moves['holders_increased']) if moves is not None else 0
+                holders_decreased = int(moves['holders_decreased']) if moves is not None else 0
+                shares_chg_pct = float(moves['tracked_shares_chg_pct']) if moves is not None else 0.0
                 
+                features.append({
+                    'inst_pct': float(inst_pct),
+                    'net_holders': holders_increased - holders_decreased,
+                    'shares_chg_pct': shares_chg_pct,
+                    'insider_net': buys - sells,
+                    'short_pct': float(short_pct),
+                })
                 results.append({
                     'ticker': ticker,
                     'institutional_pct': round(inst_pct * 100, 2),
@@ -163,22 +265,34 @@ class SEC13FAnalyzer:
                     'short_pct': round(short_pct * 100, 2),
                     'float_shares_m': round(float_shares / 1e6, 2) if float_shares else 0,
                     'num_inst_holders': num_inst_holders,
+                    'holders_increased': holders_increased,
+                    'holders_decreased': holders_decreased,
+                    'tracked_shares_chg_pct': round(shares_chg_pct, 2),
+                    'period_13f': moves['period_13f'] if moves is not None else None,
                     'insider_buys': buys,
                     'insider_sells': sells,
-                    'insider_sentiment': insider_sentiment,
-                    'institutional_score': score,
-                    'institutional_stage': stage
+                    'insider_sentiment': own['insider_sentiment'],
                 })
                 
-                time.sleep(0.1)  # Rate limiting
-                
             except Exception as e:
-                logger.debug(f"Error analyzing {ticker}: {e}")
+                logger.debug(f"Error scoring {ticker}: {e}")
                 continue
         
-        return pd.DataFrame(results)
+        # Score (0-100) and stage for all tickers at once
+        results_df = pd.DataFrame(results)
+        if not results_df.empty:
+            score = INSTITUTIONAL_CARD.score(pd.DataFrame(features))
+            results_df['institutional_score'] = score.astype(int)
+            results_df['institutional_stage'] = bucket(score, *INSTITUTIONAL_STAGES)
+        
+        cache.save()
+        report = cache.report()
+        logger.info(f"🗃️ Institutional cache ({quarter} 13F quarter): {report['hits']} hits / "
+                    f"{report['misses']} fetched ({report['hit_rate']:.0%} hit rate), "
+                    f"~{report['time_saved_seconds']}s saved")
+        return results_df
     
-    def run(self) -> pd.DataFrame:
+    def run(self, ingest: bool = True, quarters: int = 2, use_cache: bool = True, workers: int = 8) -> pd.DataFrame:
         """Run institutional analysis for stocks in the data directory"""
         logger.info("🚀 Starting 13F Institutional Analysis...")
         
@@ -189,18 +303,17 @@ class SEC13FAnalyzer:
             stocks_df = pd.read_csv(stocks_file)
             tickers = stocks_df['ticker'].tolist()
         else:
-            logger.warning("Stock list not found. Using top 50 S&P 500 stocks.")
-            tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'META', 'TSLA', 'BRK-B',
-                      'UNH', 'JNJ', 'JPM', 'V', 'XOM', 'PG', 'MA', 'HD', 'CVX', 'MRK',
-                      'ABBV', 'LLY', 'PEP', 'KO', 'COST', 'AVGO', 'WMT', 'MCD', 'TMO',
-                      'CSCO', 'ABT', 'CRM', 'ACN', 'DHR', 'ORCL', 'NKE', 'TXN', 'PM',
-                      'NEE', 'INTC', 'AMD', 'QCOM', 'IBM', 'GS', 'CAT', 'BA', 'DIS',
-                      'NFLX', 'PYPL', 'ADBE', 'NOW', 'INTU']
+            logger.warning("Stock list not found. Using S&P 500 members of the universe table.")
+            tickers = load_universe(self.data_dir).tickers(index=SP500)
         
         logger.info(f"📊 Analyzing {len(tickers)} stocks")
         
+        # Quarterly 13F filings -> local holdings DB (only filings not ingested yet)
+        if ingest:
+            self.ingest_13f(tickers, quarters=quarters)
+        
         # Run analysis
-        results_df = self.analyze_institutional_changes(tickers)
+        results_df = self.analyze_institutional_changes(tickers, use_cache=use_cache, workers=workers)
         
         # Save results
         if not results_df.empty:
@@ -225,14 +338,21 @@ def main():
     parser = argparse.ArgumentParser(description='13F Institutional Analysis')
     parser.add_argument('--dir', default=None, help='Data directory')
     parser.add_argument('--tickers', nargs='+', help='Specific tickers to analyze')
+    parser.add_argument('--skip-ingest', action='store_true', help='Score from the local holdings DB without EDGAR')
+    parser.add_argument('--quarters', type=int, default=2, help='13F report periods to ingest per filer')
+    parser.add_argument('--no-cache', action='store_true', help='Re-fetch ownership data for every ticker')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent ownership fetches (paced by the Yahoo budget)')
     args = parser.parse_args()
     
     analyzer = SEC13FAnalyzer(data_dir=args.dir)
     
     if args.tickers:
-        results = analyzer.analyze_institutional_changes(args.tickers)
+        if not args.skip_ingest:
+            analyzer.ingest_13f(args.tickers, quarters=args.quarters)
+        results = analyzer.analyze_institutional_changes(args.tickers, use_cache=not args.no_cache, workers=args.workers)
     else:
-        results = analyzer.run()
+        results = analyzer.run(ingest=not args.skip_ingest, quarters=args.quarters,
+                               use_cache=not args.no_cache, workers=args.workers)
     
     if not results.empty:
         # Show top institutional support
@@ -6,17 +6,25 @@ Tracks money flows in major ETFs and generates AI insights using Gemini
 """
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from tqdm import tqdm
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+from engine.etf_flows import ETFFlowStore, FLOW_WINDOWS, default_flow_store_path
+from engine.price_panel import align_right
+from engine.etf_holdings import ETFHoldings, default_holdings_path, fetch_weights
+from engine.trading_calendar import last_completed_session
+from engine.scoring import ScoreCard, bucket
+
 # Load environment variables
 load_dotenv()
 
@@ -27,6 +35,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Flow proxy score (0-100) rules, compiled by engine.scoring
+FLOW_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        'price_trend': [
+            ({'price_change_20d': ('>', 5)}, 15),
+            ({'price_change_20d': ('>', 2)}, 10),
+            ({'price_change_20d': ('<', -5)}, -15),
+            ({'price_change_20d': ('<', -2)}, -10),
+        ],
+        'volume_confirmation': [
+            ({'volume_ratio': ('>', 1.5), 'price_change_20d': ('>', 0)}, 15),
+            ({'volume_ratio': ('>', 1.2), 'price_change_20d': ('>', 0)}, 10),
+            ({'volume_ratio': ('>', 1.5), 'price_change_20d': ('<', 0)}, -15),
+        ],
+        'obv': [
+            ({'obv_change': ('>', 0)}, 10),
+            ({'obv_change': ('<=', 0)}, -10),
+        ],
+    },
+}
+FLOW_STAGES = ([30, 45, 55, 70], ["Strong Outflow", "Outflow", "Neutral", "Inflow", "Strong Inflow"])
+FLOW_CARD = ScoreCard(FLOW_SCORE)
+
 
 class ETFFlowAnalyzer:
     """Analyze ETF fund flows to detect institutional money movement"""
@@ -39,6 +72,8 @@ class ETFFlowAnalyzer:
         
         self.output_csv = os.path.join(data_dir, 'us_etf_flows.csv')
         self.output_json = os.path.join(data_dir, 'etf_flow_analysis.json')
+        self.flow_store_dir = default_flow_store_path(data_dir)   # daily shares / NAV / flow history
+        self.holdings_file = default_holdings_path(data_dir)      # constituent weights for the look-through
         
         # Major ETFs to track
         self.etf_universe = {
@@ -77,126 +112,182 @@ class ETFFlowAnalyzer:
             'LQD': {'name': 'Investment Grade Corp', 'category': 'Bond'},
         }
         
+        # Market data provider (live / record / replay)
+        self.provider = get_provider('yfinance')
+        
         # Gemini API config
         self.gemini_api_key = os.getenv('GOOGLE_API_KEY')
         self.gemini_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
     
-    def calculate_flow_proxy(self, df: pd.DataFrame) -> Dict:
+    def compute_flow_metrics(self, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
         """
-        Calculate fund flow proxy using price and volume data
-        Since actual flow data requires premium APIs, we use volume-based proxies
+        Flow proxy for every ETF at once from dates x ETFs close / volume arrays
+        Each column is right-aligned on its own bars, so missing days match a per-ETF history
         """
-        if len(df) < 20:
-            return None
-        
-        df = df.sort_values('Date').reset_index(drop=True)
-        
-        # Calculate OBV (On-Balance Volume)
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-                obv.append(obv[-1] + df['Volume'].iloc[i])
-            elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-                obv.append(obv[-1] - df['Volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        
-        df['OBV'] = obv
-        
-        # Recent vs previous period comparison
-        latest_price = df['Close'].iloc[-1]
-        prev_20d_price = df['Close'].iloc[-21] if len(df) > 21 else df['Close'].iloc[0]
-        price_change = ((latest_price / prev_20d_price) - 1) * 100
+        valid = ~np.isnan(close) & ~np.isnan(volume)
+        bars = valid.sum(axis=0)
+        c = align_right(close, valid)
+        v = align_right(volume, valid)
+        cols = np.arange(c.shape[1])
+        
+        # 20d price change (vs the first bar when the history is short)
+        latest = c[-1]
+        first = c[np.clip(len(c) - bars, 0, len(c) - 1), cols]
+        prev_20d = np.where(bars > 21, c[-21] if len(c) >= 21 else first, first)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = (latest / prev_20d - 1) * 100
         
         # Volume trend
-        vol_5d = df['Volume'].tail(5).mean()
-        vol_20d = df['Volume'].tail(20).mean()
-        vol_ratio = vol_5d / vol_20d if vol_20d > 0 else 1
-        
-        # OBV trend
-        obv_change = df['OBV'].iloc[-1] - df['OBV'].iloc[-20] if len(df) >= 20 else 0
-        obv_direction = "Inflow" if obv_change > 0 else "Outflow"
+        vol_5d = v[-5:].mean(axis=0)
+        vol_20d = v[-20:].mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_ratio = np.where(vol_20d > 0, vol_5d / vol_20d, 1.0)
         
-        # Calculate flow score (0-100)
-        score = 50
+        # OBV change over the last 20 bars = sum of the last 19 signed volumes
+        signed = np.sign(np.diff(c, axis=0)) * v[1:]
+        obv_change = np.nansum(signed[-19:], axis=0)
+        inflow = obv_change > 0
         
-        # Price momentum contribution
-        if price_change > 5:
-            score += 15
-        elif price_change > 2:
-            score += 10
-        elif price_change < -5:
-            score -= 15
-        elif price_change < -2:
-            score -= 10
-        
-        # Volume trend contribution
-        if vol_ratio > 1.5 and price_change > 0:
-            score += 15  # High volume with positive price = strong inflow
-        elif vol_ratio > 1.2 and price_change > 0:
-            score += 10
-        elif vol_ratio > 1.5 and price_change < 0:
-            score -= 15  # High volume with negative price = strong outflow
-        
-        # OBV contribution
-        if obv_direction == "Inflow":
-            score += 10
-        else:
-            score -= 10
-        
-        score = max(0, min(100, score))
-        
-        # Determine flow stage
-        if score >= 70:
-            stage = "Strong Inflow"
-        elif score >= 55:
-            stage = "Inflow"
-        elif score >= 45:
-            stage = "Neutral"
-        elif score >= 30:
-            stage = "Outflow"
-        else:
-            stage = "Strong Outflow"
+        score = FLOW_CARD.score({'price_change_20d': price_change, 'volume_ratio': vol_ratio,
+                                 'obv_change': obv_change})
+        stage = bucket(score, *FLOW_STAGES)
         
         return {
-            'current_price': round(latest_price, 2),
-            'price_change_20d': round(price_change, 2),
-            'volume_ratio': round(vol_ratio, 2),
-            'obv_direction': obv_direction,
-            'flow_score': round(score, 1),
-            'flow_stage': stage
+            'valid': bars >= 20,
+            'current_price': np.round(latest, 2),
+            'price_change_20d': np.round(price_change, 2),
+            'volume_ratio': np.round(vol_ratio, 2),
+            'obv_direction': np.where(inflow, "Inflow", "Outflow"),
+            'flow_score': np.round(score, 1),
+            'flow_stage': stage,
         }
     
-    def analyze_all_etfs(self) -> pd.DataFrame:
-        """Analyze all ETFs in the universe"""
-        logger.info("🚀 Starting ETF Flow Analysis...")
-        
-        results = []
+    def calculate_flow_proxy(self, df: pd.DataFrame) -> Dict:
+        """
+        Calculate fund flow proxy using price and volume data (single ETF history)
+        Since actual flow data requires premium APIs, we use volume-based proxies
+        """
+        if len(df) < 20:
+            return None
         
-        for ticker, info in tqdm(self.etf_universe.items(), desc="Analyzing ETFs"):
+        df = df.sort_values('Date')
+        metrics = self.compute_flow_metrics(df[['Close']].to_numpy(dtype='float64'),
+                                            df[['Volume']].to_numpy(dtype='float64'))
+        if not metrics.pop('valid')[0]:
+            return None
+        return {k: v[0].item() for k, v in metrics.items()}
+    
+    def download_panel(self, tickers: List[str], period: str = '3mo', chunk_size: int = 200) -> Dict:
+        """Close / volume panels (dates x tickers) from batched multi-ticker downloads"""
+        closes, volumes = {}, {}
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i:i + chunk_size]
             try:
-                etf = yf.Ticker(ticker)
-                hist = etf.history(period="3mo")
-                
-                if hist.empty:
-                    continue
-                
-                hist = hist.reset_index()
-                flow_data = self.calculate_flow_proxy(hist)
-                
-                if flow_data:
-                    results.append({
-                        'ticker': ticker,
-                        'name': info['name'],
-                        'category': info['category'],
-                        **flow_data
-                    })
-                    
+                data = self.provider.download(chunk, period=period, group_by='ticker',
+                                              auto_adjust=True, threads=False, progress=False)
             except Exception as e:
-                logger.debug(f"Error analyzing {ticker}: {e}")
+                logger.warning(f"⚠️ ETF download failed for {len(chunk)} tickers: {e}")
+                continue
+            if data is None or data.empty:
                 continue
+            for ticker in chunk:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    frame = data[ticker]
+                else:
+                    frame = data
+                closes[ticker] = frame['Close']
+                volumes[ticker] = frame['Volume']
+        
+        close = pd.DataFrame(closes).sort_index()
+        volume = pd.DataFrame(volumes).reindex(index=close.index, columns=close.columns)
+        return {'close': close, 'volume': volume}
+    
+    def fetch_snapshot(self, tickers: List[str], close: pd.DataFrame = None, workers: int = 8) -> pd.DataFrame:
+        """
+        Shares outstanding, NAV and total assets per ETF from the info payload
+        (NAV falls back to the last close; ETFFlowStore.record derives missing shares from total assets)
+        """
+        def snapshot(ticker: str) -> Dict:
+            try:
+                info = self.provider.info(ticker) or {}
+            except Exception as e:
+                logger.debug(f"Info failed for {ticker}: {e}")
+                info = {}
+            nav = info.get('navPrice')
+            if not nav and close is not None and ticker in close.columns and close[ticker].notna().any():
+                nav = float(close[ticker].dropna().iloc[-1])
+            return {
+                'ticker': ticker,
+                'shares': info.get('sharesOutstanding') or np.nan,
+                'nav': nav or np.nan,
+                'total_assets': info.get('totalAssets') or np.nan,
+            }
         
-        return pd.DataFrame(results)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            rows = list(executor.map(snapshot, tickers))
+        return pd.DataFrame(rows, columns=['ticker', 'shares', 'nav', 'total_assets'])
+    
+    def update_flows(self, close: pd.DataFrame = None) -> pd.DataFrame:
+        """Record today's shares / NAV snapshot and return the rolling flow aggregates"""
+        store = ETFFlowStore(self.flow_store_dir)
+        day = last_completed_session()
+        recorded = store.record(day, self.fetch_snapshot(list(self.etf_universe), close))
+        aggregates = store.aggregates()
+        logger.info(f"💵 Recorded shares / NAV for {len(recorded)} ETFs on {day} "
+                    f"({len(store.days)} sessions stored)")
+        return aggregates
+    
+    def refresh_holdings(self, workers: int = 8) -> ETFHoldings:
+        """Refetch constituent weights for ETFs whose table entry is missing or stale"""
+        holdings = ETFHoldings(self.holdings_file)
+        stale = holdings.stale(list(self.etf_universe))
+        if not stale:
+            return holdings
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            fetched = dict(zip(stale, executor.map(lambda etf: fetch_weights(self.provider, etf), stale)))
+        updated = [etf for etf, weights in fetched.items() if weights]
+        for etf in updated:
+            holdings.update(etf, fetched[etf])
+        if updated:
+            holdings.save()
+        logger.info(f"🧺 Refreshed holdings for {len(updated)}/{len(stale)} stale ETFs "
+                    f"({len(holdings.df)} constituent weights)")
+        return holdings
+    
+    def analyze_all_etfs(self) -> pd.DataFrame:
+        """Analyze all ETFs in the universe (one batched download, vectorized metrics)"""
+        logger.info("🚀 Starting ETF Flow Analysis...")
+        
+        panel = self.download_panel(list(self.etf_universe))
+        close, volume = panel['close'], panel['volume']
+        if close.empty:
+            return pd.DataFrame()
+        logger.info(f"📦 Downloaded {close.shape[1]} ETFs x {close.shape[0]} days")
+        
+        metrics = self.compute_flow_metrics(close.to_numpy(dtype='float64'), volume.to_numpy(dtype='float64'))
+        valid = metrics.pop('valid')
+        tickers = close.columns[valid]
+        results = pd.DataFrame({
+            'ticker': tickers,
+            'name': [self.etf_universe[t]['name'] for t in tickers],
+            'category': [self.etf_universe[t]['category'] for t in tickers],
+            **{k: v[valid] for k, v in metrics.items()},
+        })
+        
+        # Creation / redemption flows (Δshares x NAV) from the local history
+        try:
+            self.flows = self.update_flows(close)
+        except Exception as e:
+            logger.warning(f"⚠️ ETF flow update failed: {e}")
+            self.flows = pd.DataFrame()
+        if not self.flows.empty:
+            columns = {f'flow_{w}d': f'flow_{w}d_usd' for w in FLOW_WINDOWS}
+            columns.update({'aum': 'aum_usd', 'flow_20d_pct': 'flow_20d_pct'})
+            results = results.merge(self.flows[list(columns)].rename(columns=columns),
+                                    left_on='ticker', right_index=True, how='left')
+        return results
     
     def generate_ai_analysis(self, results_df: pd.DataFrame) -> str:
         """Generate AI analysis of ETF flows using Gemini"""
@@ -268,9 +359,25 @@ class ETFFlowAnalyzer:
         results_df.to_csv(self.output_csv, index=False)
         logger.info(f"✅ Saved ETF data to {self.output_csv}")
         
+        # Constituent weights used by the screener's flow look-through
+        try:
+            self.refresh_holdings()
+        except Exception as e:
+            logger.warning(f"⚠️ ETF holdings refresh failed: {e}")
+        
         # Generate AI analysis
         ai_insight = self.generate_ai_analysis(results_df)
         
+        # Precomputed rolling flows served as-is by /api/us/etf-flows
+        flows = getattr(self, 'flows', pd.DataFrame())
+        flow_records = []
+        if not flows.empty:
+            table = flows.loc[flows.index.isin(results_df['ticker'])].copy()
+            table['name'] = [self.etf_universe[t]['name'] for t in table.index]
+            table = table.sort_values('flow_5d', ascending=False, na_position='last').reset_index()
+            table = table.round({c: 2 for c in table.columns if c.endswith('_pct')})
+            flow_records = json.loads(table.to_json(orient='records'))
+        
         # Prepare summary output
         output = {
             'timestamp': datetime.now().isoformat(),
@@ -283,6 +390,11 @@ class ETFFlowAnalyzer:
             },
             'top_inflows': results_df.nlargest(5, 'flow_score')[['ticker', 'name', 'flow_score', 'price_change_20d']].to_dict('records'),
             'top_outflows': results_df.nsmallest(5, 'flow_score')[['ticker', 'name', 'flow_score', 'price_change_20d']].to_dict('records'),
+            'flows': {
+                'windows': list(FLOW_WINDOWS),
+                'as_of': max((r['as_of'] for r in flow_records if r.get('as_of')), default=None),
+                'etfs': flow_records,
+            },
             'ai_analysis': ai_insight
         }
         
@@ -6,14 +6,24 @@ Calculates OBV, Accumulation/Distribution Line, Volume Surge Detection
 """
 
 import os
+import sys
 import pandas as pd
 import numpy as np
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.price_store import PriceStore
+from engine.price_panel import PricePanel, open_panel, default_panel_path
+from engine.volume_state import VolumeState
+from engine.score_history import ScoreHistory, default_history_path
+from engine.scoring import ScoreCard, bucket
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +34,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Supply/Demand score (0-100) rules, compiled by engine.scoring
+SUPPLY_DEMAND_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        'obv': [
+            ({'obv_change_20d': ('>', 10)}, 15),
+            ({'obv_change_20d': ('>', 5)}, 10),
+            ({'obv_change_20d': ('<', -10)}, -15),
+            ({'obv_change_20d': ('<', -5)}, -10),
+        ],
+        'ad': [
+            ({'ad_change_20d': ('>', 10)}, 15),
+            ({'ad_change_20d': ('>', 5)}, 10),
+            ({'ad_change_20d': ('<', -10)}, -15),
+            ({'ad_change_20d': ('<', -5)}, -10),
+        ],
+        'volume_ratio': [
+            ({'vol_ratio_5d_20d': ('>', 1.5)}, 10),
+            ({'vol_ratio_5d_20d': ('>', 1.2)}, 5),
+            ({'vol_ratio_5d_20d': ('<', 0.7)}, -5),
+        ],
+        'mfi': [
+            ({'mfi': ('>', 70)}, 5),      # Overbought but with buying pressure
+            ({'mfi': ('<', 30)}, -5),     # Oversold, possible capitulation
+        ],
+    },
+}
+SUPPLY_DEMAND_STAGES = ([30, 45, 55, 70], ["Strong Distribution", "Distribution", "Neutral",
+                                           "Accumulation", "Strong Accumulation"])
+SUPPLY_DEMAND_CARD = ScoreCard(SUPPLY_DEMAND_SCORE)
+
+
+def _panel_frame(panel: PricePanel, tickers: List[str]) -> pd.DataFrame:
+    """Long (ticker, date, high, low, current_price, volume) frame for a slice of panel columns"""
+    cols = [panel.ticker_index[t] for t in tickers]
+    fields = [panel.field_index[f] for f in ('high', 'low', 'close', 'volume')]
+    block = np.transpose(panel.data[:, cols, :][:, :, fields], (1, 0, 2))   # tickers x dates x fields
+    valid = ~np.isnan(block[:, :, 2])
+    ticker_idx, date_idx = np.nonzero(valid)
+    values = block[valid]
+    return pd.DataFrame({
+        'ticker': np.asarray(tickers, dtype=object)[ticker_idx],
+        'date': panel.dates.values[date_idx],
+        'high': values[:, 0],
+        'low': values[:, 1],
+        'current_price': values[:, 2],
+        'volume': values[:, 3],
+    })
+
+
+def _analyze_shard(panel_path: str, tickers: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Worker: score one shard of tickers straight from the memory-mapped panel
+    Only ticker names go in and column arrays come back (no DataFrames are pickled)
+    """
+    panel = open_panel(panel_path)
+    result = VolumeAnalyzer(os.path.dirname(panel_path)).analyze_all(_panel_frame(panel, tickers))
+    return {c: result[c].to_numpy() for c in result.columns}
+
 
 class VolumeAnalyzer:
     """Volume-based technical analysis for supply/demand detection"""
@@ -32,13 +102,22 @@ class VolumeAnalyzer:
         if data_dir is None:
             data_dir = os.getenv('DATA_DIR', os.path.join(os.path.dirname(__file__), '..', 'data'))
         self.data_dir = data_dir
-        self.prices_file = os.path.join(data_dir, 'us_daily_prices.csv')
+        self.store_dir = os.path.join(data_dir, 'price_store')
+        self.prices_file = os.path.join(data_dir, 'us_daily_prices.csv')  # legacy fallback
         self.output_file = os.path.join(data_dir, 'us_volume_analysis.csv')
+        self.state_file = os.path.join(data_dir, 'volume_state.npz')  # running indicator state
+        self.history_dir = default_history_path(data_dir)             # daily score history
+        
+    def load_prices(self, tickers: List[str] = None) -> pd.DataFrame:
+        """Load daily price data (only the columns used by the indicators)"""
+        store = PriceStore(self.store_dir)
+        if not store.is_empty():
+            logger.info(f"📂 Loading prices from {self.store_dir}")
+            tickers = tickers if tickers is not None else store.stock_tickers()
+            return store.load(tickers=tickers, columns=['high', 'low', 'current_price', 'volume', 'name'])
         
-    def load_prices(self) -> pd.DataFrame:
-        """Load daily price data"""
         if not os.path.exists(self.prices_file):
-            raise FileNotFoundError(f"Price file not found: {self.prices_file}")
+            raise FileNotFoundError(f"Price store not found: {self.store_dir}")
         
         logger.info(f"📂 Loading prices from {self.prices_file}")
         df = pd.read_csv(self.prices_file)
@@ -52,15 +131,8 @@ class VolumeAnalyzer:
         - Price down: Subtract volume
         - Price unchanged: No change
         """
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['current_price'].iloc[i] > df['current_price'].iloc[i-1]:
-                obv.append(obv[-1] + df['volume'].iloc[i])
-            elif df['current_price'].iloc[i] < df['current_price'].iloc[i-1]:
-                obv.append(obv[-1] - df['volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        return pd.Series(obv, index=df.index)
+        direction = np.sign(df['current_price'].diff().fillna(0))
+        return (direction * df['volume']).cumsum()
     
     def calculate_ad_line(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -212,40 +284,359 @@ class VolumeAnalyzer:
             'supply_demand_stage': stage
         }
     
-    def run(self) -> pd.DataFrame:
-        """Run volume analysis for all stocks"""
-        logger.info("🚀 Starting Volume Analysis...")
+    # ------------------------------------------------------------------ all tickers at once
+    
+    @staticmethod
+    def _rolling_sum(values: np.ndarray, grouped_cumsum: np.ndarray, pos: np.ndarray, window: int) -> np.ndarray:
+        """Per-ticker rolling sum from a grouped cumsum (NaN until the window is full)"""
+        out = np.full(len(values), np.nan)
+        full = pos >= window - 1
+        out[full] = grouped_cumsum[full]
+        later = pos >= window
+        out[later] -= grouped_cumsum[np.flatnonzero(later) - window]
+        return out
+    
+    def compute_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        OBV, A/D line, MFI, volume SMA(20) and surge flags for every ticker in one pass
+        Rows are sorted by (ticker, date); cumulative and rolling values restart per ticker
+        """
+        df = df.sort_values(['ticker', 'date'], kind='stable').reset_index(drop=True)
+        codes = pd.factorize(df['ticker'])[0]
+        first = np.r_[True, codes[1:] != codes[:-1]]
+        starts = np.flatnonzero(first)
+        pos = np.arange(len(df)) - np.repeat(starts, np.diff(np.r_[starts, len(df)]))
         
-        # Load data
-        df = self.load_prices()
+        close = df['current_price'].to_numpy(dtype='float64')
+        high = df['high'].to_numpy(dtype='float64')
+        low = df['low'].to_numpy(dtype='float64')
+        volume = df['volume'].to_numpy(dtype='float64')
+        grouped = lambda values: pd.Series(values).groupby(codes).cumsum().to_numpy()
         
-        # Get unique tickers
-        tickers = df['ticker'].unique()
-        logger.info(f"📊 Analyzing {len(tickers)} stocks")
+        # OBV: signed volume by close direction (first bar of each ticker = 0)
+        close_diff = np.r_[0.0, np.diff(close)]
+        close_diff[first] = 0.0
+        df['obv'] = grouped(np.sign(close_diff) * volume)
         
-        results = []
+        # A/D line
+        high_low = np.where(high - low == 0, 0.0001, high - low)
+        clv = ((close - low) - (high - close)) / high_low
+        df['ad_line'] = grouped(clv * volume)
+        
+        # Volume SMA(20) and surges
+        vol_sum_20 = self._rolling_sum(volume, grouped(volume), pos, 20)
+        df['vol_sma_20'] = vol_sum_20 / 20
+        df['vol_surge'] = volume > df['vol_sma_20'].to_numpy() * 2.0
+        df['vol_sum_5'] = self._rolling_sum(volume, grouped(volume), pos, 5)
+        df['vol_sum_20'] = vol_sum_20
+        surge = df['vol_surge'].to_numpy(dtype='float64')
+        df['surge_count_5'] = self._rolling_sum(surge, grouped(surge), pos, 5)
+        df['surge_count_20'] = self._rolling_sum(surge, grouped(surge), pos, 20)
+        
+        # MFI(14)
+        typical = (high + low + close) / 3
+        money_flow = typical * volume
+        tp_diff = np.r_[np.nan, np.diff(typical)]
+        tp_diff[first] = np.nan
+        positive = np.where(tp_diff > 0, money_flow, 0.0)
+        negative = np.where(tp_diff < 0, money_flow, 0.0)
+        positive_mf = self._rolling_sum(positive, grouped(positive), pos, 14)
+        negative_mf = self._rolling_sum(negative, grouped(negative), pos, 14)
+        negative_mf = np.where(negative_mf == 0, 0.0001, negative_mf)
+        df['mfi'] = 100 - (100 / (1 + positive_mf / negative_mf))
+        df['pos_mf'] = positive
+        df['neg_mf'] = negative
+        
+        df['pos'] = pos
+        return df
+    
+    @staticmethod
+    def _pct_change_20(values: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """(x[-1] - x[-20]) / |x[-20]| * 100, 0 when x[-20] == 0"""
+        base = values[last - 19]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (values[last] - base) / np.abs(base) * 100
+        return np.where(base != 0, change, 0.0)
+    
+    def score_latest(self, ind: pd.DataFrame) -> pd.DataFrame:
+        """Latest supply/demand features and score per ticker (tickers with >= 30 bars)"""
+        counts = ind.groupby('ticker', sort=False).size()
+        last = np.cumsum(counts.to_numpy()) - 1
+        last = last[counts.to_numpy() >= 30]
+        return self.score_features(self.row_features(ind, last))
+    
+    def score_history(self, ind: pd.DataFrame) -> pd.DataFrame:
+        """Score for every bar that has >= 30 bars of history (backfill)"""
+        rows = np.flatnonzero(ind['pos'].to_numpy() >= 29)
+        return self.score_features(self.row_features(ind, rows))
+    
+    def row_features(self, ind: pd.DataFrame, last: np.ndarray) -> pd.DataFrame:
+        """Supply/demand inputs at the given indicator rows"""
+        obv = ind['obv'].to_numpy()
+        ad = ind['ad_line'].to_numpy()
+        vol_5d = ind['vol_sum_5'].to_numpy()[last] / 5
+        vol_20d = ind['vol_sum_20'].to_numpy()[last] / 20
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_ratio = np.where(vol_20d > 0, vol_5d / vol_20d, 1.0)
         
-        for ticker in tqdm(tickers, desc="Analyzing volume"):
+        latest = ind.iloc[last]
+        return pd.DataFrame({
+            'ticker': latest['ticker'].to_numpy(),
+            'name': latest['name'].to_numpy() if 'name' in ind.columns else latest['ticker'].to_numpy(),
+            'date': latest['date'].to_numpy(),
+            'obv': obv[last],
+            'obv_change_20d': self._pct_change_20(obv, last),
+            'ad_line': ad[last],
+            'ad_change_20d': self._pct_change_20(ad, last),
+            'mfi': ind['mfi'].to_numpy()[last],
+            'vol_ratio_5d_20d': vol_ratio,
+            'surge_count_5d': ind['surge_count_5'].to_numpy()[last],
+            'surge_count_20d': ind['surge_count_20'].to_numpy()[last],
+        })
+    
+    def score_features(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Supply/demand score and stage from the latest indicator values (one row per ticker)"""
+        obv_change = features['obv_change_20d'].to_numpy(dtype='float64')
+        ad_change = features['ad_change_20d'].to_numpy(dtype='float64')
+        vol_ratio = features['vol_ratio_5d_20d'].to_numpy(dtype='float64')
+        mfi = features['mfi'].to_numpy(dtype='float64')
+        mfi = np.where(np.isnan(mfi), 50.0, mfi)
+        
+        score = SUPPLY_DEMAND_CARD.score({'obv_change_20d': obv_change, 'ad_change_20d': ad_change,
+                                          'vol_ratio_5d_20d': vol_ratio, 'mfi': mfi})
+        stage = bucket(score, *SUPPLY_DEMAND_STAGES)
+        
+        return pd.DataFrame({
+            'ticker': features['ticker'].to_numpy(),
+            'name': features['name'].to_numpy(),
+            'date': features['date'].to_numpy(),
+            'obv': features['obv'].to_numpy(),
+            'obv_change_20d': np.round(obv_change, 2),
+            'ad_line': features['ad_line'].to_numpy(),
+            'ad_change_20d': np.round(ad_change, 2),
+            'mfi': np.round(mfi, 1),
+            'vol_ratio_5d_20d': np.round(vol_ratio, 2),
+            'surge_count_5d': features['surge_count_5d'].to_numpy().astype(int),
+            'surge_count_20d': features['surge_count_20d'].to_numpy().astype(int),
+            'supply_demand_score': np.round(score, 1),
+            'supply_demand_stage': stage,
+        })
+    
+    def analyze_all(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized supply/demand analysis for the whole universe"""
+        return self.score_latest(self.compute_indicators(df))
+    
+    def analyze_per_ticker(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reference path (previous run loop): filter + analyze_supply_demand per ticker"""
+        results = []
+        for ticker in tqdm(df['ticker'].unique(), desc="Analyzing volume (per ticker)"):
             ticker_data = df[df['ticker'] == ticker].copy()
             
             if len(ticker_data) < 30:
                 continue
             
             analysis = self.analyze_supply_demand(ticker_data)
-            
             if analysis:
-                result = {
+                results.append({
                     'ticker': ticker,
                     'name': ticker_data['name'].iloc[-1] if 'name' in ticker_data.columns else ticker,
                     **analysis
-                }
-                results.append(result)
+                })
+        return pd.DataFrame(results)
+    
+    # ------------------------------------------------------------------ multi-process
+    
+    def ensure_panel(self, store: PriceStore) -> str:
+        """Price panel path, rebuilt from the store when missing or older than the manifest"""
+        panel_path = default_panel_path(self.data_dir)
+        panel = open_panel(panel_path)
+        if panel is None or panel.stale(store.manifest_file):
+            PricePanel.build(store, panel_path)
+        return panel_path
+    
+    def analyze_sharded(self, workers: int, panel_path: str = None) -> pd.DataFrame:
+        """
+        Shard tickers across a process pool; every worker reads the shared panel memmap
+        Shards are contiguous, ticker-sorted slices, and results are concatenated in
+        shard order, so the output does not depend on the worker count
+        """
+        store = PriceStore(self.store_dir)
+        panel_path = panel_path or self.ensure_panel(store)
+        tickers = sorted(set(open_panel(panel_path).tickers) - set(store.benchmarks()))
         
-        # Create DataFrame
-        results_df = pd.DataFrame(results)
+        # A few shards per worker so uneven tickers still balance
+        n_shards = min(len(tickers), max(1, workers * 4))
+        shards = [list(chunk) for chunk in np.array_split(np.asarray(tickers, dtype=object), n_shards) if len(chunk)]
         
-        # Save results
+        if workers <= 1:
+            parts = [_analyze_shard(panel_path, shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = list(executor.map(_analyze_shard, [panel_path] * len(shards), shards))
+        
+        results_df = pd.concat([pd.DataFrame(part) for part in parts], ignore_index=True)
+        results_df['name'] = [store.get_meta(t).get('name', t) for t in results_df['ticker']]
+        return results_df
+    
+    def scaling(self, max_workers: int, repeat: int = 3) -> Dict:
+        """Wall time, speedup and parallel efficiency for 1, 2, 4 ... max_workers processes"""
+        panel_path = self.ensure_panel(PriceStore(self.store_dir))
+        counts = sorted({1, max_workers} | {2 ** k for k in range(1, max_workers.bit_length()) if 2 ** k < max_workers})
+        
+        report, reference = {}, None
+        for workers in counts:
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = self.analyze_sharded(workers, panel_path)
+                best = min(best, time.perf_counter() - started)
+            if reference is None:
+                reference = result
+            speedup = report[1]['seconds'] / best if report else 1.0
+            report[workers] = {
+                'seconds': round(best, 3),
+                'speedup': round(speedup, 2),
+                'efficiency': round(speedup / workers, 2),
+                'identical': bool(result.equals(reference)),
+            }
+            logger.info(f"   workers={workers}: {report[workers]['seconds']}s | speedup {report[workers]['speedup']}x "
+                        f"| efficiency {report[workers]['efficiency']:.0%} | identical: {report[workers]['identical']}")
+        return report
+    
+    # ------------------------------------------------------------------ streaming
+    
+    def analyze_incremental(self, store: PriceStore, state: VolumeState) -> pd.DataFrame:
+        """
+        Push only the bars stored since the last run into the running state
+        Tickers that are new or whose history was re-adjusted (last close changed)
+        are re-seeded from a full computation
+        """
+        columns = ['date', 'high', 'low', 'current_price', 'volume']
+        benchmarks = set(store.benchmarks())
+        latest_dates = {t: d for t, d in store.latest_dates().items() if t not in benchmarks}
+        rebuild, pushed = [], 0
+        
+        for ticker in latest_dates:
+            i = state.index.get(ticker)
+            if i is None:
+                rebuild.append(ticker)
+                continue
+            state_day = int(state.scalars['last_day'][i])
+            bars = store.read_ticker(ticker, columns, start=np.datetime64(state_day, 'D'))
+            if (len(bars['date']) == 0 or int(bars['date'][0]) != state_day
+                    or float(bars['current_price'][0]) != float(state.scalars['last_close'][i])):
+                rebuild.append(ticker)
+                continue
+            for k in range(1, len(bars['date'])):
+                state.push(ticker, int(bars['date'][k]), float(bars['high'][k]), float(bars['low'][k]),
+                           float(bars['current_price'][k]), float(bars['volume'][k]))
+                pushed += 1
+        
+        if rebuild:
+            logger.info(f"🔄 Re-seeding {len(rebuild)} tickers from full history")
+            state.seed(self.compute_indicators(self.load_prices(tickers=rebuild)))
+        state.drop([t for t in state.tickers if t not in latest_dates])
+        logger.info(f"⚡ Streamed {pushed} new bars into {len(state.tickers)} ticker states")
+        
+        features = state.features(sorted(latest_dates))
+        features.insert(1, 'name', [store.get_meta(t).get('name', t) for t in features['ticker']])
+        return self.score_features(features)
+    
+    def check_consistency(self, streamed: pd.DataFrame) -> Dict:
+        """Compare streamed results with a full recomputation"""
+        full = self.analyze_all(self.load_prices())
+        merged = full.merge(streamed, on='ticker', suffixes=('_full', '_stream'))
+        numeric = ['obv', 'ad_line', 'obv_change_20d', 'ad_change_20d', 'mfi', 'vol_ratio_5d_20d',
+                   'surge_count_5d', 'surge_count_20d', 'supply_demand_score']
+        report = {
+            'tickers_full': len(full),
+            'tickers_streamed': len(streamed),
+            'tickers_compared': len(merged),
+            'max_abs_diff': {c: float((merged[f'{c}_full'] - merged[f'{c}_stream']).abs().max()) for c in numeric},
+            'stage_mismatches': int((merged['supply_demand_stage_full'] != merged['supply_demand_stage_stream']).sum()),
+            'date_mismatches': int((pd.to_datetime(merged['date_full']) != pd.to_datetime(merged['date_stream'])).sum()),
+        }
+        ok = (report['tickers_full'] == report['tickers_compared'] and report['stage_mismatches'] == 0
+              and report['date_mismatches'] == 0 and report['max_abs_diff']['supply_demand_score'] == 0)
+        logger.info(f"{'✅' if ok else '❌'} Streaming vs full: {report}")
+        return report
+    
+    def backfill_history(self) -> int:
+        """Score every stored bar and write the full score history"""
+        ind = self.compute_indicators(self.load_prices())
+        scores = self.score_history(ind)
+        logger.info(f"🗂️ Backfilling {len(scores):,} daily scores for {scores['ticker'].nunique()} tickers")
+        return ScoreHistory(self.history_dir).write(scores)
+    
+    def benchmark(self, repeat: int = 3) -> Dict:
+        """Time per-ticker vs vectorized analysis on the real price data and check they agree"""
+        df = self.load_prices()
+        logger.info(f"⏱️ Benchmarking on {len(df):,} rows / {df['ticker'].nunique()} tickers")
+        
+        timings = {}
+        for label, fn in (('per_ticker', self.analyze_per_ticker), ('vectorized', self.analyze_all)):
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = fn(df)
+                best = min(best, time.perf_counter() - started)
+            timings[label] = (best, result)
+        
+        reference, vectorized = timings['per_ticker'][1], timings['vectorized'][1]
+        merged = reference.merge(vectorized, on='ticker', suffixes=('_ref', '_vec'))
+        numeric = ['obv', 'ad_line', 'obv_change_20d', 'ad_change_20d', 'mfi', 'vol_ratio_5d_20d', 'supply_demand_score']
+        max_diff = {c: float((merged[f'{c}_ref'] - merged[f'{c}_vec']).abs().max()) for c in numeric}
+        stage_mismatch = int((merged['supply_demand_stage_ref'] != merged['supply_demand_stage_vec']).sum())
+        
+        report = {
+            'rows': len(df),
+            'tickers': len(vectorized),
+            'per_ticker_sec': round(timings['per_ticker'][0], 3),
+            'vectorized_sec': round(timings['vectorized'][0], 3),
+            'speedup': round(timings['per_ticker'][0] / max(timings['vectorized'][0], 1e-9), 1),
+            'max_abs_diff': max_diff,
+            'stage_mismatches': stage_mismatch,
+        }
+        logger.info(f"   per-ticker: {report['per_ticker_sec']}s | vectorized: {report['vectorized_sec']}s "
+                    f"| speedup: {report['speedup']}x")
+        logger.info(f"   max |diff|: {max_diff} | stage mismatches: {stage_mismatch}")
+        return report
+    
+    def run(self, full: bool = False, check: bool = False, workers: int = 0) -> pd.DataFrame:
+        """
+        Run volume analysis for all stocks
+        Incremental when a saved state exists; workers > 0 runs a full sharded pass instead
+        """
+        logger.info("🚀 Starting Volume Analysis...")
+        
+        store = PriceStore(self.store_dir)
+        state = None if full or workers or store.is_empty() else VolumeState.load(self.state_file)
+        
+        if workers and not store.is_empty():
+            started = time.perf_counter()
+            results_df = self.analyze_sharded(workers)
+            logger.info(f"⚡ Scored {len(results_df)} tickers with {workers} worker processes "
+                        f"in {time.perf_counter() - started:.2f}s")
+        elif state is not None:
+            results_df = self.analyze_incremental(store, state)
+        else:
+            # One vectorized pass over the whole universe
+            df = self.load_prices()
+            logger.info(f"📊 Analyzing {df['ticker'].nunique()} stocks")
+            indicators = self.compute_indicators(df)
+            results_df = self.score_latest(indicators)
+            if not store.is_empty():
+                state = VolumeState()
+                state.seed(indicators)
+        
+        if state is not None:
+            state.save(self.state_file)
+            if check:
+                self.check_consistency(results_df)
+        
+        # Save results (+ today's row of the score history)
         results_df.to_csv(self.output_file, index=False)
+        ScoreHistory(self.history_dir).write(results_df)
         logger.info(f"✅ Analysis complete! Saved to {self.output_file}")
         
         # Print summary
@@ -263,10 +654,25 @@ def main():
     
     parser = argparse.ArgumentParser(description='US Stock Volume Analysis')
     parser.add_argument('--dir', default=None, help='Data directory')
+    parser.add_argument('--benchmark', action='store_true', help='Compare per-ticker vs vectorized timing')
+    parser.add_argument('--full', action='store_true', help='Recompute from full history and rebuild the streaming state')
+    parser.add_argument('--check', action='store_true', help='Verify streamed results against a full recomputation')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Shard tickers across N processes (with --benchmark: report scaling up to N)')
+    parser.add_argument('--backfill-history', action='store_true', help='Write the score history for all stored bars')
     args = parser.parse_args()
     
     analyzer = VolumeAnalyzer(data_dir=args.dir)
-    results = analyzer.run()
+    if args.backfill_history:
+        analyzer.backfill_history()
+    if args.benchmark:
+        if args.workers:
+            analyzer.scaling(args.workers)
+        else:
+            analyzer.benchmark()
+        return
+    
+    results = analyzer.run(full=args.full, check=args.check, workers=args.workers)
     
     # Show top 10 accumulation stocks
     print("\n🔥 Top 10 Accumulation Stocks:")
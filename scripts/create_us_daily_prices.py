@@ -7,18 +7,33 @@ Similar to create_complete_daily_prices.py for Korean stocks
 """
 
 import os
+import sys
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.price_store import PriceStore, BENCHMARK_MARKET
+from engine.price_panel import PricePanel, default_panel_path
+from engine.market_data import get_provider
+from engine.trading_calendar import last_completed_session, next_trading_day
+from engine.fetch_ledger import FailureLedger, REASON_EMPTY, REASON_NO_DATA
+from engine.corporate_actions import CorporateActionLedger, extract_actions
+from engine.universe import load_universe, SP500
+
 # Load environment variables
 load_dotenv()
 
+# Benchmarks stored alongside the stock list (relative strength in the screeners);
+# analyzers skip them via PriceStore.stock_tickers()
+BENCHMARKS = {'SPY': 'SPDR S&P 500 ETF'}
+
 # Logging Configuration
 logging.basicConfig(
     level=logging.INFO,
@@ -34,85 +49,55 @@ class USStockDailyPricesCreator:
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Data file paths
-        self.prices_file = os.path.join(self.output_dir, 'us_daily_prices.csv')
+        self.prices_file = os.path.join(self.output_dir, 'us_daily_prices.csv')  # legacy, migrated once
+        self.store_dir = os.path.join(self.output_dir, 'price_store')
         self.stocks_list_file = os.path.join(self.output_dir, 'us_stocks_list.csv')
+        self.failures_file = os.path.join(self.output_dir, 'fetch_failures.json')
+        self.actions_file = os.path.join(self.output_dir, 'corporate_actions.json')
+        
+        # Market data provider (live / record / replay)
+        self.provider = get_provider('yfinance')
+        
+        # Failure reason / cost (seconds) of the tickers missing from the last download
+        self.fetch_failures: Dict[str, Tuple[str, float]] = {}
+        
+        # Splits / dividends seen in the downloaded windows, applied when the ticker is saved
+        self.corporate_actions = CorporateActionLedger(self.actions_file)
+        self.pending_actions: Dict[str, List[Dict]] = {}
         
         # Start date for historical data
         self.start_date = datetime(2020, 1, 1)
         self.end_date = datetime.now()
         
     def get_sp500_tickers(self) -> List[Dict]:
-        """Get full S&P 500 tickers list"""
+        """Get full S&P 500 tickers list from the shared universe table"""
         logger.info("📊 Loading full S&P 500 stocks...")
         
-        # Full S&P 500 tickers (as of late 2024)
-        sp500_tickers = [
-            "A", "AAL", "AAPL", "ABBV", "ABNB", "ABT", "ACGL", "ACN", "ADBE", "ADI",
-            "ADM", "ADP", "ADSK", "AEE", "AEP", "AES", "AFL", "AIG", "AIZ", "AJG",
-            "AKAM", "ALB", "ALGN", "ALL", "ALLE", "AMAT", "AMCR", "AMD", "AME", "AMGN",
-            "AMP", "AMT", "AMZN", "ANET", "ANSS", "AON", "AOS", "APA", "APD", "APH",
-            "APTV", "ARE", "ATO", "AVB", "AVGO", "AVY", "AWK", "AXON", "AXP", "AZO",
-            "BA", "BAC", "BALL", "BAX", "BBWI", "BBY", "BDX", "BEN", "BF-B", "BG",
-            "BIIB", "BIO", "BK", "BKNG", "BKR", "BLDR", "BLK", "BMY", "BR", "BRK-B",
-            "BRO", "BSX", "BWA", "BX", "BXP", "C", "CAG", "CAH", "CARR", "CAT",
-            "CB", "CBOE", "CBRE", "CCI", "CCL", "CDNS", "CDW", "CE", "CEG", "CF",
-            "CFG", "CHD", "CHRW", "CHTR", "CI", "CINF", "CL", "CLX", "CMCSA", "CME",
-            "CMG", "CMI", "CMS", "CNC", "CNP", "COF", "COO", "COP", "COR", "COST",
-            "CPAY", "CPB", "CPRT", "CPT", "CRL", "CRM", "CSCO", "CSGP", "CSX", "CTAS",
-            "CTLT", "CTRA", "CTSH", "CTVA", "CVS", "CVX", "CZR", "D", "DAL", "DAY",
-            "DD", "DE", "DECK", "DFS", "DG", "DGX", "DHI", "DHR", "DIS", "DLR",
-            "DLTR", "DOC", "DOV", "DOW", "DPZ", "DRI", "DTE", "DUK", "DVA", "DVN",
-            "DXCM", "EA", "EBAY", "ECL", "ED", "EFX", "EG", "EIX", "EL", "ELV",
-            "EMN", "EMR", "ENPH", "EOG", "EPAM", "EQIX", "EQR", "EQT", "ES", "ESS",
-            "ETN", "ETR", "ETSY", "EVRG", "EW", "EXC", "EXPD", "EXPE", "EXR", "F",
-            "FANG", "FAST", "FCX", "FDS", "FDX", "FE", "FFIV", "FI", "FICO", "FIS",
-            "FITB", "FLT", "FMC", "FOX", "FOXA", "FRT", "FSLR", "FTNT", "FTV", "GD",
-            "GDDY", "GE", "GEHC", "GEN", "GEV", "GILD", "GIS", "GL", "GLW", "GM",
-            "GNRC", "GOOG", "GOOGL", "GPC", "GPN", "GRMN", "GS", "GWW", "HAL", "HAS",
-            "HBAN", "HCA", "HD", "HES", "HIG", "HII", "HLT", "HOLX", "HON", "HPE",
-            "HPQ", "HRL", "HSIC", "HST", "HSY", "HUBB", "HUM", "HWM", "IBM", "ICE",
-            "IDXX", "IEX", "IFF", "ILMN", "INCY", "INTC", "INTU", "INVH", "IP", "IPG",
-            "IQV", "IR", "IRM", "ISRG", "IT", "ITW", "IVZ", "J", "JBHT", "JBL",
-            "JCI", "JKHY", "JNJ", "JNPR", "JPM", "K", "KDP", "KEY", "KEYS", "KHC",
-            "KIM", "KKR", "KLAC", "KMB", "KMI", "KMX", "KO", "KR", "KVUE", "L",
-            "LDOS", "LEN", "LH", "LHX", "LIN", "LKQ", "LLY", "LMT", "LNT", "LOW",
-            "LRCX", "LULU", "LUV", "LVS", "LW", "LYB", "LYV", "MA", "MAA", "MAR",
-            "MAS", "MCD", "MCHP", "MCK", "MCO", "MDLZ", "MDT", "MET", "META", "MGM",
-            "MHK", "MKC", "MKTX", "MLM", "MMC", "MMM", "MNST", "MO", "MOH", "MOS",
-            "MPC", "MPWR", "MRK", "MRNA", "MRO", "MS", "MSCI", "MSFT", "MSI", "MTB",
-            "MTCH", "MTD", "MU", "NCLH", "NDAQ", "NDSN", "NEE", "NEM", "NFLX", "NI",
-            "NKE", "NOC", "NOW", "NRG", "NSC", "NTAP", "NTRS", "NUE", "NVDA", "NVR",
-            "NWS", "NWSA", "NXPI", "O", "ODFL", "OKE", "OMC", "ON", "ORCL", "ORLY",
-            "OTIS", "OXY", "PANW", "PARA", "PAYC", "PAYX", "PCAR", "PCG", "PEG", "PEP",
-            "PFE", "PFG", "PG", "PGR", "PH", "PHM", "PKG", "PLD", "PM", "PNC",
-            "PNR", "PNW", "PODD", "POOL", "PPG", "PPL", "PRU", "PSA", "PSX", "PTC",
-            "PWR", "PYPL", "QCOM", "QRVO", "RCL", "REG", "REGN", "RF", "RJF", "RL",
-            "RMD", "ROK", "ROL", "ROP", "ROST", "RSG", "RTX", "RVTY", "SBAC", "SBUX",
-            "SCHW", "SHW", "SJM", "SLB", "SMCI", "SNA", "SNPS", "SO", "SOLV", "SPG",
-            "SPGI", "SRE", "STE", "STLD", "STT", "STX", "STZ", "SWK", "SWKS", "SYF",
-            "SYK", "SYY", "T", "TAP", "TDG", "TDY", "TECH", "TEL", "TER", "TFC",
-            "TFX", "TGT", "TJX", "TMO", "TMUS", "TPR", "TRGP", "TRMB", "TROW", "TRV",
-            "TSCO", "TSLA", "TSN", "TT", "TTWO", "TXN", "TXT", "TYL", "UAL", "UBER",
-            "UDR", "UHS", "ULTA", "UNH", "UNP", "UPS", "URI", "USB", "V", "VICI",
-            "VLO", "VLTO", "VMC", "VRSK", "VRSN", "VRTX", "VST", "VTR", "VTRS", "VZ",
-            "WAB", "WAT", "WBA", "WBD", "WDC", "WEC", "WELL", "WFC", "WM", "WMB",
-            "WMT", "WRB", "WST", "WTW", "WY", "WYNN", "XEL", "XOM", "XYL", "YUM",
-            "ZBH", "ZBRA", "ZTS"
-        ]
-        
+        universe = load_universe(self.data_dir)
         stocks = []
-        for ticker in sp500_tickers:
+        for ticker in universe.tickers(index=SP500):
+            row = universe.get(ticker)
             stocks.append({
                 'ticker': ticker,
-                'name': ticker,  # Will be fetched from yfinance
-                'sector': 'N/A',
-                'industry': 'N/A',
+                'name': row['name'],
+                'sector': row['sector'] or 'N/A',
+                'industry': row['industry'] or 'N/A',
                 'market': 'S&P500'
             })
         
         logger.info(f"✅ Loaded {len(stocks)} S&P 500 stocks")
         return stocks
     
+    def refresh_universe(self) -> int:
+        """Fill missing name / sector / industry / market cap in the universe table"""
+        universe = load_universe(self.data_dir)
+        missing = [t for t in universe.tickers() if not universe.get(t)['sector'] or universe.get(t)['market_cap'] is None]
+        logger.info(f"🔄 Refreshing universe metadata for {len(missing)} tickers...")
+        updated = universe.enrich(tqdm(missing, desc="Universe"), self.provider)
+        universe.save()
+        logger.info(f"✅ Updated {updated} universe rows → {universe.path}")
+        return updated
+    
     def get_nasdaq100_tickers(self) -> List[Dict]:
         """Skip NASDAQ - already covered in S&P 500"""
         logger.info("📊 Skipping NASDAQ 100 (covered in S&P 500)...")
@@ -141,58 +126,176 @@ class USStockDailyPricesCreator:
         
         return stocks_df
     
-    def load_existing_prices(self) -> pd.DataFrame:
-        """Load existing price data"""
-        if os.path.exists(self.prices_file):
-            logger.info(f"📂 Loading existing prices: {self.prices_file}")
-            df = pd.read_csv(self.prices_file)
-            df['date'] = pd.to_datetime(df['date'])
-            return df
-        return pd.DataFrame()
+    def open_price_store(self, full_refresh: bool = False) -> PriceStore:
+        """Open the columnar price store, migrating the legacy CSV on first use"""
+        store = PriceStore(self.store_dir)
+        if store.is_empty() and not full_refresh and os.path.exists(self.prices_file):
+            store.import_csv(self.prices_file)
+        return store
     
-    def get_latest_dates(self, df: pd.DataFrame) -> Dict[str, datetime]:
-        """Get latest date for each ticker"""
-        if df.empty:
-            return {}
-        return df.groupby('ticker')['date'].max().to_dict()
+    def _format_history(self, hist: pd.DataFrame, ticker: str) -> pd.DataFrame:
+        """Convert a yfinance OHLCV frame to the stored column format"""
+        price_cols = [c for c in ['Open', 'High', 'Low', 'Close', 'Volume'] if c in hist.columns]
+        hist = hist.dropna(how='all', subset=price_cols or None)
+        if hist.empty:
+            return pd.DataFrame()
+        
+        hist = hist.reset_index()
+        hist['ticker'] = ticker
+        
+        # Rename columns to match Korean stock format
+        hist = hist.rename(columns={
+            'Date': 'date',
+            'Open': 'open',
+            'High': 'high',
+            'Low': 'low',
+            'Close': 'current_price',
+            'Volume': 'volume'
+        })
+        
+        # Calculate change and change_rate
+        hist['change'] = hist['current_price'].diff()
+        hist['change_rate'] = hist['current_price'].pct_change() * 100
+        
+        # Select required columns
+        cols = ['ticker', 'date', 'open', 'high', 'low', 'current_price', 'volume', 'change', 'change_rate']
+        return hist[cols]
     
     def download_stock_data(self, ticker: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Download daily price data for a single stock"""
+        started = time.time()
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
+            hist = self.provider.history(ticker, start=start_date, end=end_date, actions=True)
+            self.pending_actions[ticker] = extract_actions(hist)
             
+            hist = self._format_history(hist, ticker) if not hist.empty else pd.DataFrame()
             if hist.empty:
-                return pd.DataFrame()
-            
-            hist = hist.reset_index()
-            hist['ticker'] = ticker
-            
-            # Rename columns to match Korean stock format
-            hist = hist.rename(columns={
-                'Date': 'date',
-                'Open': 'open',
-                'High': 'high',
-                'Low': 'low',
-                'Close': 'current_price',
-                'Volume': 'volume'
-            })
-            
-            # Calculate change and change_rate
-            hist['change'] = hist['current_price'].diff()
-            hist['change_rate'] = hist['current_price'].pct_change() * 100
-            
-            # Select required columns
-            cols = ['ticker', 'date', 'open', 'high', 'low', 'current_price', 'volume', 'change', 'change_rate']
-            hist = hist[cols]
-            
+                self.fetch_failures[ticker] = (REASON_EMPTY, time.time() - started)
             return hist
             
         except Exception as e:
             logger.debug(f"⚠️ Failed to download {ticker}: {e}")
+            self.fetch_failures[ticker] = (f"error:{type(e).__name__}", time.time() - started)
             return pd.DataFrame()
     
-    def run(self, full_refresh: bool = False) -> bool:
+    def download_chunk(self, tickers: List[str], start_date: datetime, end_date: datetime) -> Dict[str, pd.DataFrame]:
+        """Download daily price data for several stocks in one yf.download call"""
+        data = self.provider.download(
+            tickers, start=start_date, end=end_date,
+            group_by='ticker', auto_adjust=True, actions=True, threads=False, progress=False
+        )
+        
+        results = {}
+        if data is None or data.empty:
+            return results
+        
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                hist = data[ticker]
+            else:
+                hist = data
+            
+            self.pending_actions[ticker] = extract_actions(hist)
+            hist = self._format_history(hist, ticker)
+            if not hist.empty:
+                results[ticker] = hist
+        
+        return results
+    
+    def download_chunk_with_retry(self, tickers: List[str], start_date: datetime, end_date: datetime,
+                                  retries: int = 3) -> Dict[str, pd.DataFrame]:
+        """Download a chunk, retrying the tickers still missing with backoff"""
+        results = {}
+        pending = list(tickers)
+        reason = REASON_EMPTY
+        started = time.time()
+        first_attempt = 0.0
+        
+        for attempt in range(retries):
+            try:
+                results.update(self.download_chunk(pending, start_date, end_date))
+                reason = REASON_EMPTY
+            except Exception as e:
+                logger.debug(f"⚠️ Chunk of {len(pending)} failed (attempt {attempt + 1}): {e}")
+                reason = f"error:{type(e).__name__}"
+            
+            if attempt == 0:
+                first_attempt = time.time() - started
+            pending = [t for t in pending if t not in results]
+            if not pending:
+                break
+            if attempt < retries - 1:
+                time.sleep(2 ** attempt)
+        
+        # Missing tickers pay their share of the first call plus all of the retries
+        if pending:
+            # Batch downloads return empty columns instead of raising when throttled:
+            # a missing ticker only counts as empty when the rest of its chunk came back
+            if reason == REASON_EMPTY and not results:
+                reason = REASON_NO_DATA
+            retry_time = time.time() - started - first_attempt
+            cost = first_attempt / len(tickers) + retry_time / len(pending)
+            for ticker in pending:
+                self.fetch_failures[ticker] = (reason, cost)
+        
+        return results
+    
+    def download_batched(self, jobs: Dict[str, datetime], end_date: datetime,
+                         workers: int = 4, chunk_size: int = 50) -> Dict[str, pd.DataFrame]:
+        """
+        Download many tickers concurrently
+        - Tickers sharing a start date are grouped into multi-ticker chunks
+        - Chunks run on a bounded thread pool, each with its own retry
+        """
+        groups: Dict[datetime, List[str]] = {}
+        for ticker, start_date in jobs.items():
+            groups.setdefault(pd.Timestamp(start_date).normalize(), []).append(ticker)
+        
+        chunks: List[Tuple[List[str], datetime]] = []
+        for start_date, tickers in groups.items():
+            for i in range(0, len(tickers), chunk_size):
+                chunks.append((tickers[i:i + chunk_size], start_date))
+        
+        logger.info(f"📦 {len(jobs)} tickers → {len(chunks)} chunks ({len(groups)} start dates, {workers} workers)")
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.download_chunk_with_retry, tickers, start_date, end_date)
+                for tickers, start_date in chunks
+            ]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading chunks"):
+                results.update(future.result())
+        
+        # A lone ticker has no chunk-mates to vouch for the feed; trust its empty
+        # response when other chunks of this run returned data
+        if results:
+            for tickers, _ in chunks:
+                reason, cost = self.fetch_failures.get(tickers[0], (None, 0.0))
+                if len(tickers) == 1 and reason == REASON_NO_DATA:
+                    self.fetch_failures[tickers[0]] = (REASON_EMPTY, cost)
+        
+        return results
+    
+    def save_ticker(self, store: PriceStore, ticker: str, new_data: pd.DataFrame,
+                    meta: Dict, full_refresh: bool = False) -> int:
+        """Write downloaded bars to the store, returns rows written"""
+        new_data['name'] = meta['name']
+        new_data['market'] = meta['market']
+        events = self.pending_actions.pop(ticker, [])
+        if full_refresh:
+            # Freshly downloaded history is already adjusted, just remember the events
+            self.corporate_actions.record(ticker, self.corporate_actions.new_events(ticker, events))
+            return store.replace(ticker, new_data)
+        
+        # New split / dividend: re-base only this ticker's stored bars before appending
+        self.corporate_actions.apply(store, ticker, events, new_data.set_index('date')['current_price'])
+        return store.append(ticker, new_data)
+    
+    def run(self, full_refresh: bool = False, batch: bool = False,
+            workers: int = 4, chunk_size: int = 50, retry_quarantined: bool = False) -> bool:
         """Run data collection (incremental by default)"""
         logger.info("🚀 US Stock Daily Prices Collection Started...")
         
@@ -202,71 +305,123 @@ class USStockDailyPricesCreator:
             if stocks_df.empty:
                 logger.error("❌ No stocks to process")
                 return False
+            missing = [t for t in BENCHMARKS if t not in set(stocks_df['ticker'])]
+            if missing:
+                benchmarks = pd.DataFrame({'ticker': missing, 'name': [BENCHMARKS[t] for t in missing],
+                                           'market': BENCHMARK_MARKET})
+                stocks_df = pd.concat([stocks_df, benchmarks], ignore_index=True)
             
-            # 2. Load existing data
-            existing_df = pd.DataFrame() if full_refresh else self.load_existing_prices()
-            latest_dates = self.get_latest_dates(existing_df)
+            # 2. Open price store (only the manifest is read)
+            store = self.open_price_store(full_refresh)
+            latest_dates = {} if full_refresh else store.latest_dates()
             
-            # 3. Determine target end date
-            now = datetime.now()
-            target_end_date = now
+            # 3. Determine target end date from the NYSE calendar
+            last_session = last_completed_session()
+            target_end_date = datetime.combine(last_session + timedelta(days=1), datetime.min.time())  # end is exclusive
+            logger.info(f"📅 Last completed session: {last_session}")
             
-            # 4. Collect data
-            all_new_data = []
-            failed_tickers = []
-            
-            for idx, row in tqdm(stocks_df.iterrows(), desc="Downloading US stocks", total=len(stocks_df)):
+            # 4. Determine start date per ticker, skipping those already up to date (no network call)
+            jobs = {}
+            up_to_date = 0
+            for _, row in stocks_df.iterrows():
                 ticker = row['ticker']
-                
-                # Determine start date
                 if ticker in latest_dates:
-                    start_date = latest_dates[ticker] + timedelta(days=1)
+                    if latest_dates[ticker].date() >= last_session:
+                        up_to_date += 1
+                        continue
+                    start_date = datetime.combine(next_trading_day(latest_dates[ticker]), datetime.min.time())
                 else:
                     start_date = self.start_date
                 
-                # Skip if already up to date
                 if start_date >= target_end_date:
                     continue
-                
-                # Download data
-                new_data = self.download_stock_data(ticker, start_date, target_end_date)
-                
-                if not new_data.empty:
-                    # Add name from stock list
-                    new_data['name'] = row['name']
-                    new_data['market'] = row['market']
-                    all_new_data.append(new_data)
-                else:
-                    failed_tickers.append(ticker)
+                jobs[ticker] = start_date
             
-            # 5. Combine and save
-            if all_new_data:
-                new_df = pd.concat(all_new_data, ignore_index=True)
-                
-                if not existing_df.empty:
-                    final_df = pd.concat([existing_df, new_df])
-                    final_df = final_df.drop_duplicates(subset=['ticker', 'date'], keep='last')
+            if up_to_date:
+                logger.info(f"⏭️ Skipped {up_to_date} tickers already up to date with {last_session}")
+            
+            # Keep backing-off / quarantined (delisted) symbols out of this run
+            ledger = FailureLedger(self.failures_file)
+            if retry_quarantined:
+                logger.info(f"♻️ Released {ledger.release()} quarantined tickers")
+            skipped = ledger.partition(jobs)
+            jobs = {t: jobs[t] for t in skipped['fetch']}
+            
+            stock_meta = stocks_df.set_index('ticker')[['name', 'market']].to_dict('index')
+            new_records = 0
+            updated_tickers = 0
+            failed_tickers = []
+            saved_tickers = []
+            
+            # 5. Collect data (appended per ticker as it arrives)
+            fetch_start = time.time()
+            try:
+                if batch:
+                    downloaded = self.download_batched(jobs, target_end_date, workers, chunk_size)
+                    for ticker in jobs:
+                        if ticker in downloaded:
+                            added = self.save_ticker(store, ticker, downloaded[ticker], stock_meta[ticker], full_refresh)
+                            new_records += added
+                            updated_tickers += 1 if added else 0
+                            saved_tickers.append(ticker)
+                        else:
+                            failed_tickers.append(ticker)
                 else:
-                    final_df = new_df
-                
-                # Sort and save
-                final_df = final_df.sort_values(['ticker', 'date']).reset_index(drop=True)
-                final_df.to_csv(self.prices_file, index=False)
-                
-                logger.info(f"✅ Saved {len(new_df)} new records to {self.prices_file}")
-                logger.info(f"📊 Total records: {len(final_df)}")
+                    for ticker, start_date in tqdm(jobs.items(), desc="Downloading US stocks", total=len(jobs)):
+                        new_data = self.download_stock_data(ticker, start_date, target_end_date)
+                        if not new_data.empty:
+                            added = self.save_ticker(store, ticker, new_data, stock_meta[ticker], full_refresh)
+                            new_records += added
+                            updated_tickers += 1 if added else 0
+                            saved_tickers.append(ticker)
+                        else:
+                            failed_tickers.append(ticker)
+            finally:
+                store.flush()
+                # Tickers never reached (download raised, run interrupted) keep their history
+                for ticker in failed_tickers:
+                    reason, cost = self.fetch_failures.get(ticker, (REASON_EMPTY, 0.0))
+                    ledger.record_failure(ticker, reason, cost)
+                for ticker in saved_tickers:
+                    ledger.record_success(ticker)
+                ledger.save()
+                self.corporate_actions.save()
+            fetch_elapsed = time.time() - fetch_start
+            
+            throughput = len(jobs) / fetch_elapsed if fetch_elapsed > 0 else 0
+            logger.info(f"⏱️ Fetched {len(jobs)} tickers in {fetch_elapsed:.1f}s "
+                        f"({throughput:.1f} tickers/sec, {'batched' if batch else 'serial'} mode)")
+            
+            # 6. Report
+            if new_records:
+                logger.info(f"✅ Appended {new_records} new records for {updated_tickers} tickers to {self.store_dir}")
+                logger.info(f"📊 Total tickers in store: {len(store.tickers())}")
             else:
                 logger.info("✨ All data is up to date!")
             
-            # 6. Summary
+            # Rebuild the shared OHLCV panel when the store changed (or is missing)
+            panel_path = default_panel_path(self.data_dir)
+            if new_records or not PricePanel.exists(panel_path):
+                PricePanel.build(store, panel_path)
+            
+            # 7. Summary
+            skipped_total = len(skipped['quarantined']) + len(skipped['backoff'])
             logger.info(f"\n📊 Collection Summary:")
             logger.info(f"   Total stocks: {len(stocks_df)}")
-            logger.info(f"   Success: {len(stocks_df) - len(failed_tickers)}")
+            logger.info(f"   Success: {len(stocks_df) - len(failed_tickers) - skipped_total}")
             logger.info(f"   Failed: {len(failed_tickers)}")
             
             if failed_tickers[:10]:
                 logger.warning(f"   Failed samples: {failed_tickers[:10]}")
             
+            report = ledger.report(skipped)
+            logger.info(f"   Quarantined (skipped): {report['quarantined_skipped']} "
+                        f"/ Backing off: {report['backoff_skipped']} "
+                        f"/ In quarantine: {report['quarantined_total']}")
+            logger.info(f"   Est. fetch time saved: {report['time_saved_seconds']:.1f}s")
+            if report['top_reasons']:
+                logger.info(f"   Failure reasons: {report['top_reasons']}")
+            
             return True
             
         except Exception as e:
@@ -280,14 +435,23 @@ def main():
     
     parser = argparse.ArgumentParser(description='US Stock Daily Prices Collector')
     parser.add_argument('--full', action='store_true', help='Full refresh (ignore existing data)')
+    parser.add_argument('--batch', action='store_true', help='Batched multi-ticker download on a worker pool')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent chunks in batch mode')
+    parser.add_argument('--chunk-size', type=int, default=50, help='Tickers per yf.download call in batch mode')
+    parser.add_argument('--retry-quarantined', action='store_true', help='Release quarantined tickers and retry them')
+    parser.add_argument('--refresh-universe', action='store_true', help='Fetch missing sector / market cap into data/universe.csv')
     args = parser.parse_args()
     
     creator = USStockDailyPricesCreator()
-    success = creator.run(full_refresh=args.full)
+    if args.refresh_universe:
+        creator.refresh_universe()
+    success = creator.run(full_refresh=args.full, batch=args.batch,
+                          workers=args.workers, chunk_size=args.chunk_size,
+                          retry_quarantined=args.retry_quarantined)
     
     if success:
         print("\n🎉 US Stock Daily Prices collection completed!")
-        print(f"📁 File location: ./data/us_daily_prices.csv")
+        print(f"📁 Store location: ./data/price_store/")
     else:
         print("\n❌ Collection failed.")
 
@@ -3,11 +3,13 @@
 Corporate News & Earnings Fetcher
 Fetches 'Authoritative' data: Confirmed Earnings Dates & Major News Headlines
 """
-import os, json, logging
+import os, sys, json, logging
 import pandas as pd
-import yfinance as yf
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -39,7 +41,7 @@ class CorporateIntelligence:
 
         for ticker_symbol in tickers:
             try:
-                ticker = yf.Ticker(ticker_symbol)
+                provider = get_provider('yfinance')
                 
                 # 1. Get Next Earnings Date
                 # yfinance calendar returns a dictionary or dataframe. 
@@ -48,7 +50,7 @@ class CorporateIntelligence:
                 days_left = 999
                 
                 try:
-                    cal = ticker.calendar
+                    cal = provider.ticker_data(ticker_symbol, 'calendar')
                     # Cal structure varies by version, handling common dict/df patterns
                     if cal and isinstance(cal, dict) and 'Earnings Date' in cal:
                         # usually a list of dates
@@ -68,7 +70,7 @@ class CorporateIntelligence:
                     })
 
                 # 2. Get News
-                news = ticker.news
+                news = provider.ticker_data(ticker_symbol, 'news')
                 if news:
                     # Take top 2 relevant news
                     for n in news[:2]:
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """Final Top 10 Report Generator"""
-import os, json, logging
+import os, sys, json, logging
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,11 +27,10 @@ class FinalReportGenerator:
         df = pd.read_csv(stats_path)
         
         # --- Live Price Patch (Start) ---
-        import yfinance as yf
         tickers = df['ticker'].tolist()
         try:
             # Get last 5 days just to be safe
-            live_data = yf.download(tickers, period='5d', progress=False)['Close']
+            live_data = get_provider('yfinance').download(tickers, period='5d', progress=False)['Close']
             if isinstance(live_data, pd.Series): live_data = live_data.to_frame()
             live_prices = live_data.iloc[-1].to_dict()
             prev_prices = live_data.iloc[-2].to_dict()
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Historical Returns Analyzer"""
-import os, json, logging
+import os, sys, json, logging
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,7 +48,7 @@ class HistoricalReturnsAnalyzer:
 
             logger.info(f"Fetching historical data for: {tickers}")
             # Fetch 5 years of data
-            data = yf.download(tickers, period='5y', interval='1mo', progress=False)['Close']
+            data = get_provider('yfinance').download(tickers, period='5y', interval='1mo', progress=False)['Close']
             
             if data.empty:
                 return {}
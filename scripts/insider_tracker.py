@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Insider Trading Tracker"""
-import os, json, logging
+import os, sys, json, logging
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,8 +22,7 @@ class InsiderTracker:
         
     def get_insider_activity(self, ticker):
         try:
-            stock = yf.Ticker(ticker)
-            df = stock.insider_transactions
+            df = get_provider('yfinance').ticker_data(ticker, 'insider_transactions')
             if df is None or df.empty: return []
             
             cutoff = pd.Timestamp.now() - pd.Timedelta(days=180)
@@ -4,14 +4,17 @@ Lead-Lag Analyzer
 Uses Granger Causality to find predictive relationships between market assets.
 """
 import os
+import sys
 import json
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from statsmodels.tsa.stattools import grangercausalitytests
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -47,7 +50,7 @@ class LeadLagAnalyzer:
             tickers.add(p[0])
             tickers.add(p[1])
             
-        data = yf.download(list(tickers), period='1y', progress=False)['Close']
+        data = get_provider('yfinance').download(list(tickers), period='1y', progress=False)['Close']
         return data
 
     def run_granger_test(self, data, cause, effect, maxlag=5):
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 """Macro Market Analyzer with Gemini AI"""
-import os, json, requests, logging
-import yfinance as yf
+import os, sys, json, requests, logging
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +24,7 @@ class MacroDataCollector:
         data = {}
         try:
             tickers = list(self.tickers.values())
-            df = yf.download(tickers, period='5d', progress=False)
+            df = get_provider('yfinance').download(tickers, period='5d', progress=False)
             for name, ticker in self.tickers.items():
                 try:
                     if ticker not in df['Close'].columns: continue
@@ -6,13 +6,16 @@ Inputs: SPY/QQQ trends, VIX, Market Breadth (Net Highs/Lows)
 Output: Market Gate Status (GREEN/YELLOW/RED)
 """
 import os
+import sys
 import json
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -36,7 +39,7 @@ class MarketGateManager:
         data = {}
         try:
             # Download 1 year of data to calculate 200MA safely
-            df = yf.download(list(self.tickers.values()), period='1y', progress=False)
+            df = get_provider('yfinance').download(list(self.tickers.values()), period='1y', progress=False)
             
             # Accessing MultiIndex columns correctly
             closes = df['Close']
@@ -6,13 +6,17 @@ Tracks options volume and unusual activity for major stocks
 """
 
 import os
+import sys
 import json
 import logging
-import yfinance as yf
 from datetime import datetime
 from typing import Dict, List
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+from engine.universe import load_universe, OPTIONS
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,23 +31,20 @@ class OptionsFlowAnalyzer:
         os.makedirs(self.data_dir, exist_ok=True)
         self.output_file = os.path.join(data_dir, 'options_flow.json')
         
-        # Major stocks to track options
-        self.watchlist = [
-            'AAPL', 'NVDA', 'TSLA', 'MSFT', 'AMZN', 'META', 'GOOGL', 
-            'SPY', 'QQQ', 'AMD', 'NFLX', 'BA', 'DIS', 'JPM', 'GS'
-        ]
+        # Major stocks to track options (OPTIONS members of the universe table)
+        self.watchlist = load_universe(self.data_dir).tickers(index=OPTIONS)
     
     def get_options_summary(self, ticker: str) -> Dict:
         """Get options summary for a single ticker"""
         try:
-            stock = yf.Ticker(ticker)
-            exps = stock.options
+            provider = get_provider('yfinance')
+            exps = provider.ticker_data(ticker, 'options')
             
             if not exps:
                 return {'ticker': ticker, 'error': 'No options available'}
             
             # Get nearest expiration
-            opt = stock.option_chain(exps[0])
+            opt = provider.option_chain(ticker, exps[0])
             calls, puts = opt.calls, opt.puts
             
             # Volume metrics
@@ -90,7 +91,7 @@ class OptionsFlowAnalyzer:
             
             # Get current price
             try:
-                hist = stock.history(period='1d')
+                hist = provider.history(ticker, period='1d')
                 current_price = round(float(hist['Close'].iloc[-1]), 2) if not hist.empty else 0
             except:
                 current_price = 0
@@ -5,11 +5,14 @@ Performance Tracker for Stock Recommendations
 """
 
 import os
+import sys
 import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -98,14 +101,10 @@ class PerformanceTracker:
                 logger.warning("FINNHUB_API_KEY not set")
                 return None
             
-            url = f"https://finnhub.io/api/v1/quote?symbol={ticker}&token={FINNHUB_API_KEY}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                current_price = data.get('c', 0)  # 'c' = current price
-                if current_price and current_price > 0:
-                    return float(current_price)
+            data = get_provider('finnhub').query('quote', symbol=ticker)
+            current_price = data.get('c', 0)  # 'c' = current price
+            if current_price and current_price > 0:
+                return float(current_price)
             
             logger.warning(f"Failed to get price for {ticker}")
             return None
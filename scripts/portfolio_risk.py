@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Portfolio Risk Analyzer"""
-import os, json, logging
+import os, sys, json, logging
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,7 +52,7 @@ class PortfolioRiskAnalyzer:
 
             logger.info(f"Fetching data for risk analysis: {tickers}")
             # Fetch 1 year of data
-            data = yf.download(tickers, period='1y', progress=False)['Close']
+            data = get_provider('yfinance').download(tickers, period='1y', progress=False)['Close']
             
             if data.empty:
                 return {}
@@ -5,14 +5,18 @@ Sector Performance Heatmap Data Collector
 """
 
 import os
+import sys
 import json
 import pandas as pd
-import yfinance as yf
 from datetime import datetime
 from typing import Dict, List
 import logging
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+from engine.universe import load_universe, HEATMAP
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,34 +32,26 @@ class SectorHeatmapCollector:
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Sector ETFs with full names
+        # Sector ETFs with full names (sector = universe sector)
         self.sector_etfs = {
-            'XLK': {'name': 'Technology', 'color': '#4A90A4'},
-            'XLF': {'name': 'Financials', 'color': '#6B8E23'},
-            'XLV': {'name': 'Healthcare', 'color': '#FF69B4'},
-            'XLE': {'name': 'Energy', 'color': '#FF6347'},
-            'XLY': {'name': 'Consumer Disc.', 'color': '#FFD700'},
-            'XLP': {'name': 'Consumer Staples', 'color': '#98D8C8'},
-            'XLI': {'name': 'Industrials', 'color': '#DDA0DD'},
-            'XLB': {'name': 'Materials', 'color': '#F0E68C'},
-            'XLU': {'name': 'Utilities', 'color': '#87CEEB'},
-            'XLRE': {'name': 'Real Estate', 'color': '#CD853F'},
-            'XLC': {'name': 'Comm. Services', 'color': '#9370DB'},
+            'XLK': {'name': 'Technology', 'sector': 'Technology', 'color': '#4A90A4'},
+            'XLF': {'name': 'Financials', 'sector': 'Financials', 'color': '#6B8E23'},
+            'XLV': {'name': 'Healthcare', 'sector': 'Healthcare', 'color': '#FF69B4'},
+            'XLE': {'name': 'Energy', 'sector': 'Energy', 'color': '#FF6347'},
+            'XLY': {'name': 'Consumer Disc.', 'sector': 'Consumer Discretionary', 'color': '#FFD700'},
+            'XLP': {'name': 'Consumer Staples', 'sector': 'Consumer Staples', 'color': '#98D8C8'},
+            'XLI': {'name': 'Industrials', 'sector': 'Industrials', 'color': '#DDA0DD'},
+            'XLB': {'name': 'Materials', 'sector': 'Materials', 'color': '#F0E68C'},
+            'XLU': {'name': 'Utilities', 'sector': 'Utilities', 'color': '#87CEEB'},
+            'XLRE': {'name': 'Real Estate', 'sector': 'Real Estate', 'color': '#CD853F'},
+            'XLC': {'name': 'Comm. Services', 'sector': 'Communication Services', 'color': '#9370DB'},
         }
         
-        # Sector stocks for detail map
+        # Sector stocks for detail map (HEATMAP members of the universe table)
+        universe = load_universe(self.data_dir)
         self.sector_stocks = {
-            'Technology': ['AAPL', 'MSFT', 'NVDA', 'AVGO', 'ORCL', 'CRM', 'AMD', 'ADBE'],
-            'Financials': ['BRK-B', 'JPM', 'V', 'MA', 'BAC', 'WFC', 'GS', 'MS'],
-            'Healthcare': ['UNH', 'JNJ', 'LLY', 'PFE', 'ABBV', 'MRK', 'TMO', 'ABT'],
-            'Energy': ['XOM', 'CVX', 'COP', 'SLB', 'EOG', 'MPC', 'PSX', 'VLO'],
-            'Consumer Disc.': ['AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'TJX', 'LOW'],
-            'Consumer Staples': ['PG', 'KO', 'PEP', 'COST', 'WMT', 'PM', 'MO', 'CL'],
-            'Industrials': ['CAT', 'BA', 'HON', 'UNP', 'RTX', 'DE', 'GE', 'MMM'],
-            'Materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'NUE', 'DOW', 'DD'],
-            'Utilities': ['NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'XEL'],
-            'Real Estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'SPG', 'O', 'WELL'],
-            'Comm. Services': ['META', 'GOOGL', 'NFLX', 'DIS', 'CMCSA', 'T', 'VZ', 'CHTR'],
+            info['name']: universe.tickers(index=HEATMAP, sector=info['sector'])
+            for info in self.sector_etfs.values()
         }
     
     def get_sector_etf_performance(self, period: str = '5d') -> Dict:
@@ -65,7 +61,7 @@ class SectorHeatmapCollector:
         tickers = list(self.sector_etfs.keys())
         
         try:
-            data = yf.download(tickers, period=period, progress=False)
+            data = get_provider('yfinance').download(tickers, period=period, progress=False)
             
             if data.empty:
                 return {'error': 'No data'}
@@ -125,7 +121,7 @@ class SectorHeatmapCollector:
                 ticker_to_sector[stock] = sector
                 
         try:
-            data = yf.download(all_tickers, period=period, progress=False)
+            data = get_provider('yfinance').download(all_tickers, period=period, progress=False)
             
             if data.empty:
                 return {'error': 'No data'}
@@ -11,16 +11,29 @@ Comprehensive analysis combining:
 """
 
 import os
+import sys
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from tqdm import tqdm
 import warnings
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import get_provider
+from engine.rate_limit import get_limiter
+from engine.etf_holdings import ETFHoldings, default_holdings_path
+from engine.price_panel import align_right, open_panel, default_panel_path
+from engine.scoring import ScoreCard, bucket, weighted_sum
+from engine.fundamentals_cache import FundamentalsCache
+from engine.checkpoint import ResultJournal
+from engine.trading_calendar import last_completed_session
+
 warnings.filterwarnings('ignore')
 load_dotenv()
 
@@ -31,6 +44,156 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Score rules (0-100 each), compiled by engine.scoring and applied to all candidates at once
+TECHNICAL_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        'rsi': [
+            ({'rsi': [('>=', 40), ('<=', 60)]}, 10),    # Neutral zone - room to move
+            ({'rsi': ('<', 30)}, 15),                   # Oversold - potential bounce
+            ({'rsi': ('>', 70)}, -5),                   # Overbought
+        ],
+        'macd': [
+            ({'macd_histogram': ('>', 0), 'macd_histogram_prev': ('<', 0)}, 15),   # Bullish crossover
+            ({'macd_histogram': ('>', 0)}, 8),
+            ({'macd_histogram': ('<', 0)}, -5),
+        ],
+        'ma_signal': [
+            ({'ma_signal': ('==', 'Bullish')}, 15),
+            ({'ma_signal': ('==', 'Bearish')}, -10),
+        ],
+        'cross': [
+            ({'cross_signal': ('==', 'Golden Cross')}, 10),
+            ({'cross_signal': ('==', 'Death Cross')}, -15),
+        ],
+    },
+}
+
+RS_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        'rs_20d': [
+            ({'rs_20d': ('>', 10)}, 25),
+            ({'rs_20d': ('>', 5)}, 15),
+            ({'rs_20d': ('>', 0)}, 8),
+            ({'rs_20d': ('<', -10)}, -20),
+            ({'rs_20d': ('<', -5)}, -10),
+        ],
+        'rs_60d': [
+            ({'rs_60d': ('>', 15)}, 15),
+            ({'rs_60d': ('>', 5)}, 8),
+            ({'rs_60d': ('<', -15)}, -15),
+        ],
+    },
+}
+
+FUNDAMENTAL_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        # P/E (lower is better, but not too low)
+        'pe_ratio': [
+            ({'pe_ratio': [('>', 0), ('<', 15)]}, 15),
+            ({'pe_ratio': [('>=', 15), ('<', 25)]}, 10),
+            ({'pe_ratio': ('>', 40)}, -10),
+            ({'pe_ratio': ('<', 0)}, -15),              # Negative earnings
+        ],
+        'revenue_growth': [
+            ({'revenue_growth': ('>', 0.2)}, 15),
+            ({'revenue_growth': ('>', 0.1)}, 10),
+            ({'revenue_growth': ('>', 0)}, 5),
+            ({'revenue_growth': ('<', 0)}, -10),
+        ],
+        'roe': [
+            ({'roe': ('>', 0.2)}, 10),
+            ({'roe': ('>', 0.1)}, 5),
+            ({'roe': ('<', 0)}, -10),
+        ],
+    },
+}
+
+ANALYST_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        'recommendation': [
+            ({'recommendation': ('==', 'strongBuy')}, 25),
+            ({'recommendation': ('==', 'buy')}, 20),
+            ({'recommendation': ('==', 'sell')}, -15),
+            ({'recommendation': ('==', 'strongSell')}, -25),
+        ],
+        'upside': [
+            ({'upside_pct': ('>', 30)}, 20),
+            ({'upside_pct': ('>', 20)}, 15),
+            ({'upside_pct': ('>', 10)}, 10),
+            ({'upside_pct': ('>', 0)}, 5),
+            ({'upside_pct': ('<', -10)}, -15),
+        ],
+    },
+}
+
+LIQUIDITY_SCORE = {
+    'base': 50,
+    'clip': (0, 100),
+    'components': {
+        # Dollar Volume (The Barrier to Entry)
+        'dollar_volume': [
+            ({'avg_dollar_volume': ('>', 500_000_000)}, 20),   # Mega Liquidity
+            ({'avg_dollar_volume': ('>', 100_000_000)}, 15),   # High Liquidity
+            ({'avg_dollar_volume': ('>', 20_000_000)}, 5),     # Acceptable
+            ({'avg_dollar_volume': ('<', 5_000_000)}, -20),    # Illiquid (Danger)
+        ],
+        # Volume Velocity (The Impulse)
+        'velocity': [
+            ({'vol_velocity': ('>', 2.0)}, 15),     # Huge Buying/Selling
+            ({'vol_velocity': ('>', 1.2)}, 10),     # Active
+            ({'vol_velocity': ('<', 0.5)}, -10),    # Dead Zone
+        ],
+    },
+}
+
+# Adjusted Model: Liquidity is King. Without liquidity, technicals are noise.
+COMPOSITE_WEIGHTS = {
+    'sd_score': 0.20,
+    'liq_score': 0.15,
+    'inst_score': 0.15,
+    'tech_score': 0.20,
+    'fund_score': 0.10,
+    'analyst_score': 0.10,
+    'rs_score': 0.10,
+}
+LOW_LIQUIDITY_USD = 10_000_000
+LOW_LIQUIDITY_PENALTY = 0.8
+
+GRADES = ([40, 50, 65, 75, 85], ["🚫 F (Avoid)", "⚠️ D (Weak)", "👀 C (Watch)", "✅ B (Actionable)",
+                                 "🔥 A (Active Accumulation)", "💎 S+ (Institutions Buying)"])
+SIZE_BUCKETS = ([300e6, 2e9, 10e9, 200e9], ["Micro Cap", "Small Cap", "Mid Cap", "Large Cap", "Mega Cap"])
+
+# Quote summary fields cached per field (see engine.fundamentals_cache). Prices and volumes
+# come from the local panel, so Yahoo is only called when one of these has expired (the
+# analyst fields once per session, see FUNDAMENTALS_ANALYST_SESSIONS)
+INFO_FIELDS = [
+    'longName', 'shortName', 'sector',
+    'sharesOutstanding', 'trailingEps', 'forwardEps', 'bookValue', 'dividendRate',
+    'revenueGrowth', 'earningsGrowth', 'profitMargins', 'returnOnEquity',
+    'targetMeanPrice', 'recommendationKey', 'numberOfAnalystOpinions',
+]
+# Price / volume based fields (daily TTL), fetched only for tickers the panel does not cover
+QUOTE_FIELDS = [
+    'currentPrice', 'regularMarketPrice', 'previousClose', 'volume', 'averageVolume',
+    'marketCap', 'trailingPE', 'forwardPE', 'priceToBook', 'dividendYield',
+]
+# Yahoo's averageVolume is a 3-month average
+AVG_VOLUME_SESSIONS = 63
+
+TECHNICAL_CARD = ScoreCard(TECHNICAL_SCORE)
+RS_CARD = ScoreCard(RS_SCORE)
+FUNDAMENTAL_CARD = ScoreCard(FUNDAMENTAL_SCORE)
+ANALYST_CARD = ScoreCard(ANALYST_SCORE)
+LIQUIDITY_CARD = ScoreCard(LIQUIDITY_SCORE)
+
 
 class EnhancedSmartMoneyScreener:
     """
@@ -47,15 +210,29 @@ class EnhancedSmartMoneyScreener:
             data_dir = os.getenv('DATA_DIR', os.path.join(os.path.dirname(__file__), '..', 'data'))
         self.data_dir = data_dir
         self.output_file = os.path.join(data_dir, 'smart_money_picks_v2.csv')
+        self.fundamentals_file = os.path.join(data_dir, 'fundamentals_cache.json')
+        self.journal_file = os.path.join(data_dir, 'smart_money_journal.jsonl')   # per-ticker checkpoint
         
         # Load analysis data
         self.volume_df = None
         self.holdings_df = None
         self.etf_df = None
-        self.prices_df = None
+        self.panel = None     # local OHLCV panel (create_us_daily_prices.py) for technicals / RS
+        self.passive_flows = pd.DataFrame()   # implied ETF flow per stock (holdings look-through)
         
-        # Cache for yfinance data
+        # Market data provider (live / record / replay)
+        self.provider = get_provider('yfinance')
+        
+        # Per-ticker fetch bundle for this run: {ticker: {'info': ..., 'history': ...}}
+        # Every analyzer reads from it, so each ticker costs at most one info + one history call
         self.yf_cache = {}
+        self.fetch_calls = {'info': 0, 'history': 0}     # network calls
+        
+        # Info fields persisted across runs with per-field TTLs
+        self.fundamentals = FundamentalsCache(self.fundamentals_file)
+        self.use_cache = True
+        self.cache_lock = threading.Lock()
+        self.stage_timings = {}
         
         # S&P 500 benchmark data
         self.spy_data = None
@@ -85,11 +262,16 @@ class EnhancedSmartMoneyScreener:
             etf_file = os.path.join(self.data_dir, 'us_etf_flows.csv')
             if os.path.exists(etf_file):
                 self.etf_df = pd.read_csv(etf_file)
+                self.passive_flows = self.load_passive_flows()
             
-            # Load SPY for relative strength
-            logger.info("📈 Loading SPY benchmark data...")
-            spy = yf.Ticker("SPY")
-            self.spy_data = spy.history(period="3mo")
+            # Local price panel; SPY for relative strength comes from it too
+            self.panel = open_panel(default_panel_path(self.data_dir))
+            if self.panel is not None and 'SPY' in self.panel:
+                self.spy_data = self.panel.frame('SPY', start=self.panel.dates[-1] - pd.DateOffset(months=3))
+                logger.info(f"✅ Loaded price panel: {len(self.panel.tickers)} tickers x {len(self.panel.dates)} days")
+            else:
+                logger.info("📈 Loading SPY benchmark data...")
+                self.spy_data = self.provider.history("SPY", period="3mo")
             
             return True
             
@@ -97,120 +279,229 @@ class EnhancedSmartMoneyScreener:
             logger.error(f"❌ Error loading data: {e}")
             return False
     
-    def get_technical_analysis(self, ticker: str) -> Dict:
-        """Calculate technical indicators"""
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="6mo")
-            
-            if len(hist) < 50:
-                return self._default_technical()
-            
-            close = hist['Close']
-            
-            # RSI (14-day)
-            delta = close.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            current_rsi = rsi.iloc[-1]
-            
-            # MACD
-            ema12 = close.ewm(span=12, adjust=False).mean()
-            ema26 = close.ewm(span=26, adjust=False).mean()
-            macd = ema12 - ema26
-            signal = macd.ewm(span=9, adjust=False).mean()
-            macd_histogram = macd - signal
-            
-            macd_current = macd.iloc[-1]
-            signal_current = signal.iloc[-1]
-            macd_hist_current = macd_histogram.iloc[-1]
-            
-            # Moving Averages
-            ma20 = close.rolling(20).mean().iloc[-1]
-            ma50 = close.rolling(50).mean().iloc[-1]
-            ma200 = close.rolling(200).mean().iloc[-1] if len(close) >= 200 else ma50
-            current_price = close.iloc[-1]
-            
-            # MA Arrangement
-            if current_price > ma20 > ma50:
-                ma_signal = "Bullish"
-            elif current_price < ma20 < ma50:
-                ma_signal = "Bearish"
-            else:
-                ma_signal = "Neutral"
-            
-            # Golden/Death Cross
-            ma50_prev = close.rolling(50).mean().iloc[-5]
-            ma200_prev = close.rolling(200).mean().iloc[-5] if len(close) >= 200 else ma50_prev
-            
-            if ma50 > ma200 and ma50_prev <= ma200_prev:
-                cross_signal = "Golden Cross"
-            elif ma50 < ma200 and ma50_prev >= ma200_prev:
-                cross_signal = "Death Cross"
-            else:
-                cross_signal = "None"
-            
-            # Technical Score (0-100)
-            tech_score = 50
-            
-            # RSI contribution
-            if 40 <= current_rsi <= 60:
-                tech_score += 10  # Neutral zone - room to move
-            elif current_rsi < 30:
-                tech_score += 15  # Oversold - potential bounce
-            elif current_rsi > 70:
-                tech_score -= 5   # Overbought
-            
-            # MACD contribution
-            if macd_hist_current > 0 and macd_histogram.iloc[-2] < 0:
-                tech_score += 15  # Bullish crossover
-            elif macd_hist_current > 0:
-                tech_score += 8
-            elif macd_hist_current < 0:
-                tech_score -= 5
-            
-            # MA contribution
-            if ma_signal == "Bullish":
-                tech_score += 15
-            elif ma_signal == "Bearish":
-                tech_score -= 10
-            
-            if cross_signal == "Golden Cross":
-                tech_score += 10
-            elif cross_signal == "Death Cross":
-                tech_score -= 15
-            
-            tech_score = max(0, min(100, tech_score))
-            
-            return {
-                'rsi': round(current_rsi, 1),
-                'macd': round(macd_current, 3),
-                'macd_signal': round(signal_current, 3),
-                'macd_histogram': round(macd_hist_current, 3),
-                'ma20': round(ma20, 2),
-                'ma50': round(ma50, 2),
-                'ma_signal': ma_signal,
-                'cross_signal': cross_signal,
-                'technical_score': tech_score
-            }
-            
-        except Exception as e:
-            return self._default_technical()
+    def load_passive_flows(self) -> pd.DataFrame:
+        """ETF flows x constituent weights -> implied passive buying/selling per stock (USD)"""
+        flow_cols = [c for c in ('flow_1d_usd', 'flow_5d_usd', 'flow_20d_usd') if c in self.etf_df.columns]
+        holdings = ETFHoldings(default_holdings_path(self.data_dir))
+        if not flow_cols or holdings.df.empty:
+            logger.warning("⚠️ ETF flows or holdings missing - passive flow look-through skipped")
+            return pd.DataFrame()
+        flows = self.etf_df.set_index('ticker')[flow_cols]
+        passive = holdings.look_through(flows)
+        logger.info(f"✅ ETF look-through: implied passive flow for {len(passive)} stocks "
+                    f"from {len(holdings.etfs)} ETFs")
+        return passive
+    
+    def get_passive_flow(self, ticker: str, market_cap_b: float = 0) -> Dict:
+        """Implied ETF creation/redemption flow into a stock"""
+        if ticker not in self.passive_flows.index:
+            return {'passive_flow_5d_m': 0, 'passive_flow_20d_m': 0, 'passive_flow_pct_mcap': 0, 'etf_count': 0}
+        row = self.passive_flows.loc[ticker]
+        flow_5d = float(row.get('flow_5d_usd', 0))
+        flow_20d = float(row.get('flow_20d_usd', 0))
+        return {
+            'passive_flow_5d_m': round(flow_5d / 1e6, 2),
+            'passive_flow_20d_m': round(flow_20d / 1e6, 2),
+            'passive_flow_pct_mcap': round(flow_20d / (market_cap_b * 1e9) * 100, 4) if market_cap_b else 0,
+            'etf_count': int(row['etf_count']),
+        }
+    
+    def _bundle(self, ticker: str, key: str, fetch):
+        """Fetch one payload of the ticker's bundle on first use (failures are cached too)"""
+        with self.cache_lock:
+            bundle = self.yf_cache.setdefault(ticker, {})
+            fetch_now = key not in bundle
+        if fetch_now:
+            try:
+                bundle[key] = fetch()
+            except Exception as e:
+                bundle[key] = e
+        if isinstance(bundle[key], Exception):
+            raise bundle[key]
+        return bundle[key]
+    
+    def _count(self, key: str):
+        with self.cache_lock:
+            self.fetch_calls[key] += 1
+    
+    def panel_quote(self, ticker: str) -> Optional[Dict]:
+        """Last close / volume and 3-month average volume (None unless the panel has the latest session)"""
+        if self.panel is None or ticker not in self.panel:
+            return None
+        rows = self.panel.valid_rows(ticker)
+        if not len(rows) or rows[-1] != len(self.panel.dates) - 1:
+            return None
+        close, volume = self.panel.close[ticker], self.panel.volume[ticker]
+        price = float(close[rows[-1]])
+        return {
+            'currentPrice': price,
+            'regularMarketPrice': price,
+            'previousClose': float(close[rows[-2]]) if len(rows) > 1 else price,
+            'volume': float(volume[rows[-1]]),
+            'averageVolume': float(np.nanmean(volume[rows[-AVG_VOLUME_SESSIONS:]])),
+        }
     
-    def _default_technical(self) -> Dict:
+    @staticmethod
+    def price_ratios(info: Dict, price: float) -> Dict:
+        """Market cap, P/E, P/B and yield from cached per-share fundamentals and the local close"""
+        per_share = lambda key: price / info[key] if (info.get(key) or 0) > 0 else None
         return {
-            'rsi': 50, 'macd': 0, 'macd_signal': 0, 'macd_histogram': 0,
-            'ma20': 0, 'ma50': 0, 'ma_signal': 'Unknown', 'cross_signal': 'None',
-            'technical_score': 50
+            'marketCap': info['sharesOutstanding'] * price if info.get('sharesOutstanding') else None,
+            'trailingPE': per_share('trailingEps'),
+            'forwardPE': per_share('forwardEps'),
+            'priceToBook': per_share('bookValue'),
+            'dividendYield': info['dividendRate'] / price if info.get('dividendRate') and price else None,
         }
     
+    def _fetch_info(self, ticker: str) -> Dict:
+        """
+        Info fields from the fundamentals cache, one network call only when a field has expired
+        (Yahoo serves the quote summary as one payload, so that call refreshes every field)
+        Prices and volumes come from the panel, with the price ratios derived from them
+        """
+        quote = self.panel_quote(ticker)
+        fields = INFO_FIELDS if quote else INFO_FIELDS + QUOTE_FIELDS
+        info = self.fundamentals.get(ticker, fields) if self.use_cache else None
+        if info is None:
+            self._count('info')
+            payload = self.provider.info(ticker) or {}
+            self.fundamentals.put(ticker, payload, fields)
+            # Fields an empty / partial payload lacks keep their last stored value
+            info = self.fundamentals.stored(ticker, fields)
+        if quote:
+            info = {**info, **quote, **self.price_ratios(info, quote['currentPrice'])}
+        return info
+    
+    def _fetch_history(self, ticker: str) -> pd.DataFrame:
+        self._count('history')
+        return self.provider.history(ticker, period="6mo")
+    
+    def get_info(self, ticker: str) -> Dict:
+        return self._bundle(ticker, 'info', lambda: self._fetch_info(ticker))
+    
+    def get_history(self, ticker: str) -> pd.DataFrame:
+        """6mo of daily bars (technicals use all of it, relative strength the last 3 months)"""
+        return self._bundle(ticker, 'history', lambda: self._fetch_history(ticker))
+    
+    def fetch_report(self) -> Dict:
+        tickers = len(self.yf_cache)
+        calls = sum(self.fetch_calls.values())
+        return {
+            'tickers': tickers,
+            **self.fetch_calls,
+            'calls': calls,
+            'calls_per_ticker': round(calls / tickers, 2) if tickers else 0.0,
+        }
+    
+    def _technicals(self, raw: np.ndarray, tickers: List[str], window: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Technical and relative strength features / scores from a dates x tickers close matrix
+        Each column is right-aligned on its own bars, so gaps and short histories match a
+        per-ticker computation. `window` = sessions in the 3-month relative strength window
+        """
+        valid = ~np.isnan(raw)
+        bars = valid.sum(axis=0)
+        close = pd.DataFrame(align_right(raw, valid), columns=tickers)
+        index = pd.Index(tickers, name='ticker')
+        
+        # RSI (14-day)
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rsi = (100 - (100 / (1 + gain / loss))).iloc[-1].to_numpy()
+        
+        # MACD
+        ema12 = close.ewm(span=12, adjust=False).mean()
+        ema26 = close.ewm(span=26, adjust=False).mean()
+        macd = ema12 - ema26
+        signal = macd.ewm(span=9, adjust=False).mean()
+        hist = (macd - signal).to_numpy()
+        macd, signal = macd.iloc[-1].to_numpy(), signal.iloc[-1].to_numpy()
+        
+        # Moving averages (NaN when a ticker has fewer bars than the window)
+        ma50_all = close.rolling(50).mean().to_numpy()
+        ma200_all = close.rolling(200).mean().to_numpy()
+        ma20 = close.rolling(20).mean().iloc[-1].to_numpy()
+        ma50, ma200 = ma50_all[-1], ma200_all[-1]
+        price = close.iloc[-1].to_numpy()
+        
+        features = {
+            'rsi': rsi,
+            'macd_histogram': hist[-1],
+            'macd_histogram_prev': hist[-2],
+            'ma_signal': np.select([(price > ma20) & (ma20 > ma50), (price < ma20) & (ma20 < ma50)],
+                                   ["Bullish", "Bearish"], "Neutral"),
+            'cross_signal': np.select([(ma50 > ma200) & (ma50_all[-5] <= ma200_all[-5]),
+                                       (ma50 < ma200) & (ma50_all[-5] >= ma200_all[-5])],
+                                      ["Golden Cross", "Death Cross"], "None"),
+        }
+        technicals = pd.DataFrame({
+            'rsi': np.round(rsi, 1),
+            'macd': np.round(macd, 3),
+            'macd_signal': np.round(signal, 3),
+            'macd_histogram': np.round(hist[-1], 3),
+            'ma20': np.round(ma20, 2),
+            'ma50': np.round(ma50, 2),
+            'ma200': np.round(ma200, 2),
+            'ma_signal': features['ma_signal'],
+            'cross_signal': features['cross_signal'],
+            'technical_score': TECHNICAL_CARD.score(features).astype(int),
+        }, index=index)
+        technicals = technicals[bars >= 50]
+        
+        # Relative strength vs SPY over the last 3 months
+        spy = self.spy_data['Close'].to_numpy(dtype='float64') if self.spy_data is not None else np.empty(0)
+        if len(spy) < 20:
+            return technicals, pd.DataFrame()
+        c = close.to_numpy()[-window:]
+        n = (~np.isnan(c)).sum(axis=0)
+        first = c[np.clip(len(c) - n, 0, len(c) - 1), np.arange(len(tickers))]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stock_20d = np.where(n >= 21, (c[-1] / c[-21] - 1) * 100, 0) if len(c) >= 21 else np.zeros(len(tickers))
+            stock_60d = (c[-1] / first - 1) * 100
+        spy_20d = (spy[-1] / spy[-21] - 1) * 100 if len(spy) >= 21 else 0
+        spy_60d = (spy[-1] / spy[0] - 1) * 100
+        features = {'rs_20d': stock_20d - spy_20d, 'rs_60d': stock_60d - spy_60d}
+        rs = pd.DataFrame({
+            'rs_20d': np.round(features['rs_20d'], 1),
+            'rs_60d': np.round(features['rs_60d'], 1),
+            'rs_score': RS_CARD.score(features).astype(int),
+        }, index=index)
+        return technicals, rs[n >= 20]
+    
+    def compute_technicals(self, tickers: List[str], depth: int = 300) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Technicals and relative strength for every candidate in the local panel at once
+        (full 200-day history, no network calls). Returns (technicals, rs) indexed by ticker
+        """
+        if self.panel is None:
+            return pd.DataFrame(), pd.DataFrame()
+        tickers = [t for t in tickers if t in self.panel]
+        if not tickers:
+            return pd.DataFrame(), pd.DataFrame()
+        raw = np.asarray(self.panel.close.matrix(tickers)[-depth:], dtype='float64')
+        window = int((self.panel.dates >= self.panel.dates[-1] - pd.DateOffset(months=3)).sum())
+        return self._technicals(raw, tickers, window)
+    
+    def history_technicals(self, tickers: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Same features for tickers the panel lacks, from their fetched 6mo history"""
+        closes = {}
+        for ticker in tickers:
+            try:
+                closes[ticker] = self.get_history(ticker)['Close']
+            except Exception as e:
+                logger.debug(f"No history for {ticker}: {e}")
+        closes = {t: c for t, c in closes.items() if len(c)}
+        if not closes:
+            return pd.DataFrame(), pd.DataFrame()
+        close = pd.DataFrame(closes).sort_index()
+        window = int((close.index >= close.index[-1] - pd.DateOffset(months=3)).sum())
+        return self._technicals(close.to_numpy(dtype='float64'), list(close.columns), window)
+    
     def get_fundamental_analysis(self, ticker: str) -> Dict:
-        """Get fundamental/valuation metrics"""
+        """Fundamental/valuation metrics ('features' holds the raw values the score uses)"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = self.get_info(ticker)
             
             # Valuation
             pe_ratio = info.get('trailingPE', 0) or 0
@@ -234,51 +525,6 @@ class EnhancedSmartMoneyScreener:
             # Sector
             sector = info.get('sector', 'N/A') or 'N/A'
             
-            # Fundamental Score (0-100)
-            fund_score = 50
-            
-            # P/E contribution (lower is better, but not too low)
-            if 0 < pe_ratio < 15:
-                fund_score += 15
-            elif 15 <= pe_ratio < 25:
-                fund_score += 10
-            elif pe_ratio > 40:
-                fund_score -= 10
-            elif pe_ratio < 0:  # Negative earnings
-                fund_score -= 15
-            
-            # Growth contribution
-            if revenue_growth > 0.2:
-                fund_score += 15
-            elif revenue_growth > 0.1:
-                fund_score += 10
-            elif revenue_growth > 0:
-                fund_score += 5
-            elif revenue_growth < 0:
-                fund_score -= 10
-            
-            # ROE contribution
-            if roe > 0.2:
-                fund_score += 10
-            elif roe > 0.1:
-                fund_score += 5
-            elif roe < 0:
-                fund_score -= 10
-            
-            fund_score = max(0, min(100, fund_score))
-            
-            # Size category
-            if market_cap > 200e9:
-                size = "Mega Cap"
-            elif market_cap > 10e9:
-                size = "Large Cap"
-            elif market_cap > 2e9:
-                size = "Mid Cap"
-            elif market_cap > 300e6:
-                size = "Small Cap"
-            else:
-                size = "Micro Cap"
-            
             return {
                 'pe_ratio': round(pe_ratio, 2) if pe_ratio else 'N/A',
                 'forward_pe': round(forward_pe, 2) if forward_pe else 'N/A',
@@ -288,10 +534,10 @@ class EnhancedSmartMoneyScreener:
                 'profit_margin': round(profit_margin * 100, 1) if profit_margin else 0,
                 'roe': round(roe * 100, 1) if roe else 0,
                 'market_cap_b': round(market_cap / 1e9, 1),
-                'size': size,
+                'size': bucket([market_cap], *SIZE_BUCKETS, right=True)[0],
                 'sector': sector,
                 'dividend_yield': round(dividend_yield * 100, 2) if dividend_yield else 0,
-                'fundamental_score': fund_score
+                'features': {'pe_ratio': pe_ratio, 'revenue_growth': revenue_growth, 'roe': roe},
             }
             
         except Exception as e:
@@ -302,14 +548,14 @@ class EnhancedSmartMoneyScreener:
             'pe_ratio': 'N/A', 'forward_pe': 'N/A', 'pb_ratio': 'N/A',
             'revenue_growth': 0, 'earnings_growth': 0, 'profit_margin': 0,
             'roe': 0, 'market_cap_b': 0, 'size': 'Unknown', 'sector': 'N/A',
-            'dividend_yield': 0, 'fundamental_score': 50
+            'dividend_yield': 0,
+            'features': {'pe_ratio': np.nan, 'revenue_growth': np.nan, 'roe': np.nan},
         }
     
     def get_analyst_ratings(self, ticker: str) -> Dict:
-        """Get analyst consensus and target price"""
+        """Analyst consensus and target price"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = self.get_info(ticker)
             
             # Get company name
             company_name = info.get('longName', '') or info.get('shortName', '') or ticker
@@ -327,25 +573,6 @@ class EnhancedSmartMoneyScreener:
             else:
                 upside = 0
             
-            # Analyst Score (0-100)
-            analyst_score = 50
-            
-            # Recommendation contribution
-            rec_map = {
-                'strongBuy': 25, 'buy': 20, 'hold': 0,
-                'sell': -15, 'strongSell': -25
-            }
-            analyst_score += rec_map.get(recommendation, 0)
-            
-            # Upside contribution
-            if upside > 30: analyst_score += 20
-            elif upside > 20: analyst_score += 15
-            elif upside > 10: analyst_score += 10
-            elif upside > 0: analyst_score += 5
-            elif upside < -10: analyst_score -= 15
-            
-            analyst_score = max(0, min(100, analyst_score))
-            
             return {
                 'company_name': company_name,
                 'current_price': round(current_price, 2),
@@ -353,7 +580,7 @@ class EnhancedSmartMoneyScreener:
                 'upside_pct': round(upside, 1),
                 'recommendation': recommendation,
                 'num_analysts': num_analysts,
-                'analyst_score': analyst_score
+                'features': {'recommendation': recommendation, 'upside_pct': upside},
             }
             
         except Exception as e:
@@ -363,69 +590,14 @@ class EnhancedSmartMoneyScreener:
         return {
             'company_name': '', 'current_price': 0, 'target_price': 'N/A',
             'upside_pct': 0, 'recommendation': 'none', 'num_analysts': 0,
-            'analyst_score': 50
+            'features': {'recommendation': 'none', 'upside_pct': 0},
         }
     
-    def get_relative_strength(self, ticker: str) -> Dict:
-        """Calculate relative strength vs S&P 500"""
-        try:
-            if self.spy_data is None or len(self.spy_data) < 20:
-                return {'rs_20d': 0, 'rs_60d': 0, 'rs_score': 50}
-            
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="3mo")
-            
-            if len(hist) < 20:
-                return {'rs_20d': 0, 'rs_60d': 0, 'rs_score': 50}
-            
-            # Calculate returns
-            stock_return_20d = (hist['Close'].iloc[-1] / hist['Close'].iloc[-21] - 1) * 100 if len(hist) >= 21 else 0
-            stock_return_60d = (hist['Close'].iloc[-1] / hist['Close'].iloc[0] - 1) * 100
-            
-            spy_return_20d = (self.spy_data['Close'].iloc[-1] / self.spy_data['Close'].iloc[-21] - 1) * 100 if len(self.spy_data) >= 21 else 0
-            spy_return_60d = (self.spy_data['Close'].iloc[-1] / self.spy_data['Close'].iloc[0] - 1) * 100
-            
-            rs_20d = stock_return_20d - spy_return_20d
-            rs_60d = stock_return_60d - spy_return_60d
-            
-            # RS Score (0-100)
-            rs_score = 50
-            if rs_20d > 10: rs_score += 25
-            elif rs_20d > 5: rs_score += 15
-            elif rs_20d > 0: rs_score += 8
-            elif rs_20d < -10: rs_score -= 20
-            elif rs_20d < -5: rs_score -= 10
-            
-            if rs_60d > 15: rs_score += 15
-            elif rs_60d > 5: rs_score += 8
-            elif rs_60d < -15: rs_score -= 15
-            
-            rs_score = max(0, min(100, rs_score))
-            
-            return {
-                'rs_20d': round(rs_20d, 1),
-                'rs_60d': round(rs_60d, 1),
-                'rs_score': rs_score
-            }
-            
-        except Exception as e:
-            return {'rs_20d': 0, 'rs_60d': 0, 'rs_score': 50}
-    
     def get_liquidity_analysis(self, ticker: str) -> Dict:
-        """Analyze liquidity and volume quality"""
+        """Liquidity and volume quality"""
         try:
-            stock = yf.Ticker(ticker)
-            # Fetch minute data for recent session to check immediate liquidity if possible, 
-            # otherwise fall back to daily. 1m data is only available for last 7 days.
-            # We use 1d for broad screening but check 'Volume' vs 'Avg Volume' closely.
-            if self.prices_df is None:
-                info = stock.info
-            else:
-                info = {} # Fallback if using cached DF later (not implemented here fully)
-            
-            # If info missing, fetch fresh
-            if not info or len(info) < 5:
-                info = stock.info
+            # Daily volume vs average volume from the shared info payload
+            info = self.get_info(ticker)
 
             current_volume = info.get('volume', 0)
             avg_volume = info.get('averageVolume', 0)
@@ -438,65 +610,140 @@ class EnhancedSmartMoneyScreener:
             # Volume Velocity (Relative Volume)
             vol_velocity = current_volume / avg_volume if avg_volume > 0 else 0
             
-            # Liquidity Score Calculation
-            liq_score = 50
-            
-            # 1. Dollar Volume (The Barrier to Entry)
-            if avg_dollar_vol > 500_000_000: liq_score += 20    # Mega Liquidity
-            elif avg_dollar_vol > 100_000_000: liq_score += 15  # High Liquidity
-            elif avg_dollar_vol > 20_000_000: liq_score += 5    # Acceptable
-            elif avg_dollar_vol < 5_000_000: liq_score -= 20    # Illiquid (Danger)
-            
-            # 2. Volume Velocity (The Impulse)
-            if vol_velocity > 2.0: liq_score += 15       # Huge Buying/Selling
-            elif vol_velocity > 1.2: liq_score += 10     # Active
-            elif vol_velocity < 0.5: liq_score -= 10     # Dead Zone
-            
-            liq_score = max(0, min(100, liq_score))
-            
             return {
                 'dollar_volume': dollar_vol,
                 'avg_dollar_volume': avg_dollar_vol,
                 'vol_velocity': round(vol_velocity, 2),
-                'liquidity_score': liq_score
+                'features': {'avg_dollar_volume': avg_dollar_vol, 'vol_velocity': vol_velocity},
             }
         except Exception as e:
-            return {'dollar_volume':0, 'vol_velocity':0, 'liquidity_score': 50}
+            return {'dollar_volume': 0, 'avg_dollar_volume': 0, 'vol_velocity': 0,
+                    'features': {'avg_dollar_volume': np.nan, 'vol_velocity': np.nan}}
 
-    def calculate_composite_score(self, row: pd.Series, tech: Dict, fund: Dict, analyst: Dict, rs: Dict, liq: Dict) -> Tuple[float, str]:
-        """Calculate final composite score with Liquidity Weighting"""
-        # Adjusted Model: Liquidity is King. 
-        # Without liquidity, technicals are noise.
+    def calculate_composite_scores(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Final composite score and grade for every candidate at once (Liquidity Weighting)"""
+        composite = weighted_sum(df, COMPOSITE_WEIGHTS)
         
-        composite = (
-            row.get('supply_demand_score', 50) * 0.20 +
-            liq.get('liquidity_score', 50) * 0.15 +     # New Factor
-            row.get('institutional_score', 50) * 0.15 +
-            tech.get('technical_score', 50) * 0.20 +
-            fund.get('fundamental_score', 50) * 0.10 +  # Slightly reduced
-            analyst.get('analyst_score', 50) * 0.10 +
-            rs.get('rs_score', 50) * 0.10
-        )
+        # Penalize low liquidity HARD (thin stocks)
+        composite = np.where(df['avg_dollar_volume'].to_numpy() < LOW_LIQUIDITY_USD,
+                             composite * LOW_LIQUIDITY_PENALTY, composite)
+        return np.round(composite, 1), bucket(composite, *GRADES)
+    
+    def prefetch(self, tickers: List[str], need_history: set, workers: int = 8):
+        """
+        I/O stage: one info payload (plus history where the panel has no bars) per ticker
+        on a bounded thread pool; request pacing comes from the shared 'yahoo' token bucket
+        """
+        def fetch(ticker: str):
+            loaders = [self.get_info] + ([self.get_history] if ticker in need_history else [])
+            for loader in loaders:
+                try:
+                    loader(ticker)
+                except Exception as e:
+                    logger.debug(f"Fetch failed for {ticker}: {e}")
         
-        # Penalize low liquidity HARD
-        if liq.get('avg_dollar_volume', 0) < 10_000_000:
-            composite *= 0.8  # 20% Penalty for thin stocks
-            
-        # Determine grade
-        if composite >= 85: grade = "💎 S+ (Institutions Buying)"
-        elif composite >= 75: grade = "🔥 A (Active Accumulation)"
-        elif composite >= 65: grade = "✅ B (Actionable)"
-        elif composite >= 50: grade = "👀 C (Watch)"
-        elif composite >= 40: grade = "⚠️ D (Weak)"
-        else: grade = "🚫 F (Avoid)"
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(tqdm(executor.map(fetch, tickers), total=len(tickers), desc="Fetching fundamentals"))
         
-        return round(composite, 1), grade
+        limiter = get_limiter('yahoo')
+        if tickers and limiter is not None:
+            logger.info(f"🚦 Yahoo budget: {limiter.stats()}")
+    
+    def score_candidates(self, filtered: pd.DataFrame, technicals: pd.DataFrame, rs_table: pd.DataFrame) -> pd.DataFrame:
+        """
+        CPU stage: analyzers read the fetched bundles into a candidates x features matrix,
+        then every score card runs once over the whole set
+        """
+        tickers = filtered['ticker'].tolist()
+        if not tickers:
+            return pd.DataFrame()
+        
+        # Technicals / RS for candidates the panel lacks, from their fetched history
+        missing = [t for t in tickers if t not in technicals.index or t not in rs_table.index]
+        if missing:
+            extra_tech, extra_rs = self.history_technicals(missing)
+            technicals = pd.concat([technicals, extra_tech[~extra_tech.index.isin(technicals.index)]])
+            rs_table = pd.concat([rs_table, extra_rs[~extra_rs.index.isin(rs_table.index)]])
+        tech = technicals.reindex(tickers)
+        rs = rs_table.reindex(tickers)
+        
+        fund = [self.get_fundamental_analysis(t) for t in tickers]
+        analyst = [self.get_analyst_ratings(t) for t in tickers]
+        liq = [self.get_liquidity_analysis(t) for t in tickers]
+        features = lambda rows: pd.DataFrame([r['features'] for r in rows])
+        
+        results_df = pd.DataFrame({
+            'ticker': tickers,
+            'name': [a['company_name'] for a in analyst],
+            'sd_score': filtered['supply_demand_score'].to_numpy() if 'supply_demand_score' in filtered else 50,
+            'inst_score': filtered['institutional_score'].to_numpy() if 'institutional_score' in filtered else 50,
+            'liq_score': LIQUIDITY_CARD.score(features(liq)).astype(int),
+            'tech_score': tech['technical_score'].fillna(50).astype(int).to_numpy(),
+            'fund_score': FUNDAMENTAL_CARD.score(features(fund)).astype(int),
+            'analyst_score': ANALYST_CARD.score(features(analyst)).astype(int),
+            'rs_score': rs['rs_score'].fillna(50).astype(int).to_numpy(),
+            'current_price': [a['current_price'] for a in analyst],
+            'target_upside': [a['upside_pct'] for a in analyst],
+            'rsi': tech['rsi'].fillna(50).to_numpy(),
+            'gap_velocity': [l['vol_velocity'] for l in liq],
+            'avg_dollar_volume': [l['avg_dollar_volume'] for l in liq],
+            'ma_signal': tech['ma_signal'].fillna('Unknown').to_numpy(),
+            'recommendation': [a['recommendation'] for a in analyst],
+            'sector': [f['sector'] for f in fund],
+            'market_cap_b': [f['market_cap_b'] for f in fund],
+            'size': [f['size'] for f in fund],
+        })
+        passive = pd.DataFrame([self.get_passive_flow(t, f['market_cap_b']) for t, f in zip(tickers, fund)])
+        results_df = pd.concat([results_df, passive], axis=1)
+        
+        composite, grade = self.calculate_composite_scores(results_df)
+        results_df.insert(2, 'composite_score', composite)
+        results_df.insert(3, 'grade', grade)
+        results_df.insert(results_df.columns.get_loc('avg_dollar_volume'), 'avg_vol_m',
+                          (results_df['avg_dollar_volume'] / 1_000_000).round(1))
+        return results_df.drop(columns=['avg_dollar_volume'])
+    
+    def input_fingerprints(self, candidates: pd.DataFrame) -> pd.Series:
+        """
+        Per-ticker content hash of the screener inputs (volume + 13F row, implied passive flow)
+        update_all.py rewrites the input files before a rerun; a journaled ticker is only
+        reused when its own inputs hash the same, so unchanged rows survive the rewrite
+        """
+        inputs = candidates.set_index('ticker')
+        if not self.passive_flows.empty:
+            inputs = inputs.join(self.passive_flows, rsuffix='_passive')
+        hashes = pd.util.hash_pandas_object(inputs, index=True)
+        hashes = hashes[~hashes.index.duplicated()]
+        return hashes.map(lambda h: format(int(h), '016x'))
     
-    def run_screening(self, top_n: int = 50) -> pd.DataFrame:
-        """Run enhanced screening"""
+    def save_results(self, results_df: pd.DataFrame):
+        """Atomic write of the picks CSV (readers never see a half-written file)"""
+        tmp_path = self.output_file + '.tmp'
+        results_df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.output_file)
+    
+    @staticmethod
+    def rank(batches: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate scored batches, sort by composite score and number the ranks"""
+        batches = [b for b in batches if not b.empty]
+        if not batches:
+            return pd.DataFrame()
+        results_df = pd.concat(batches, ignore_index=True).sort_values('composite_score', ascending=False)
+        results_df['rank'] = range(1, len(results_df) + 1)
+        return results_df
+    
+    def run_screening(self, top_n: int = 50, workers: int = 8, resume: bool = False,
+                      batch_size: int = 50) -> pd.DataFrame:
+        """
+        Run enhanced screening as a staged pipeline:
+        prefilter -> technicals (local panel, vectorized) -> per batch: fetch (thread pool) -> score
+        Scored batches go to the checkpoint journal; resume=True skips tickers already in it
+        """
         logger.info("🔍 Running Enhanced Smart Money Screening...")
+        timings = {}
         
         # Merge volume and holdings data
+        started = time.time()
         merged_df = pd.merge(
             self.volume_df,
             self.holdings_df,
@@ -507,68 +754,77 @@ class EnhancedSmartMoneyScreener:
         
         # Pre-filter: Focus on accumulation candidates
         filtered = merged_df[merged_df['supply_demand_score'] >= 50]
-        
+        tickers = filtered['ticker'].tolist()
+        timings['prefilter'] = time.time() - started
         logger.info(f"📊 Pre-filtered to {len(filtered)} candidates")
         
-        results = []
+        # Checkpoint journal: with resume, tickers scored this session from the same inputs are skipped
+        fingerprints = self.input_fingerprints(filtered)
+        journal = ResultJournal(self.journal_file, {'session': last_completed_session().isoformat()})
+        records = journal.load() if resume else None
+        if records is None:
+            journal.start()
+            records = []
+        done = pd.DataFrame(records)
+        if not done.empty:
+            done = done[done['_inputs'] == done['ticker'].map(fingerprints)].drop(columns='_inputs')
+            logger.info(f"♻️ Resuming: {len(done)}/{len(tickers)} candidates already scored this session")
+            tickers = [t for t in tickers if t not in set(done['ticker'])]
         
-        for idx, row in tqdm(filtered.iterrows(), total=len(filtered), desc="Enhanced Screening"):
-            ticker = row['ticker']
-            
-            # Get all analyses
-            tech = self.get_technical_analysis(ticker)
-            fund = self.get_fundamental_analysis(ticker)
-            analyst = self.get_analyst_ratings(ticker)
-            rs = self.get_relative_strength(ticker)
-            liq = self.get_liquidity_analysis(ticker)
-            
-            # Calculate composite score
-            composite_score, grade = self.calculate_composite_score(row, tech, fund, analyst, rs, liq)
-            
-            result = {
-                'ticker': ticker,
-                'name': analyst.get('company_name', ticker),
-                'composite_score': composite_score,
-                'grade': grade,
-                'sd_score': row.get('supply_demand_score', 50),
-                'inst_score': row.get('institutional_score', 50),
-                'liq_score': liq['liquidity_score'],
-                'tech_score': tech['technical_score'],
-                'fund_score': fund['fundamental_score'],
-                'analyst_score': analyst['analyst_score'],
-                'rs_score': rs['rs_score'],
-                'current_price': analyst['current_price'],
-                'target_upside': analyst['upside_pct'],
-                'rsi': tech['rsi'],
-                'gap_velocity': liq['vol_velocity'],
-                'avg_vol_m': round(liq['avg_dollar_volume'] / 1_000_000, 1),
-                'ma_signal': tech['ma_signal'],
-                'recommendation': analyst['recommendation'],
-                'sector': fund['sector'],
-                'market_cap_b': fund['market_cap_b'],
-                'size': fund['size']
-            }
-            results.append(result)
+        # Technicals / RS for all candidates from the local panel (yfinance history only when missing)
+        started = time.time()
+        technicals, rs_table = self.compute_technicals(tickers)
+        timings['technicals'] = time.time() - started
+        logger.info(f"📐 Local technicals for {len(technicals)}/{len(tickers)} candidates")
         
-        # Create DataFrame and sort
-        results_df = pd.DataFrame(results)
-        results_df = results_df.sort_values('composite_score', ascending=False)
-        results_df['rank'] = range(1, len(results_df) + 1)
+        # Fetch + score in batches; each batch is journaled so a killed run keeps it
+        timings['fetch'] = timings['score'] = 0.0
+        pending = filtered[filtered['ticker'].isin(tickers)]
+        batches = [done] if not done.empty else []
+        for start in range(0, len(pending), batch_size):
+            batch = pending.iloc[start:start + batch_size]
+            batch_tickers = batch['ticker'].tolist()
+            
+            started = time.time()
+            need_history = {t for t in batch_tickers if t not in technicals.index or t not in rs_table.index}
+            self.prefetch(batch_tickers, need_history, workers=workers)
+            self.fundamentals.save()
+            timings['fetch'] += time.time() - started
+            
+            started = time.time()
+            scored = self.score_candidates(batch, technicals, rs_table)
+            journal.append(scored.assign(_inputs=scored['ticker'].map(fingerprints)))
+            batches.append(scored)
+            # Partial picks are usable downstream even if the run is killed later
+            self.save_results(self.rank(batches))
+            timings['score'] += time.time() - started
         
-        return results_df
+        stats = self.fetch_report()
+        cache = self.fundamentals.report()
+        logger.info(f"📡 Fetched {stats['info']} info + {stats['history']} history payloads for "
+                    f"{stats['tickers']} tickers ({stats['calls_per_ticker']} calls/ticker, {workers} workers)")
+        logger.info(f"🗃️ Fundamentals cache: {cache['hits']} fresh / {cache['misses']} expired "
+                    f"({cache['hit_rate']:.0%} hit rate, {cache['entries']} entries, {cache['evicted']} evicted)")
+        
+        self.stage_timings = {k: round(v, 2) for k, v in timings.items()}
+        logger.info("⏱️ Stage timings: " + ", ".join(f"{k} {v:.1f}s" for k, v in self.stage_timings.items()))
+        
+        # Sort and rank
+        return self.rank(batches)
     
-    def run(self, top_n: int = 50) -> pd.DataFrame:
+    def run(self, top_n: int = 50, workers: int = 8, use_cache: bool = True, resume: bool = False) -> pd.DataFrame:
         """Main execution"""
         logger.info("🚀 Starting Enhanced Smart Money Screener v2.0...")
+        self.use_cache = use_cache
         
         if not self.load_data():
             logger.error("❌ Failed to load data")
             return pd.DataFrame()
         
-        results_df = self.run_screening(top_n)
+        results_df = self.run_screening(top_n, workers=workers, resume=resume)
         
         # Save results
-        results_df.to_csv(self.output_file, index=False)
+        self.save_results(results_df)
         logger.info(f"✅ Saved to {self.output_file}")
         
         return results_df
@@ -579,10 +835,13 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--dir', default=None)
     parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent fundamentals fetches (paced by the Yahoo budget)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-fetch fundamentals for every candidate')
+    parser.add_argument('--resume', action='store_true', help='Skip candidates already scored this session from unchanged inputs (checkpoint journal)')
     args = parser.parse_args()
     
     screener = EnhancedSmartMoneyScreener(data_dir=args.dir)
-    results = screener.run(top_n=args.top)
+    results = screener.run(top_n=args.top, workers=args.workers, use_cache=not args.no_cache, resume=args.resume)
     
     if not results.empty:
         print(f"\n🔥 TOP {args.top} ENHANCED SMART MONEY PICKS")
@@ -25,6 +25,12 @@ scripts = [
     ("vcp_screener.py", "VCP Screener", 180)
 ]
 
+# Extra CLI arguments per script
+script_args = {
+    "create_us_daily_prices.py": ["--batch"],
+    "smart_money_screener_v2.py": ["--resume"],   # a rerun after a timeout only scores the unfinished tail
+}
+
 def run_script(name, desc, timeout):
     path = os.path.join(SCRIPTS_DIR, name)
     if not os.path.exists(path):
@@ -33,7 +39,8 @@ def run_script(name, desc, timeout):
     
     print(f"▶️  Running {desc}...")
     try:
-        result = subprocess.run([sys.executable, path], timeout=timeout, capture_output=True, text=True)
+        cmd = [sys.executable, path] + script_args.get(name, [])
+        result = subprocess.run(cmd, timeout=timeout, capture_output=True, text=True)
         if result.returncode == 0:
             print(f"✅ {desc}: Done")
             return True
@@ -53,8 +60,17 @@ def main():
     parser = argparse.ArgumentParser(description='US Market Update Script')
     parser.add_argument('--quick', action='store_true', help='Skip AI-heavy scripts')
     parser.add_argument('--data-only', action='store_true', help='Only run data collection')
+    parser.add_argument('--record', action='store_true', help='Save market data responses as fixtures')
+    parser.add_argument('--replay', action='store_true', help='Run offline from saved market data fixtures')
+    parser.add_argument('--fixtures', help='Fixture directory for --record / --replay')
     args = parser.parse_args()
     
+    # Child scripts pick the market data backend up from the environment
+    if args.record or args.replay:
+        os.environ['MARKET_DATA_MODE'] = 'replay' if args.replay else 'record'
+    if args.fixtures:
+        os.environ['MARKET_DATA_FIXTURES'] = os.path.abspath(args.fixtures)
+    
     print("="*50)
     print("🚀 US Market Dashboard Update")
     print("="*50)
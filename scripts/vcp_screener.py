@@ -8,13 +8,18 @@ Logic:
 3. Volume Dry Up (Low volume during consolidation)
 """
 import os
+import sys
 import json
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.price_panel import open_panel, default_panel_path
+from engine.market_data import get_provider
+from engine.universe import load_universe, VCP
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,19 +29,19 @@ OUTPUT_FILE = os.path.join(DATA_DIR, 'vcp_candidates.json')
 
 class VCPScreener:
     def __init__(self):
-        # Top 50 most active/liquid stocks for demo purposes
-        # In production, this should screen a larger universe (e.g., S&P 500)
-        self.tickers = [
-            'NVDA', 'AMD', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'NFLX',
-            'PLTR', 'COIN', 'MSTR', 'SMCI', 'ARM', 'AVGO', 'ORCL', 'CRM', 'ADBE',
-            'NET', 'CRWD', 'PANW', 'SNOW', 'DDOG', 'ZS', 'TTD', 'DKNG', 'UBER',
-            'SHOP', 'SQ', 'PYPL', 'AFRM', 'SOFI', 'MARA', 'RIOT', 'CLSK',
-            'LLY', 'NVO', 'VRTX', 'REGN', 'ISRG', 'CAT', 'DE', 'URI', 'GME'
-        ]
+        # Liquid growth names tagged VCP in the shared universe table
+        self.tickers = load_universe(DATA_DIR).tickers(index=VCP)
+
+        self.panel = open_panel(default_panel_path(DATA_DIR))
 
     def fetch_data(self, ticker):
+        # Prefer the shared local panel (last ~1y of bars), download otherwise
+        if self.panel is not None and ticker in self.panel:
+            df = self.panel.frame(ticker, n=252)
+            if len(df) >= 200:
+                return df
         try:
-            df = yf.download(ticker, period='1y', progress=False)
+            df = get_provider('yfinance').download(ticker, period='1y', progress=False)
             if df.empty: return None
             return df
         except:
@@ -0,0 +1,96 @@
+# Corporate action re-adjustment of stored history: applied once, even across a crash
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import engine.price_store as price_store
+from engine.price_store import PriceStore
+from engine.corporate_actions import CorporateActionLedger, SPLIT
+
+SPLIT_EVENT = [{'date': '2024-06-10', 'type': SPLIT, 'value': 2.0}]
+
+
+def stored_bars() -> pd.DataFrame:
+    dates = pd.bdate_range('2024-05-27', '2024-06-07')
+    close = np.linspace(200, 218, len(dates))
+    return pd.DataFrame({'date': dates, 'open': close, 'high': close + 2, 'low': close - 2,
+                         'current_price': close, 'volume': 1000, 'name': 'Test', 'market': 'S&P500'})
+
+
+def window_closes() -> pd.Series:
+    return pd.Series([110.0, 111.0], index=pd.to_datetime(['2024-06-10', '2024-06-11']))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(str(tmp_path / 'price_store'))
+    store.append('TEST', stored_bars())
+    store.flush()
+    return store
+
+
+def ledger(tmp_path) -> CorporateActionLedger:
+    return CorporateActionLedger(str(tmp_path / 'corporate_actions.json'))
+
+
+def assert_split_once(store: PriceStore):
+    expected = stored_bars()
+    arrays = store.read_ticker('TEST')
+    np.testing.assert_allclose(arrays['current_price'], expected['current_price'] / 2)
+    np.testing.assert_allclose(arrays['high'], (expected['current_price'] + 2) / 2)
+    assert arrays['volume'].tolist() == [2000] * len(expected)
+    assert [a['key'] for a in store.applied_adjustments('TEST')] == ['2024-06-10:split']
+
+
+def test_split_is_applied_once(store, tmp_path):
+    assert ledger(tmp_path).apply(store, 'TEST', SPLIT_EVENT, window_closes()) == len(stored_bars())
+    assert_split_once(store)
+
+    # Ledger already knows the event; a store-level replay of the same key is a no-op too
+    assert ledger(tmp_path).apply(store, 'TEST', SPLIT_EVENT, window_closes()) == 0
+    assert store.adjust('TEST', 0.5, 2.0, before='2024-06-10', key='2024-06-10:split') == 0
+    assert_split_once(store)
+
+
+def test_crash_while_swapping_columns_is_finished_not_repeated(store, tmp_path, monkeypatch):
+    real_replace, swaps = os.replace, []
+
+    def crash_after_first_swap(src, dst):
+        if src.endswith('.adj'):
+            swaps.append(dst)
+            if len(swaps) == 2:
+                raise KeyboardInterrupt
+        real_replace(src, dst)
+
+    monkeypatch.setattr(price_store.os, 'replace', crash_after_first_swap)
+    with pytest.raises(KeyboardInterrupt):
+        ledger(tmp_path).apply(store, 'TEST', SPLIT_EVENT, window_closes())
+    monkeypatch.setattr(price_store.os, 'replace', real_replace)
+    assert not os.path.exists(tmp_path / 'corporate_actions.json')
+
+    # Next run sees the event again (the ledger was never saved)
+    rerun = PriceStore(store.root)
+    ledger(tmp_path).apply(rerun, 'TEST', SPLIT_EVENT, window_closes())
+    assert_split_once(rerun)
+    assert ledger(tmp_path).new_events('TEST', SPLIT_EVENT) == []
+
+
+def test_crash_before_the_commit_leaves_history_untouched(store, tmp_path, monkeypatch):
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    # Columns are staged, the pending marker is never written
+    monkeypatch.setattr(PriceStore, '_write_json', crash)
+    with pytest.raises(KeyboardInterrupt):
+        ledger(tmp_path).apply(store, 'TEST', SPLIT_EVENT, window_closes())
+    monkeypatch.undo()
+
+    np.testing.assert_allclose(store.read_ticker('TEST')['current_price'], stored_bars()['current_price'])
+    assert store.applied_adjustments('TEST') == []
+
+    ledger(tmp_path).apply(PriceStore(store.root), 'TEST', SPLIT_EVENT, window_closes())
+    assert_split_once(PriceStore(store.root))
@@ -0,0 +1,87 @@
+# Date x ticker matrix store: appends, re-lays and what a reader holding the old index sees
+import os
+import sys
+import json
+import glob
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.date_ticker_store import DateTickerStore
+
+FIELDS = ['score', 'volume_ratio']
+
+
+def rows(day: str, values: dict) -> pd.DataFrame:
+    return pd.DataFrame({'date': day, 'ticker': list(values), 'score': list(values.values()),
+                         'volume_ratio': [v / 100 for v in values.values()]})
+
+
+def matrix_files(root) -> list:
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(str(root), '*.bin')))
+
+
+def indexed_files(root) -> dict:
+    with open(os.path.join(str(root), 'index.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)['files']
+
+
+def test_appends_and_new_tickers(tmp_path):
+    store = DateTickerStore(str(tmp_path), FIELDS)
+    store.write(rows('2024-06-10', {'AAPL': 60.0, 'MSFT': 70.0}))
+    store.write(rows('2024-06-11', {'AAPL': 61.0}))
+    store.write(rows('2024-06-12', {'NVDA': 90.0, 'AAPL': 62.0}))
+
+    reopened = DateTickerStore(str(tmp_path), FIELDS)
+    assert reopened.tickers == ['AAPL', 'MSFT', 'NVDA']
+    assert reopened.series('AAPL')['score'].tolist() == [60.0, 61.0, 62.0]
+    assert reopened.series('MSFT')['score'].tolist() == [70.0]
+    assert reopened.cross_section('2024-06-11')['score'].to_dict() == {'AAPL': 61.0}
+
+
+def test_reader_on_the_old_index_keeps_its_columns(tmp_path):
+    store = DateTickerStore(str(tmp_path), FIELDS)
+    store.write(rows('2024-06-10', {'MSFT': 70.0, 'NVDA': 90.0}))
+    store.write(rows('2024-06-11', {'MSFT': 71.0, 'NVDA': 91.0}))
+    reader = DateTickerStore(str(tmp_path), FIELDS)
+
+    # A new ticker widens every row of the matrices
+    store.write(rows('2024-06-12', {'AAPL': 62.0, 'MSFT': 72.0}))
+
+    assert reader.series('NVDA')['score'].tolist() == [90.0, 91.0]
+    assert reader.series('MSFT')['score'].tolist() == [70.0, 71.0]
+    fresh = DateTickerStore(str(tmp_path), FIELDS)
+    assert fresh.series('NVDA')['score'].tolist() == [90.0, 91.0]
+    assert fresh.series('MSFT')['score'].tolist() == [70.0, 71.0, 72.0]
+    assert fresh.series('AAPL')['volume_ratio'].tolist() == [0.62]
+
+
+def test_relays_switch_through_the_index_and_prune_old_versions(tmp_path):
+    store = DateTickerStore(str(tmp_path), FIELDS)
+    store.write(rows('2024-06-11', {'AAPL': 61.0}))
+    store.write(rows('2024-06-12', {'MSFT': 72.0}))
+    previous = indexed_files(tmp_path)
+    assert len(matrix_files(tmp_path)) == 2 * len(FIELDS)
+    store.write(rows('2024-06-10', {'NVDA': 90.0}))   # back-dated row + new ticker
+
+    files = indexed_files(tmp_path)
+    assert sorted(files) == FIELDS
+    # Current plus the previous version (readers may still be opening it), nothing older
+    assert matrix_files(tmp_path) == sorted(set(files.values()) | set(previous.values()))
+    assert np.isnan(store.cross_section('2024-06-10', ['score']).reindex(['AAPL'])['score']).all()
+    assert DateTickerStore(str(tmp_path), FIELDS).series('AAPL')['score'].tolist() == [61.0]
+
+
+def test_legacy_unversioned_store_is_read_and_upgraded(tmp_path):
+    days = np.asarray([19884], dtype='int64')   # 2024-06-11
+    for k, field in enumerate(FIELDS):
+        np.asarray([[1.0 + k, 2.0 + k]]).tofile(os.path.join(str(tmp_path), f'{field}.bin'))
+    with open(os.path.join(str(tmp_path), 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump({'days': days.tolist(), 'tickers': ['AAPL', 'MSFT'], 'fields': FIELDS}, f)
+
+    store = DateTickerStore(str(tmp_path), FIELDS)
+    assert store.series('MSFT')['score'].tolist() == [2.0]
+    store.write(rows('2024-06-12', {'AAPL': 3.0, 'NVDA': 4.0}))
+    assert DateTickerStore(str(tmp_path), FIELDS).series('MSFT')['volume_ratio'].tolist() == [3.0]
+    assert DateTickerStore(str(tmp_path), FIELDS).series('AAPL')['score'].tolist() == [1.0, 3.0]
@@ -0,0 +1,39 @@
+# Fundamentals cache: per-field freshness and what a fetched payload may stamp
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.fundamentals_cache import FundamentalsCache, FIELD_TTLS, DAILY_SESSIONS, QUARTERLY_SESSIONS
+
+FIELDS = ['sector', 'revenueGrowth', 'targetMeanPrice']
+MONDAY, TUESDAY = date(2024, 6, 10), date(2024, 6, 11)
+
+
+def test_analyst_fields_are_daily_by_default():
+    assert FIELD_TTLS['targetMeanPrice'] == FIELD_TTLS['recommendationKey'] == DAILY_SESSIONS
+    assert FIELD_TTLS['revenueGrowth'] == QUARTERLY_SESSIONS
+
+
+def test_fields_expire_per_ttl(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / 'fundamentals_cache.json'))
+    assert cache.put('AAPL', {'sector': 'Technology', 'revenueGrowth': 0.1, 'targetMeanPrice': 200.0},
+                     FIELDS, session=MONDAY) == 3
+
+    assert cache.get('AAPL', FIELDS, session=MONDAY)['targetMeanPrice'] == 200.0
+    assert cache.get('AAPL', FIELDS, session=TUESDAY) is None
+    assert cache.get('AAPL', ['sector', 'revenueGrowth'], session=TUESDAY) == {'sector': 'Technology',
+                                                                               'revenueGrowth': 0.1}
+
+
+def test_empty_or_partial_payloads_are_not_cached_as_fresh(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / 'fundamentals_cache.json'))
+    assert cache.put('AAPL', {}, FIELDS, session=MONDAY) == 0
+    assert 'AAPL' not in cache.entries
+
+    cache.put('AAPL', {'sector': 'Technology', 'revenueGrowth': 0.1, 'targetMeanPrice': 200.0},
+              FIELDS, session=MONDAY)
+    # Throttled refetch the next session: only the value it carried is restamped
+    assert cache.put('AAPL', {'sector': 'Technology', 'revenueGrowth': None}, FIELDS, session=TUESDAY) == 1
+    assert cache.get('AAPL', FIELDS, session=TUESDAY) is None
+    assert cache.stored('AAPL', FIELDS) == {'sector': 'Technology', 'revenueGrowth': 0.1, 'targetMeanPrice': 200.0}
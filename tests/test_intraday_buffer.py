@@ -0,0 +1,91 @@
+# Intraday ring buffers, session aggregation and the per-session daily context
+import os
+import sys
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.intraday_buffer import RingBuffer, IntradayStore, SessionContext
+from engine.trading_calendar import EST, is_early_close
+
+BLACK_FRIDAY = date(2024, 11, 29)
+
+
+def bar(value: float, volume: float = 100.0):
+    return [value, value + 1, value - 1, value, volume]
+
+
+def minute_frame(day: date, start: str, end: str) -> pd.DataFrame:
+    index = pd.date_range(EST.localize(datetime.combine(day, datetime.strptime(start, '%H:%M').time())),
+                          EST.localize(datetime.combine(day, datetime.strptime(end, '%H:%M').time())), freq='1min')
+    close = np.arange(len(index), dtype=float) + 100
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 10.0}, index=index)
+
+
+def test_ring_buffer_wraps_around_in_order():
+    buf = RingBuffer(3)
+    for ts in range(1, 6):
+        assert buf.push(ts * 60, bar(ts))
+
+    stamps, bars = buf.last()
+    assert len(buf) == 3
+    assert stamps.tolist() == [180, 240, 300]
+    assert bars[:, 3].tolist() == [3, 4, 5]
+    assert buf.last(2)[0].tolist() == [240, 300]
+    assert buf.since(200)[0].tolist() == [240, 300]
+
+
+def test_ring_buffer_replaces_the_in_progress_bar():
+    buf = RingBuffer(3)
+    buf.push(60, bar(1))
+    buf.push(120, bar(2, volume=50))
+    assert buf.push(120, bar(2.5, volume=80))
+    assert not buf.push(60, bar(9))
+
+    stamps, bars = buf.last()
+    assert stamps.tolist() == [60, 120]
+    assert bars[-1].tolist() == bar(2.5, volume=80)
+
+
+def test_session_bar_stops_at_an_early_close():
+    assert is_early_close(BLACK_FRIDAY)
+    store = IntradayStore(['AAPL'], capacity={'1m': 500})
+    # Pre-market, the shortened session, then post-close prints
+    store.ingest('AAPL', '1m', minute_frame(BLACK_FRIDAY, '09:00', '14:00'))
+
+    session = store.session_bar('AAPL', day=BLACK_FRIDAY)
+    assert session['as_of'] == '12:59'
+    assert session['open'] == 130.0          # 09:30 is the 31st minute
+    assert session['close'] == 100.0 + 239
+    assert session['volume'] == 210 * 10
+
+
+def test_session_context_caches_failures_for_the_session():
+    calls = []
+
+    def loader(ticker, session):
+        calls.append((ticker, session))
+        if ticker == 'FAIL':
+            raise RuntimeError('rate limited')
+        return None if ticker == 'PART' else {'ticker': ticker}
+
+    context = SessionContext(loader)
+    tickers = ['AAPL', 'FAIL', 'PART']
+    assert context.pending(tickers, '2024-06-10') == tickers
+    assert context.warm(tickers, '2024-06-10') == 1
+    assert context.get('AAPL', '2024-06-10') == {'ticker': 'AAPL'}
+    assert context.get('PART', '2024-06-10') is None
+    assert context.unavailable('2024-06-10') == {'FAIL': 'rate limited', 'PART': 'incomplete'}
+
+    # Later warm-ups in the same session make no calls
+    assert context.warm(tickers, '2024-06-10') == 0
+    assert len(calls) == 3
+    assert context.pending(tickers, '2024-06-10') == []
+
+    # The next session starts over
+    assert context.pending(tickers, '2024-06-11') == tickers
+    assert context.warm(tickers, '2024-06-11') == 1
+    assert len(calls) == 6
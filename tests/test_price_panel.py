@@ -0,0 +1,84 @@
+# Price store manifest / shared panel staleness across collector runs
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.price_store import PriceStore, BENCHMARK_MARKET
+from engine.price_panel import PricePanel, default_panel_path
+from engine.trading_calendar import last_completed_session
+from scripts.create_us_daily_prices import USStockDailyPricesCreator
+
+TICKERS = {'AAPL': 'Apple Inc.', 'MSFT': 'Microsoft Corp.', 'SPY': 'SPDR S&P 500 ETF'}
+
+
+def bars(ticker: str, days: int = 30) -> pd.DataFrame:
+    dates = pd.bdate_range(end=pd.Timestamp(last_completed_session()), periods=days)
+    close = 100 + np.arange(days, dtype=float)
+    return pd.DataFrame({
+        'date': dates, 'open': close, 'high': close + 1, 'low': close - 1, 'current_price': close,
+        'volume': 1_000_000, 'name': TICKERS[ticker],
+        'market': BENCHMARK_MARKET if ticker == 'SPY' else 'S&P500',
+    })
+
+
+@pytest.fixture
+def creator(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    creator = USStockDailyPricesCreator()
+    pd.DataFrame({'ticker': ['AAPL', 'MSFT'], 'name': [TICKERS['AAPL'], TICKERS['MSFT']],
+                  'market': 'S&P500'}).to_csv(creator.stocks_list_file, index=False)
+
+    store = PriceStore(creator.store_dir)
+    for ticker in TICKERS:
+        store.append(ticker, bars(ticker))
+    store.flush()
+    PricePanel.build(store, default_panel_path(creator.data_dir))
+    return creator
+
+
+def test_flush_writes_the_manifest_only_after_changes(tmp_path):
+    store = PriceStore(str(tmp_path / 'price_store'))
+    store.flush()
+    assert not os.path.exists(store.manifest_file)
+
+    store.append('AAPL', bars('AAPL'))
+    store.flush()
+    mtime = os.stat(store.manifest_file).st_mtime_ns
+
+    assert store.append('AAPL', bars('AAPL')) == 0
+    store.flush()
+    assert os.stat(store.manifest_file).st_mtime_ns == mtime
+
+
+def test_no_op_collector_run_keeps_the_panel_fresh(creator):
+    manifest_file = os.path.join(creator.store_dir, 'manifest.json')
+    panel_path = default_panel_path(creator.data_dir)
+    panel = PricePanel(panel_path)
+    mtime = os.stat(manifest_file).st_mtime_ns
+    assert not panel.stale(manifest_file)
+
+    # Every ticker is already up to date with the last session: nothing is downloaded
+    assert creator.run()
+
+    assert os.stat(manifest_file).st_mtime_ns == mtime
+    assert not PricePanel(panel_path).stale(manifest_file)
+    assert PricePanel(panel_path).data_file == panel.data_file
+
+
+def test_new_bars_mark_the_panel_stale_until_rebuilt(creator):
+    manifest_file = os.path.join(creator.store_dir, 'manifest.json')
+    panel_path = default_panel_path(creator.data_dir)
+    panel = PricePanel(panel_path)
+
+    store = PriceStore(creator.store_dir)
+    extra = bars('AAPL', 31)
+    extra['date'] = extra['date'] + pd.offsets.BDay(1)
+    assert store.append('AAPL', extra) == 1
+    store.flush()
+    assert panel.stale(manifest_file)
+
+    assert not PricePanel.build(store, panel_path).stale(manifest_file)
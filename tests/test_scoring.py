@@ -0,0 +1,128 @@
+# Declarative score cards / buckets against the hand-written ladders they replaced
+import os
+import sys
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.scoring import ScoreCard, bucket
+from scripts.analyze_volume import SUPPLY_DEMAND_CARD, SUPPLY_DEMAND_STAGES
+from scripts.smart_money_screener_v2 import GRADES, SIZE_BUCKETS
+
+NAN = float('nan')
+
+
+def baseline_supply_demand(obv_change, ad_change, vol_ratio, mfi):
+    """analyze_volume.py if-chains before the score card"""
+    score = 50
+    if obv_change > 10:
+        score += 15
+    elif obv_change > 5:
+        score += 10
+    elif obv_change < -10:
+        score -= 15
+    elif obv_change < -5:
+        score -= 10
+    if ad_change > 10:
+        score += 15
+    elif ad_change > 5:
+        score += 10
+    elif ad_change < -10:
+        score -= 15
+    elif ad_change < -5:
+        score -= 10
+    if vol_ratio > 1.5:
+        score += 10
+    elif vol_ratio > 1.2:
+        score += 5
+    elif vol_ratio < 0.7:
+        score -= 5
+    if mfi > 70:
+        score += 5
+    elif mfi < 30:
+        score -= 5
+    return max(0, min(100, score))
+
+
+def baseline_stage(score):
+    if score >= 70:
+        return "Strong Accumulation"
+    elif score >= 55:
+        return "Accumulation"
+    elif score >= 45:
+        return "Neutral"
+    elif score >= 30:
+        return "Distribution"
+    return "Strong Distribution"
+
+
+def baseline_grade(composite):
+    if composite >= 85: return "💎 S+ (Institutions Buying)"
+    elif composite >= 75: return "🔥 A (Active Accumulation)"
+    elif composite >= 65: return "✅ B (Actionable)"
+    elif composite >= 50: return "👀 C (Watch)"
+    elif composite >= 40: return "⚠️ D (Weak)"
+    return "🚫 F (Avoid)"
+
+
+def baseline_size(market_cap):
+    if market_cap > 200e9:
+        return "Mega Cap"
+    elif market_cap > 10e9:
+        return "Large Cap"
+    elif market_cap > 2e9:
+        return "Mid Cap"
+    elif market_cap > 300e6:
+        return "Small Cap"
+    return "Micro Cap"
+
+
+def around(*edges):
+    """Each edge, just either side of it, and NaN"""
+    return sorted({v for e in edges for v in (np.nextafter(e, -np.inf), e, np.nextafter(e, np.inf))}) + [NAN]
+
+
+def test_supply_demand_card_matches_the_ladders_on_every_boundary():
+    grid = pd.DataFrame(list(itertools.product(around(-10, -5, 5, 10), around(-10, -5, 5, 10),
+                                               around(0.7, 1.2, 1.5), around(30, 70))),
+                        columns=['obv_change_20d', 'ad_change_20d', 'vol_ratio_5d_20d', 'mfi'])
+    expected = [baseline_supply_demand(*row) for row in grid.itertuples(index=False)]
+
+    np.testing.assert_array_equal(SUPPLY_DEMAND_CARD.score(grid), expected)
+
+
+def test_stage_grade_and_size_buckets_match_the_ladders():
+    scores = around(30, 45, 55, 70) + [0, 100]
+    assert bucket(scores, *SUPPLY_DEMAND_STAGES).tolist() == [baseline_stage(s) for s in scores]
+
+    composites = around(40, 50, 65, 75, 85)
+    assert bucket(composites, *GRADES).tolist() == [baseline_grade(c) for c in composites]
+
+    caps = around(300e6, 2e9, 10e9, 200e9) + [0]
+    assert bucket(caps, *SIZE_BUCKETS, right=True).tolist() == [baseline_size(c) for c in caps]
+
+
+def test_nan_gets_the_lowest_label():
+    assert bucket([NAN], *SUPPLY_DEMAND_STAGES)[0] == "Strong Distribution"
+    assert bucket([NAN], *GRADES)[0] == "🚫 F (Avoid)"
+    assert bucket([NAN], *SIZE_BUCKETS, right=True)[0] == "Micro Cap"
+
+
+def test_card_components_first_match_wins_and_clip():
+    card = ScoreCard({'base': 90, 'clip': (0, 100), 'components': {
+        'trend': [({'x': ('>', 1)}, 20), ({'x': ('>', 0)}, 5)],
+        'band': [({'x': [('>=', 0), ('<', 2)]}, -3)],
+    }})
+    features = {'x': np.array([2.0, 1.0, 0.0, -1.0, NAN])}
+
+    assert card.points(features)['trend'].tolist() == [20, 5, 0, 0, 0]
+    assert card.points(features)['band'].tolist() == [0, -3, -3, 0, 0]
+    assert card.score(features).tolist() == [100, 92, 87, 90, 90]
+
+
+def test_bucket_needs_one_more_label_than_edges():
+    with pytest.raises(ValueError):
+        bucket([1.0], [1, 2], ['low', 'high'])
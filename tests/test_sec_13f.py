@@ -0,0 +1,122 @@
+# 13F-HR ingest against saved EDGAR fixtures (tests/fixtures/sec mirrors the EDGAR paths)
+import os
+import sys
+import json
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from engine.market_data import MarketDataProvider, ProviderError
+from engine.sec_13f import (HoldingsDB, Edgar13FIngestor, company_names, parse_information_table,
+                            VALUE_IN_DOLLARS_FROM)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sec')
+
+BERKSHIRE = '0001067983'
+Q3_2022 = 'Archives/edgar/data/1067983/000095012322010389/infotable.xml'
+Q4_2022 = 'Archives/edgar/data/1067983/000095012323001234/infotable.xml'
+
+GOOGL_CUSIP, GOOG_CUSIP = '02079K305', '02079K107'
+AAPL_CUSIP, BAC_CUSIP = '037833100', '060505104'
+
+
+class SavedEdgar(MarketDataProvider):
+    """SECEdgarProvider contract served from the fixture tree (JSON -> dict, documents -> {'text'})"""
+    name = 'sec'
+
+    def __init__(self):
+        self.calls = []
+
+    def query(self, endpoint: str, **params):
+        self.calls.append(endpoint)
+        path = os.path.join(FIXTURES, endpoint)
+        if not os.path.exists(path):
+            raise ProviderError(f"No saved EDGAR response for {endpoint}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f) if endpoint.endswith('.json') else {'text': f.read()}
+
+
+def read_fixture(endpoint: str) -> str:
+    with open(os.path.join(FIXTURES, endpoint), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = HoldingsDB(str(tmp_path / 'us_13f_holdings.db'))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def ingested(db):
+    provider = SavedEdgar()
+    stats = Edgar13FIngestor(db, provider).ingest({BERKSHIRE: 'Berkshire Hathaway'}, quarters=2)
+    return db, provider, stats
+
+
+def test_values_before_form_change_are_scaled_to_dollars():
+    assert '2022-11-14' < VALUE_IN_DOLLARS_FROM <= '2023-02-14'
+    q3 = parse_information_table(read_fixture(Q3_2022), filed='2022-11-14').set_index('cusip')
+    q4 = parse_information_table(read_fixture(Q4_2022), filed='2023-02-14').set_index('cusip')
+
+    assert q3.loc[GOOGL_CUSIP, 'value'] == 95_650_000
+    assert q4.loc[GOOGL_CUSIP, 'value'] == 105_876_000
+
+
+def test_positions_exclude_options_and_principal_amounts():
+    q3 = parse_information_table(read_fixture(Q3_2022), filed='2022-11-14').set_index('cusip')
+    q4 = parse_information_table(read_fixture(Q4_2022), filed='2023-02-14').set_index('cusip')
+
+    # Two other-manager rows summed, the call option row left out
+    assert q3.loc[AAPL_CUSIP, 'shares'] == 1_000_000
+    assert q3.loc[AAPL_CUSIP, 'value'] == (82_921 + 55_281) * 1000
+    assert '06051GFM6' not in q4.index
+    assert sorted(q4.index) == sorted([GOOGL_CUSIP, AAPL_CUSIP, BAC_CUSIP])
+
+
+def test_ingest_reads_only_13f_hr_filings(ingested):
+    db, provider, stats = ingested
+
+    assert stats == {'filers': 1, 'filings': 2, 'positions': 6, 'skipped': 0, 'failed': 0}
+    filings = db.conn.execute('SELECT accession, period, filed, positions FROM filings ORDER BY period').fetchall()
+    assert filings == [('0000950123-22-010389', '2022-09-30', '2022-11-14', 3),
+                       ('0000950123-23-001234', '2022-12-31', '2023-02-14', 3)]
+    assert not any('000095012323000999' in call for call in provider.calls)
+
+
+def test_reingest_skips_stored_filings(ingested):
+    db, _, _ = ingested
+    provider = SavedEdgar()
+    stats = Edgar13FIngestor(db, provider).ingest({BERKSHIRE: 'Berkshire Hathaway'}, quarters=2)
+
+    assert stats['skipped'] == 2 and stats['filings'] == 0
+    assert provider.calls == [f'submissions/CIK{BERKSHIRE}.json']
+
+
+def test_quarter_over_quarter_deltas(ingested):
+    db, _, _ = ingested
+    status = dict(db.conn.execute("SELECT cusip, status FROM deltas WHERE period = '2022-12-31'").fetchall())
+
+    assert status == {GOOGL_CUSIP: 'add', GOOG_CUSIP: 'exit', AAPL_CUSIP: 'hold', BAC_CUSIP: 'new'}
+
+
+def test_share_classes_with_one_issuer_name_need_an_override(ingested, caplog):
+    db, _, _ = ingested
+    names = company_names(SavedEdgar())
+
+    with caplog.at_level(logging.WARNING, logger='engine.sec_13f'):
+        assert db.map_cusips(names) == 2
+    mapping = dict(db.conn.execute('SELECT cusip, ticker FROM cusip_map').fetchall())
+    assert mapping == {AAPL_CUSIP: 'AAPL', BAC_CUSIP: 'BAC'}
+    assert GOOGL_CUSIP in caplog.text and GOOG_CUSIP in caplog.text and 'GOOG/GOOGL' in caplog.text
+
+    assert db.map_cusips(names, {GOOGL_CUSIP: 'googl', GOOG_CUSIP: 'GOOG'}) == 0
+    mapping = dict(db.conn.execute('SELECT cusip, ticker FROM cusip_map').fetchall())
+    assert mapping[GOOGL_CUSIP] == 'GOOGL' and mapping[GOOG_CUSIP] == 'GOOG'
+
+    activity = db.ticker_activity()
+    assert activity.loc['GOOGL', 'holders_increased'] == 1
+    assert activity.loc['GOOG', 'exited_positions'] == 1
+    assert activity.loc['BAC', 'new_positions'] == 1